@@ -0,0 +1,354 @@
+"""
+Endpoint benchmarks.
+
+Seeds a SQLite database, drives every endpoint through the Flask test client
+and records p50/p95/p99 latency and throughput. The results are compared with
+``benchmarks/baseline.json`` and the run fails when an endpoint is slower than
+the baseline by more than the tolerance.
+
+    python -m benchmarks.bench_endpoints                    # preset "small"
+    python -m benchmarks.bench_endpoints --preset large     # 200k users, 20k teams, 1M memberships
+    python -m benchmarks.bench_endpoints --update-baseline  # record a new baseline
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from PIL import Image
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+PRESETS = {
+    "small": {"users": 2_000, "teams": 200, "memberships": 10_000},
+    "medium": {"users": 20_000, "teams": 2_000, "memberships": 100_000},
+    "large": {"users": 200_000, "teams": 20_000, "memberships": 1_000_000},
+}
+
+# Número de requisições por endpoint; rotas com bcrypt e a listagem completa são caras
+ITERATIONS = {
+    "auth.login": 10,
+    "users.create_user": 10,
+    "teams.get_teams": 20,
+    "users.get_users": 20,
+}
+DEFAULT_ITERATIONS = 200
+WARMUP_ITERATIONS = 5
+# Partidas por requisição de /matches/ e alterações lidas por /teams/changes e /teams/events
+MATCHES_PER_REQUEST = 50
+CHANGES_PER_REQUEST = 100
+MATCHES_START = datetime(2025, 1, 1)
+
+
+def _png(n):
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), (n % 256, n // 256 % 256, 128)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def build_requests(scale, rng, password, latest_change):
+    """
+    Return ``(factories, callbacks)``: ``factories[endpoint]()`` yields the next
+    request and ``callbacks[endpoint](response)``, when present, sees its response.
+    ``latest_change()`` returns the id of the last ``team_changes`` row.
+    """
+    users, teams = scale["users"], scale["teams"]
+    counters = {"user": users, "team": teams, "match": 0, "image": 0}
+    created_teams = []
+    # Equipes das partidas e do histórico de ranking: a primeira metade, que não é removida
+    ranked = teams // 2
+
+    def create_user():
+        counters["user"] += 1
+        n = counters["user"]
+        return "POST", "/users/", {"json": {
+            "name": f"User {n}", "email": f"user{n}@seed.local",
+            "password": password, "birth": "1990-01-01",
+        }}
+
+    def create_team():
+        counters["team"] += 1
+        return "POST", "/teams/", {"json": {"name": f"Team {counters['team']}", "description": "Created"}}
+
+    def delete_team():
+        # Remove as equipes criadas pelo benchmark de create_team para não afetar as demais rotas
+        team_id = created_teams.pop() if created_teams else 0
+        return "DELETE", f"/teams/{team_id}", {}
+
+    def create_matches():
+        # Sempre depois das anteriores: ingestão incremental
+        matches = []
+        for _ in range(MATCHES_PER_REQUEST):
+            counters["match"] += 1
+            home, away = rng.sample(range(1, ranked + 1), 2)
+            matches.append({
+                "home_team_id": home, "away_team_id": away,
+                "home_score": rng.randint(0, 4), "away_score": rng.randint(0, 4),
+                "played_at": (MATCHES_START + timedelta(minutes=counters["match"])).isoformat(),
+            })
+        return "POST", "/matches/", {"json": {"matches": matches}}
+
+    def upload_team_image():
+        # Imagem nova a cada requisição: sem o atalho de conteúdo repetido
+        counters["image"] += 1
+        return "POST", f"/teams/{rng.randint(1, ranked)}/images/profile", {
+            "data": {"image": (io.BytesIO(_png(counters["image"])), "team.png")},
+            "content_type": "multipart/form-data",
+        }
+
+    def recent_cursor():
+        # As últimas alterações: o custo não cresce com as escritas dos endpoints anteriores
+        return max(0, latest_change() - CHANGES_PER_REQUEST)
+
+    def team_created(response):
+        if response.status_code == 201:
+            created_teams.append(response.get_json()["data"]["team_id"])
+
+    factories = {
+        "users.get_users": lambda: ("GET", "/users/", {}),
+        "users.get_user": lambda: ("GET", f"/users/{rng.randint(1, users)}", {}),
+        "users.create_user": create_user,
+        "users.edit_user": lambda: ("PUT", f"/users/{rng.randint(1, users)}", {"json": {"name": "Edited"}}),
+        "auth.login": lambda: ("POST", "/auth/login", {"json": {
+            "user": f"user{rng.randint(1, users)}@seed.local", "password": password,
+        }}),
+        "auth.protected_route": lambda: ("GET", "/auth/protected", {}),
+        "teams.get_teams": lambda: ("GET", "/teams/", {}),
+        "teams.get_team": lambda: ("GET", f"/teams/{rng.randint(1, teams // 2)}", {}),
+        "teams.create_team": create_team,
+        "teams.edit_team": lambda: ("PUT", f"/teams/{rng.randint(1, teams // 2)}", {"json": {"notes": "Edited"}}),
+        "teams.add_team_player": lambda: ("POST", f"/teams/{rng.randint(1, teams // 2)}/players", {
+            "json": {"user_id": rng.randint(1, users)},
+        }),
+        "teams.delete_team": delete_team,
+        "teams.get_team_changes": lambda: ("GET", "/teams/changes", {
+            "query_string": {"since": recent_cursor(), "limit": CHANGES_PER_REQUEST},
+        }),
+        # O stream termina depois do replay (EVENTS_MAX_STREAM_SECONDS = 0); buffered lê o corpo todo
+        "teams.stream_teams_events": lambda: ("GET", "/teams/events", {
+            "headers": {"Last-Event-ID": str(recent_cursor())}, "buffered": True,
+        }),
+        "matches.create_matches": create_matches,
+        "teams.get_team_ranking_history": lambda: ("GET", f"/teams/{rng.randint(1, ranked)}/ranking-history", {}),
+        "teams.upload_team_image": upload_team_image,
+    }
+    callbacks = {"teams.create_team": team_created}
+    return factories, callbacks
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run(app, factories, callbacks, password, only=None, settle=None):
+    client = app.test_client()
+    client.post("/auth/login", base_url="https://localhost", json={
+        "user": "user1@seed.local", "password": password,
+    })
+
+    results = {}
+    for endpoint, factory in factories.items():
+        if only and endpoint not in only:
+            continue
+
+        iterations = ITERATIONS.get(endpoint, DEFAULT_ITERATIONS)
+        if endpoint not in ITERATIONS:
+            for _ in range(WARMUP_ITERATIONS):
+                method, url, kwargs = factory()
+                response = client.open(url, method=method, base_url="https://localhost", **kwargs)
+                if endpoint in callbacks:
+                    callbacks[endpoint](response)
+        if settle is not None:
+            settle()
+
+        samples = []
+        statuses = {}
+        started = time.perf_counter()
+        for _ in range(iterations):
+            method, url, kwargs = factory()
+            request_start = time.perf_counter()
+            response = client.open(url, method=method, base_url="https://localhost", **kwargs)
+            samples.append(time.perf_counter() - request_start)
+            if endpoint in callbacks:
+                callbacks[endpoint](response)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+
+        results[endpoint] = {
+            "iterations": iterations,
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+            "throughput_rps": round(iterations / elapsed, 1),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        }
+    return results
+
+
+def best_of(runs):
+    """Combine repeated runs keeping the best value of each metric, as ``timeit`` does."""
+    combined = {}
+    for endpoint in runs[0]:
+        samples = [run_results[endpoint] for run_results in runs]
+        combined[endpoint] = dict(samples[-1])
+        for key in ("p50_ms", "p95_ms", "p99_ms", "mean_ms"):
+            combined[endpoint][key] = min(sample[key] for sample in samples)
+        combined[endpoint]["throughput_rps"] = max(sample["throughput_rps"] for sample in samples)
+    return combined
+
+
+def print_results(results):
+    for endpoint, result in results.items():
+        print(
+            f"{endpoint:<32} p50={result['p50_ms']:>9.3f}ms p95={result['p95_ms']:>9.3f}ms "
+            f"p99={result['p99_ms']:>9.3f}ms {result['throughput_rps']:>8.1f} req/s {result['statuses']}"
+        )
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Return the regressions of ``results`` against ``baseline``.
+    A slowdown must exceed both the relative ``tolerance`` and ``min_delta_ms``,
+    so sub-millisecond jitter on the cheap endpoints does not fail the run.
+    """
+    regressions = []
+    for endpoint, current in results.items():
+        reference = baseline.get(endpoint)
+        if reference is None:
+            continue
+
+        for key in ("p50_ms", "p95_ms"):
+            if (
+                current[key] > reference[key] * (1 + tolerance)
+                and current[key] - reference[key] > min_delta_ms
+            ):
+                regressions.append(
+                    f"{endpoint}: {key} {current[key]:.3f} > baseline {reference[key]:.3f} (+{tolerance:.0%})"
+                )
+        if (
+            current["throughput_rps"] < reference["throughput_rps"] / (1 + tolerance)
+            and current["mean_ms"] - reference["mean_ms"] > min_delta_ms
+        ):
+            regressions.append(
+                f"{endpoint}: throughput {current['throughput_rps']:.1f} < baseline "
+                f"{reference['throughput_rps']:.1f} (-{tolerance:.0%})"
+            )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--teams", type=int)
+    parser.add_argument("--memberships", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Run the suite N times and keep the best values")
+    parser.add_argument("--database", help="SQLite file to use (default: temporary file)")
+    parser.add_argument("--endpoint", action="append", help="Only benchmark this endpoint (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown, e.g. 0.5 for 50%%")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scale = dict(PRESETS[args.preset])
+    for key in ("users", "teams", "memberships"):
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    custom_scale = scale != PRESETS[args.preset]
+
+    workdir = tempfile.mkdtemp(prefix="soccer-bench-")
+    database = args.database or os.path.join(workdir, "bench.db")
+    if os.path.exists(database):
+        os.remove(database)
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.setdefault("MEDIA_ROOT", os.path.join(workdir, "media"))
+    # Jobs (variantes das imagens, cascata das exclusões) rodariam em segundo
+    # plano dentro da janela medida dos endpoints seguintes
+    os.environ["JOBS_WORKER_ENABLED"] = "false"
+
+    from src import create_app
+    from src.database.db import db
+    from src.database.seed import SEED_PASSWORD, seed_database
+    from src.models.team_changes import TeamChange
+
+    app = create_app("testing")
+    app.config["EVENTS_MAX_STREAM_SECONDS"] = 0
+
+    def latest_change():
+        with app.app_context():
+            latest = db.session.scalar(db.select(db.func.max(TeamChange.id))) or 0
+            db.session.remove()
+        return latest
+
+    print(f"Seeding {scale} into {database}")
+    with app.app_context():
+        seeded = seed_database(db.engine, scale["users"], scale["teams"], scale["memberships"], seed=args.seed)
+    print(f"Seeded in {seeded['elapsed']:.2f}s")
+
+    # Medição em regime: cada endpoint parte do snapshot de /teams/ em dia, como
+    # num servidor no ar; sem isso a montagem pedida pelas escritas de um
+    # endpoint cai na janela medida do seguinte
+    snapshots = app.extensions.get("team_snapshot")
+    settle = snapshots.rebuild if snapshots is not None else None
+
+    factories, callbacks = build_requests(scale, random.Random(args.seed), SEED_PASSWORD, latest_change)
+    results = best_of([
+        run(app, factories, callbacks, SEED_PASSWORD, only=args.endpoint, settle=settle)
+        for _ in range(args.repeat)
+    ])
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"scale": scale, "results": results}, f, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.update_baseline:
+        if custom_scale:
+            print("Refusing to record a baseline for a custom scale; use a preset.")
+            return 2
+        baselines[args.preset] = {"scale": scale, "results": results}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline for preset '{args.preset}' written to {args.baseline}")
+        return 0
+
+    baseline = baselines.get(args.preset)
+    if baseline is None or custom_scale:
+        print("No baseline for this scale, skipping the comparison.")
+        return 0
+
+    regressions = compare(results, baseline["results"], args.tolerance, args.min_delta_ms)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nNo regressions against the '{args.preset}' baseline (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Group-commit benchmark.
+
+Runs the same concurrent write workload (``add_team_player`` and ``edit_team``)
+against a seeded SQLite file twice, once with direct commits and once with
+``GROUP_COMMIT_ENABLED``, and prints throughput and latency for both.
+
+    python -m benchmarks.bench_group_commit
+    python -m benchmarks.bench_group_commit --concurrency 64 --duration 20 --max-batch-size 128
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+
+from benchmarks.bench_endpoints import percentile
+
+
+def run_workload(app, scale, concurrency, duration, seed):
+    deadline = time.monotonic() + duration
+    samples = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        client = app.test_client()
+        rng = random.Random(seed + worker_id)
+        local_samples, local_statuses = [], {}
+        while time.monotonic() < deadline:
+            team_id = rng.randint(1, scale["teams"])
+            if rng.random() < 0.6:
+                method, url, body = "POST", f"/teams/{team_id}/players", {"user_id": rng.randint(1, scale["users"])}
+            else:
+                method, url, body = "PUT", f"/teams/{team_id}", {"notes": f"Edited {rng.random():.6f}"}
+
+            started = time.perf_counter()
+            response = client.open(url, method=method, json=body, base_url="https://localhost")
+            local_samples.append(time.perf_counter() - started)
+            local_statuses[response.status_code] = local_statuses.get(response.status_code, 0) + 1
+
+        with lock:
+            samples.extend(local_samples)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--teams", type=int, default=2_000)
+    parser.add_argument("--memberships", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scale = {"users": args.users, "teams": args.teams, "memberships": args.memberships}
+    workdir = tempfile.mkdtemp(prefix="soccer-group-commit-")
+    template = os.path.join(workdir, "template.db")
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{template}"
+
+    from config import TestingConfig
+    from src import create_app
+    from src.database.db import db
+    from src.database.seed import seed_database
+
+    app = create_app("testing")
+    with app.app_context():
+        seed_database(db.engine, scale["users"], scale["teams"], scale["memberships"], seed=args.seed)
+        db.engine.dispose()
+
+    results = {}
+    for mode in ("direct", "group_commit"):
+        # Cada modo parte de uma cópia idêntica do banco semeado
+        database = os.path.join(workdir, f"{mode}.db")
+        shutil.copyfile(template, database)
+        os.environ["TEST_DATABASE_URL"] = f"sqlite:///{database}"
+        TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+        TestingConfig.GROUP_COMMIT_ENABLED = mode == "group_commit"
+        TestingConfig.GROUP_COMMIT_MAX_BATCH_SIZE = args.max_batch_size
+        TestingConfig.GROUP_COMMIT_MAX_DELAY_MS = args.max_delay_ms
+
+        app = create_app("testing")
+        results[mode] = run_workload(app, scale, args.concurrency, args.duration, args.seed)
+        result = results[mode]
+        print(
+            f"{mode:<13} {result['throughput_rps']:>8.1f} req/s p50={result['p50_ms']:>8.3f}ms "
+            f"p95={result['p95_ms']:>8.3f}ms p99={result['p99_ms']:>8.3f}ms {result['statuses']}"
+        )
+
+    speedup = results["group_commit"]["throughput_rps"] / max(results["direct"]["throughput_rps"], 0.1)
+    print(f"\nGroup commit throughput: {speedup:.2f}x direct commits")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"scale": scale, "concurrency": args.concurrency, "results": results}, f, indent=2)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Team image benchmark.
+
+Generates the variants of a synthetic photo and compares their size with the
+original, then times sending files over a local socket with the server's
+sendfile file wrapper against the block-by-block ``FileWrapper`` used
+without it.
+
+    python -m benchmarks.bench_media
+    python -m benchmarks.bench_media --file-size 8388608 --rounds 50
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+
+VARIANTS = {
+    "profile": {"thumb": (96, 96), "medium": (256, 256)},
+    "banner": {"thumb": (480, 120), "large": (1500, 375)},
+}
+
+
+def make_photo(width, height, seed):
+    """Noisy gradient: compresses like a photo, unlike a flat color."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width)[None, :, None]
+    y = np.linspace(0, 255, height)[:, None, None]
+    pixels = (x * 0.6 + y * 0.4 + rng.normal(0, 12, (height, width, 3))).clip(0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=90)
+    buffer.seek(0)
+    return buffer
+
+
+def bench_variants(root, width, height):
+    from src.utils import media
+
+    photo = make_photo(width, height, seed=1)
+    ext = media.inspect_image(photo, max_pixels=width * height)
+    digest = media.store_original(photo, root, ext)
+    directory = media.image_dir(root, digest)
+    original_size = os.path.getsize(os.path.join(directory, media.original_filename(ext)))
+    print(f"original {width}x{height} {ext}: {original_size / 1024:.1f} KiB")
+
+    results = {"original_bytes": original_size, "variants": {}}
+    for kind, sizes in VARIANTS.items():
+        started = time.perf_counter()
+        media.generate_variants(root, digest, ext, kind, sizes)
+        elapsed = time.perf_counter() - started
+        for name, size in sizes.items():
+            size_bytes = os.path.getsize(os.path.join(directory, media.variant_filename(kind, name, size)))
+            results["variants"][f"{kind}.{name}"] = size_bytes
+            print(f"{kind:<8} {name:<7} {size[0]}x{size[1]:<5} {size_bytes / 1024:>8.1f} KiB "
+                  f"({size_bytes / original_size:.2%} of the original)")
+        results[f"{kind}_resize_ms"] = round(elapsed * 1000, 1)
+        print(f"{kind:<8} resized in {elapsed * 1000:.1f}ms")
+    return results
+
+
+def _drain(sock, expected):
+    received = 0
+    while received < expected:
+        chunk = sock.recv(1024 * 1024)
+        if not chunk:
+            break
+        received += len(chunk)
+
+
+def time_wrapper(make_wrapper, path, rounds):
+    size = os.path.getsize(path)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        sender, receiver = socket.socketpair()
+        reader = threading.Thread(target=_drain, args=(receiver, size))
+        reader.start()
+        with open(path, "rb") as f:
+            for chunk in make_wrapper(sender, f):
+                if chunk:
+                    sender.sendall(chunk)
+        sender.close()
+        reader.join()
+        receiver.close()
+    elapsed = time.perf_counter() - started
+    return rounds * size / elapsed / (1024 * 1024)
+
+
+def bench_sending(root, file_size, rounds):
+    from werkzeug.wsgi import FileWrapper
+    from src.server import _SendfileWrapper
+
+    path = os.path.join(root, "payload.bin")
+    with open(path, "wb") as f:
+        f.write(os.urandom(file_size))
+
+    results = {}
+    for name, make_wrapper in {
+        "file_wrapper": lambda sock, f: FileWrapper(f, 8192),
+        "sendfile": lambda sock, f: _SendfileWrapper(sock, f),
+    }.items():
+        start_cpu = time.process_time()
+        throughput = time_wrapper(make_wrapper, path, rounds)
+        cpu = time.process_time() - start_cpu
+        results[name] = {"mib_per_second": round(throughput, 1), "cpu_seconds": round(cpu, 3)}
+        print(f"{name:<13} {throughput:>9.1f} MiB/s, {cpu:.3f}s CPU for {rounds} x {file_size / 1024 / 1024:.1f} MiB")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--file-size", type=int, default=4 * 1024 * 1024, help="Bytes per sent file")
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    root = tempfile.mkdtemp(prefix="soccer-media-")
+    try:
+        print("Variants:")
+        variants = bench_variants(root, args.width, args.height)
+        print("\nSending files:")
+        sending = bench_sending(root, args.file_size, args.rounds)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"variants": variants, "sending": sending}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Ranking recompute benchmark.
+
+Fills a temporary SQLite file with synthetic match results, times the full Elo
+recompute (``flask recompute-rankings``) and checks the batched passes against
+a one-match-at-a-time reference loop on a sample.
+
+    python -m benchmarks.bench_rankings
+    python -m benchmarks.bench_rankings --matches 1000000 --teams 2000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+
+
+def generate_matches(n_matches, n_teams, seed, chunk_size=100_000):
+    """Yield chunks of match rows with distinct home/away teams and increasing ``played_at``."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2020, 1, 1)
+    created = datetime.utcnow()
+    for offset in range(0, n_matches, chunk_size):
+        size = min(chunk_size, n_matches - offset)
+        home = rng.integers(1, n_teams + 1, size)
+        away = (home + rng.integers(1, n_teams, size) - 1) % n_teams + 1
+        home_score = rng.poisson(1.5, size)
+        away_score = rng.poisson(1.2, size)
+        yield [
+            {
+                "home_team_id": int(home[i]),
+                "away_team_id": int(away[i]),
+                "home_score": int(home_score[i]),
+                "away_score": int(away_score[i]),
+                "played_at": start + timedelta(minutes=offset + i),
+                "create_date": created,
+            }
+            for i in range(size)
+        ]
+
+
+def reference_elo(ratings, home, away, home_score, away_score, k, home_advantage):
+    for h, a, hs, as_ in zip(home, away, home_score, away_score):
+        actual = 1.0 if hs > as_ else 0.5 if hs == as_ else 0.0
+        expected = 1.0 / (1.0 + 10.0 ** ((ratings[a] - ratings[h] - home_advantage) / 400.0))
+        delta = k * (actual - expected)
+        ratings[h] += delta
+        ratings[a] -= delta
+    return ratings
+
+
+def check_against_reference(n_matches, n_teams, seed):
+    from src.utils.ranking import elo
+
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, n_teams, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches)) % n_teams
+    home_score, away_score = rng.poisson(1.5, n_matches), rng.poisson(1.2, n_matches)
+
+    batched = elo(np.full(n_teams, 1000.0), home, away, home_score, away_score, 32, 50)
+    reference = reference_elo(np.full(n_teams, 1000.0), home, away, home_score, away_score, 32, 50)
+    return float(np.max(np.abs(batched - reference)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=1_000_000)
+    parser.add_argument("--teams", type=int, default=2_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="soccer-rankings-")
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'rankings.db')}"
+
+    from src import create_app
+    from src.database.db import db
+    from src.database.seed import seed_database
+    from src.models.matches import Match
+    from src.utils.ranking import recompute_rankings
+
+    app = create_app("testing")
+    with app.app_context():
+        seed_database(db.engine, args.users, args.teams, 0, seed=args.seed)
+
+        started = time.perf_counter()
+        with db.engine.begin() as conn:
+            for chunk in generate_matches(args.matches, args.teams, args.seed):
+                conn.execute(Match.__table__.insert(), chunk)
+        print(f"Inserted {args.matches:,} matches in {time.perf_counter() - started:.2f}s")
+
+        result = recompute_rankings(db.session)
+        db.session.commit()
+        print(
+            f"Full recompute: {result['matches']:,} matches in {result['elapsed']:.2f}s, "
+            f"{result['teams_updated']} teams updated"
+        )
+
+        # Com todas as notas já gravadas, o segundo cálculo não altera nenhuma equipe
+        second = recompute_rankings(db.session)
+        db.session.commit()
+        print(f"Second recompute: {second['elapsed']:.2f}s, {second['teams_updated']} teams updated")
+
+    max_error = check_against_reference(min(args.matches, 100_000), args.teams, args.seed)
+    print(f"Max difference vs. sequential reference: {max_error:.3e}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "matches": args.matches,
+                "teams": args.teams,
+                "recompute_seconds": round(result["elapsed"], 3),
+                "teams_updated": result["teams_updated"],
+                "max_reference_error": max_error,
+            }, f, indent=2)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Upsert write-path benchmark.
+
+Compares the old SELECT-then-INSERT pattern with the single
+``INSERT ... ON CONFLICT DO NOTHING RETURNING`` statement on a seeded SQLite
+file, with part of the writes hitting existing rows. The statements issued
+per request are checked in ``tests/test_upserts.py``.
+
+    python -m benchmarks.bench_upserts
+    python -m benchmarks.bench_upserts --operations 20000 --duplicates 0.5
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+
+
+def select_then_insert_team(session, name):
+    """The previous create_team path: SELECT, INSERT through the ORM, refresh after commit."""
+    from src.models.teams import Team
+
+    if session.query(Team).filter_by(name=name).first():
+        return None
+    team = Team(name=name)
+    session.add(team)
+    session.commit()
+    return team.id
+
+
+def insert_on_conflict_team(session, name):
+    from src.models.team_changes import TeamChange, record_team_changes
+    from src.models.teams import Team
+    from src.utils.upsert import insert_or_ignore
+
+    row = insert_or_ignore(session, Team.__table__, {"name": name}, ["name"], returning=(Team.__table__.c.id,))
+    if row is None:
+        session.rollback()
+        return None
+    record_team_changes(session.connection(), [(row.id, TeamChange.CREATED)])
+    session.commit()
+    return row.id
+
+
+def select_then_insert_player(session, team_id, user_id):
+    """The previous add_team_player path."""
+    from src.models.team_players import TeamPlayer
+    from src.models.teams import Team
+
+    team = session.get(Team, team_id)
+    if team is None or session.query(TeamPlayer).filter_by(user_id=user_id, team_id=team_id).first():
+        return None
+    player = TeamPlayer(user_id=user_id, team_id=team_id)
+    session.add(player)
+    team.members_count += 1
+    team.update_date = datetime.utcnow()
+    session.commit()
+    return player.id
+
+
+def insert_on_conflict_player(session, team_id, user_id):
+    from sqlalchemy import literal, select, update
+    from src.models.team_changes import TeamChange, record_team_changes
+    from src.models.team_players import TeamPlayer
+    from src.models.teams import Team
+    from src.utils.upsert import insert_from_select_or_ignore
+
+    now = datetime.utcnow()
+    row = insert_from_select_or_ignore(
+        session, TeamPlayer.__table__,
+        ["user_id", "team_id", "create_date", "update_date"],
+        select(literal(user_id), Team.id, literal(now), literal(now)).where(Team.id == team_id),
+        ["user_id", "team_id"],
+        returning=(TeamPlayer.__table__.c.id,),
+    )
+    if row is None:
+        session.rollback()
+        return None
+    session.execute(update(Team).where(Team.id == team_id).values(members_count=Team.members_count + 1, update_date=now))
+    record_team_changes(session.connection(), [(team_id, TeamChange.ROSTER)])
+    session.commit()
+    return row.id
+
+
+def make_operations(kind, operations, duplicates, teams, users, seed):
+    """Arguments for ``operations`` writes; a ``duplicates`` share repeats an earlier one."""
+    rng = random.Random(seed)
+    if kind == "teams":
+        unique = [(f"Upsert Team {i}",) for i in range(operations)]
+    else:
+        pairs = set()
+        while len(pairs) < operations:
+            pairs.add((rng.randint(1, teams), rng.randint(1, users)))
+        unique = sorted(pairs, key=lambda _: rng.random())
+
+    result, seen = [], []
+    for args in unique[:operations]:
+        if seen and rng.random() < duplicates:
+            result.append(rng.choice(seen))
+        else:
+            result.append(args)
+            seen.append(args)
+    return result
+
+
+def run_variant(app, fn, operations):
+    from src.database.db import db
+
+    with app.app_context():
+        started = time.perf_counter()
+        created = 0
+        for args in operations:
+            if fn(db.session, *args) is not None:
+                created += 1
+        elapsed = time.perf_counter() - started
+        db.session.remove()
+    return {"operations": len(operations), "created": created, "ops_per_second": round(len(operations) / elapsed, 1)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=5_000)
+    parser.add_argument("--duplicates", type=float, default=0.3, help="Share of writes that repeat an existing row")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--memberships", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="soccer-upserts-")
+    template = os.path.join(workdir, "template.db")
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{template}"
+
+    from config import TestingConfig
+    from src import create_app
+    from src.database.db import db
+    from src.database.seed import seed_database
+
+    TestingConfig.JOBS_WORKER_ENABLED = False
+    app = create_app("testing")
+    with app.app_context():
+        seed_database(db.engine, args.users, args.teams, args.memberships, seed=args.seed)
+        db.engine.dispose()
+
+    variants = {
+        "teams": {"select_then_insert": select_then_insert_team, "insert_on_conflict": insert_on_conflict_team},
+        "players": {"select_then_insert": select_then_insert_player, "insert_on_conflict": insert_on_conflict_player},
+    }
+    results = {}
+    for kind, functions in variants.items():
+        operations = make_operations(kind, args.operations, args.duplicates, args.teams, args.users, args.seed)
+        for variant, fn in functions.items():
+            # Cada variante parte de uma cópia idêntica do banco semeado
+            database = os.path.join(workdir, f"{kind}-{variant}.db")
+            shutil.copyfile(template, database)
+            TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+            result = results.setdefault(kind, {})[variant] = run_variant(create_app("testing"), fn, operations)
+            print(f"{kind:<8} {variant:<19} {result['ops_per_second']:>9.1f} ops/s ({result['created']} created)")
+        speedup = results[kind]["insert_on_conflict"]["ops_per_second"] / results[kind]["select_then_insert"]["ops_per_second"]
+        print(f"{kind:<8} speedup {speedup:.2f}x\n")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"operations": args.operations, "duplicates": args.duplicates, "results": results}, f, indent=2)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
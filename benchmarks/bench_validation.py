@@ -0,0 +1,136 @@
+"""
+Request validation benchmark.
+
+Times the compiled request schemas on valid and invalid payloads, compares
+them with building the validator on every call, and measures how fast the
+app answers invalid and oversized requests (rejected before any database
+access) through the Flask test client.
+
+    python -m benchmarks.bench_validation
+    python -m benchmarks.bench_validation --iterations 50000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+
+PAYLOADS = {
+    "CREATE_TEAM": {
+        "valid": {"name": "Benchmark FC", "description": "d" * 200, "captain_id": 1, "notes": "n" * 200},
+        "invalid": {"name": "Benchmark FC", "captain_id": "1"},
+    },
+    "EDIT_TEAM": {
+        "valid": {"description": "d" * 200, "notes": None},
+        "invalid": {"notes": "n" * 351},
+    },
+    "ADD_TEAM_PLAYER": {
+        "valid": {"user_id": 42},
+        "invalid": {"user_id": "42"},
+    },
+    "CREATE_USER": {
+        "valid": {"name": "Benchmark", "email": "benchmark@example.com", "password": "secret", "birth": "2000-01-01"},
+        "invalid": {"name": "Benchmark", "email": "benchmark@example.com"},
+    },
+}
+
+
+def time_per_call(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def bench_validators(iterations):
+    from jsonschema import Draft202012Validator
+    from src.api import schemas
+    from src.utils.validation import validation_error
+
+    results = {}
+    for name, payloads in PAYLOADS.items():
+        validator = getattr(schemas, name)
+        for kind, payload in payloads.items():
+            assert (validation_error(validator, payload) is None) == (kind == "valid"), (name, kind)
+            compiled = time_per_call(lambda: validation_error(validator, payload), iterations)
+            # Referência: schema verificado e validador criado a cada requisição
+            per_call = time_per_call(
+                lambda: validation_error(
+                    (Draft202012Validator.check_schema(validator.schema), Draft202012Validator(validator.schema))[1],
+                    payload,
+                ),
+                max(iterations // 10, 1),
+            )
+            results[f"{name}.{kind}"] = {"compiled_us": round(compiled, 2), "per_call_us": round(per_call, 2)}
+            print(f"{name:<16} {kind:<8} compiled {compiled:>8.2f}us  built per call {per_call:>9.2f}us")
+    return results
+
+
+def bench_rejections(app, iterations):
+    from src.utils.query_budget import QueryRecorder
+
+    client = app.test_client()
+    requests = {
+        "invalid": {"json": PAYLOADS["CREATE_TEAM"]["invalid"]},
+        "oversized": {"data": json.dumps({"name": "x", "notes": "n" * 64 * 1024}), "content_type": "application/json"},
+    }
+    results = {}
+    for kind, kwargs in requests.items():
+        with QueryRecorder() as recorder:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                response = client.post("/teams/", base_url="https://localhost", **kwargs)
+            elapsed = time.perf_counter() - started
+        assert response.status_code in (400, 413), response.status_code
+        results[kind] = {
+            "status": response.status_code,
+            "requests_per_second": round(iterations / elapsed, 1),
+            "sql_statements": recorder.count,
+        }
+        print(
+            f"POST /teams/ {kind:<10} {response.status_code} {iterations / elapsed:>9.1f} req/s, "
+            f"{recorder.count} SQL statements"
+        )
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="soccer-validation-")
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'validation.db')}"
+
+    from config import TestingConfig
+    from src import create_app
+
+    TestingConfig.JOBS_WORKER_ENABLED = False
+    app = create_app("testing")
+
+    print("Validation cost per payload:")
+    validators = bench_validators(args.iterations)
+    print("\nRejected requests:")
+    rejections = bench_rejections(app, args.requests)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"validators": validators, "rejections": rejections}, f, indent=2)
+    shutil.rmtree(workdir, ignore_errors=True)
+    failed = [kind for kind, result in rejections.items() if result["sql_statements"]]
+    for kind in failed:
+        print(f"FAIL {kind} requests reached the database")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
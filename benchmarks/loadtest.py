@@ -0,0 +1,241 @@
+"""
+Mixed-workload load generator.
+
+Replays a weighted mix of production-like scenarios against a running server
+(login, protected calls, team reads, roster adds and team edits/creates) from
+``--concurrency`` virtual users for ``--duration`` seconds, and reports
+throughput, latency percentiles and error rates per interval and per scenario.
+Only the standard library is used, so it runs fully offline.
+
+    flask --app main seed --users 20000 --teams 2000 --memberships 100000
+    python main.py serve --workers 4 &
+    python -m benchmarks.loadtest --users 20000 --teams 2000 --concurrency 32 --duration 60
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_MIX = {
+    "login": 2,
+    "protected": 15,
+    "get_teams": 3,
+    "get_team": 50,
+    "add_player": 15,
+    "edit_team": 10,
+    "create_team": 5,
+}
+
+_team_names = itertools.count()
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}'. Choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+class Recorder:
+    """Collects ``(timestamp, scenario, latency, outcome)`` samples from every virtual user."""
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def record(self, scenario, latency, outcome):
+        with self._lock:
+            self.samples.append((time.monotonic(), scenario, latency, outcome))
+
+    def since(self, start):
+        with self._lock:
+            return [sample for sample in self.samples if sample[0] >= start]
+
+
+def summarize(samples, elapsed):
+    latencies = [latency for _, _, latency, _ in samples]
+    errors = sum(1 for *_, outcome in samples if outcome == "error")
+    client_errors = sum(1 for *_, outcome in samples if outcome == "4xx")
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "client_error_rate": round(client_errors / len(samples), 4) if samples else 0.0,
+    }
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, args, mix, recorder, deadline, seed):
+        super().__init__(daemon=True)
+        self.args = args
+        self.recorder = recorder
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+        self.url = urlsplit(args.url)
+        self.connection = None
+        self.cookie = None
+
+    def request(self, method, path, body=None):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(
+                self.url.hostname, self.url.port or 80, timeout=self.args.timeout
+            )
+
+        headers = {"Accept-Encoding": "gzip"}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            raise
+
+        set_cookie = response.getheader("Set-Cookie")
+        if set_cookie and set_cookie.startswith("token="):
+            self.cookie = set_cookie.split(";", 1)[0]
+        return response.status
+
+    def scenario_request(self, name):
+        args, rng = self.args, self.rng
+        team_id = rng.randint(1, args.teams)
+
+        if name == "login":
+            user_id = rng.randint(1, args.users)
+            return "POST", "/auth/login", {"user": f"user{user_id}@{args.email_domain}", "password": args.password}
+        if name == "protected":
+            return "GET", "/auth/protected", None
+        if name == "get_teams":
+            return "GET", "/teams/", None
+        if name == "get_team":
+            return "GET", f"/teams/{team_id}", None
+        if name == "add_player":
+            return "POST", f"/teams/{team_id}/players", {"user_id": rng.randint(1, args.users)}
+        if name == "edit_team":
+            return "PUT", f"/teams/{team_id}", {"notes": f"Load test edit {rng.random():.6f}"}
+        return "POST", "/teams/", {"name": f"Load test {os.getpid()}-{next(_team_names)}"}
+
+    def execute(self, name):
+        method, path, body = self.scenario_request(name)
+        start = time.perf_counter()
+        try:
+            status = self.request(method, path, body)
+        except (OSError, http.client.HTTPException):
+            outcome = "error"
+        else:
+            outcome = "error" if status >= 500 else "4xx" if status >= 400 else "ok"
+        self.recorder.record(name, time.perf_counter() - start, outcome)
+
+    def run(self):
+        # Cada usuário virtual começa autenticado, como um cliente real
+        self.execute("login")
+        while time.monotonic() < self.deadline:
+            self.execute(self.rng.choices(self.scenarios, self.weights)[0])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--interval", type=float, default=5, help="Seconds between progress reports")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Scenario weights, e.g. get_team=50,add_player=10")
+    parser.add_argument("--users", type=int, default=1_000, help="Seeded user ids are 1..N")
+    parser.add_argument("--teams", type=int, default=100, help="Seeded team ids are 1..N")
+    parser.add_argument("--email-domain", default="seed.local")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + args.duration
+
+    users = [
+        VirtualUser(args, args.mix, recorder, deadline, args.seed + i)
+        for i in range(args.concurrency)
+    ]
+    for user in users:
+        user.start()
+
+    print(f"{'t(s)':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    timeline = []
+    window_start = started
+    while time.monotonic() < deadline:
+        time.sleep(max(0.0, min(args.interval, deadline - time.monotonic())))
+        now = time.monotonic()
+        window = summarize(recorder.since(window_start), now - window_start)
+        window["t"] = round(now - started, 1)
+        timeline.append(window)
+        window_start = now
+        print(
+            f"{window['t']:>6.1f} {window['throughput_rps']:>8.1f} {window['p50_ms']:>8.2f} "
+            f"{window['p95_ms']:>8.2f} {window['p99_ms']:>8.2f} {window['error_rate']:>7.2%}"
+        )
+
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - started
+
+    samples = recorder.samples
+    report = {
+        "concurrency": args.concurrency,
+        "duration": round(elapsed, 1),
+        "mix": args.mix,
+        "total": summarize(samples, elapsed),
+        "scenarios": {
+            name: summarize([sample for sample in samples if sample[1] == name], elapsed)
+            for name in args.mix
+        },
+        "timeline": timeline,
+    }
+
+    print(f"\n{'scenario':<12} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'4xx':>7}")
+    for name, stats in list(report["scenarios"].items()) + [("total", report["total"])]:
+        print(
+            f"{name:<12} {stats['requests']:>9} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['error_rate']:>7.2%} "
+            f"{stats['client_error_rate']:>7.2%}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["total"]["error_rate"] > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,145 @@ class Config:
     JWT_COOKIE_SECURE = True
     JWT_COOKIE_HTTPONLY = True
     JWT_COOKIE_SAMESITE = "Strict"
+
+    # Servidor multi-processo (python main.py serve)
+    SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    SERVER_GRACEFUL_TIMEOUT = 30
+    SERVER_KEEPALIVE_TIMEOUT = 5
+
+    # Executa views bloqueantes (bcrypt, escritas) em um pool de threads limitado
+    OFFLOAD_ENABLED = os.getenv("OFFLOAD_ENABLED", "false").lower() == "true"
+    # A soma dos limites por classe não pode passar do tamanho do pool
+    OFFLOAD_CONCURRENCY = {
+        "auth": os.cpu_count() or 1,
+        "writes": 4,
+        # Upload de imagens: hash e gravação em disco de até MEDIA_MAX_UPLOAD_SIZE
+        "uploads": 2,
+    }
+    OFFLOAD_MAX_WORKERS = sum(OFFLOAD_CONCURRENCY.values())
+    OFFLOAD_QUEUE_TIMEOUT = 10
+
+    # Controle de admissão: limite de concorrência adaptativo (AIMD) por classe de rota;
+    # o excesso recebe 503 imediato com Retry-After
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+    ADMISSION_LIMITS = {
+        "auth": {"initial": os.cpu_count() or 1, "min": 1, "max": 4 * (os.cpu_count() or 1), "latency_target": 1.0},
+        "writes": {"initial": 16, "min": 1, "max": 64, "latency_target": 0.25},
+        "uploads": {"initial": 4, "min": 1, "max": 16, "latency_target": 2.0},
+        "reads": {"initial": 64, "min": 4, "max": 512, "latency_target": 0.1},
+    }
+    ADMISSION_BACKOFF = 0.9
+    ADMISSION_RETRY_AFTER = 1
+    # Endpoints ou blueprints nunca limitados (health check, métricas, documentação)
+    ADMISSION_EXEMPT_ENDPOINTS = ["helth_check", "metrics", "slow_queries", "static", "flasgger"]
+
+    # Group commit: as views de escrita são aplicadas por uma única thread em
+    # transações agrupadas (um fsync por lote no SQLite)
+    GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() == "true"
+    GROUP_COMMIT_MAX_BATCH_SIZE = 64
+    GROUP_COMMIT_MAX_DELAY_MS = 2
+
+    # Tamanho máximo do corpo: limite geral do Flask (inclui lotes de /matches/)
+    # e o das rotas com @validate_json, verificado antes de ler o corpo. O
+    # upload de imagens é a exceção: maior que MAX_CONTENT_LENGTH, só vale
+    # porque a view troca request.max_content_length por MEDIA_MAX_UPLOAD_SIZE
+    # antes de ler o corpo (um proxy na frente precisa aceitar esse tamanho)
+    MAX_CONTENT_LENGTH = 2 * 1024 * 1024
+    REQUEST_MAX_CONTENT_LENGTH = 16 * 1024
+
+    # Imagens das equipes em disco local (POST /teams/<id>/images/<kind>),
+    # com nome pelo SHA-256 do conteúdo; as variantes de tamanho fixo são
+    # geradas pela fila de jobs e servidas em /media/images com cache longo
+    MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
+    # Substitui MAX_CONTENT_LENGTH só em POST /teams/<id>/images/<kind>
+    MEDIA_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+    MEDIA_MAX_PIXELS = 40_000_000
+    MEDIA_VARIANTS = {
+        "profile": {"thumb": (96, 96), "medium": (256, 256)},
+        "banner": {"thumb": (480, 120), "large": (1500, 375)},
+    }
+    MEDIA_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+    # Idempotency-Key em POST /teams/, POST /users/ e POST /teams/<id>/players
+    IDEMPOTENCY_TTL = 24 * 60 * 60
+    IDEMPOTENCY_WAIT_TIMEOUT = 10
+    IDEMPOTENCY_LOCK_TIMEOUT = 60
+    IDEMPOTENCY_PURGE_INTERVAL = 300
+
+    # Ranking Elo calculado a partir dos resultados em /matches/
+    RANKING_BASE_RATING = 1000
+    RANKING_K_FACTOR = 32
+    RANKING_HOME_ADVANTAGE = 0
+    MATCHES_MAX_BATCH = 10_000
+    # Pontos por resposta de /teams/<id>/ranking-history (a resolução é ampliada se preciso)
+    RANKING_HISTORY_MAX_POINTS = 500
+
+    # GETs idênticos e simultâneos (@coalesce) compartilham uma única execução
+    SINGLE_FLIGHT_ENABLED = True
+    SINGLE_FLIGHT_TIMEOUT = 5
+
+    # Snapshot das equipes em arquivo mmap compartilhado pelos workers
+    # (GET /teams/ e GET /teams/<id>); reconstruído após escritas
+    TEAM_SNAPSHOT_ENABLED = True
+    TEAM_SNAPSHOT_DIR = os.getenv("TEAM_SNAPSHOT_DIR")
+    # Snapshot desatualizado: serve o anterior + as equipes alteradas (até
+    # TEAM_SNAPSHOT_MAX_DELTA e até essa fração das equipes do snapshot; acima
+    # disso ler o banco custa menos) e reconstrói uma vez após o intervalo
+    TEAM_SNAPSHOT_REBUILD_DELAY = 1.0
+    TEAM_SNAPSHOT_MAX_DELTA = 1000
+    TEAM_SNAPSHOT_MAX_DELTA_SHARE = 0.25
+
+    # Fila de jobs em segundo plano (tabela jobs); os workers rodam em cada
+    # processo do servidor ou à parte com "flask jobs worker"
+    JOBS_WORKER_ENABLED = os.getenv("JOBS_WORKER_ENABLED", "true").lower() == "true"
+    JOBS_CONCURRENCY = 2
+    JOBS_POLL_INTERVAL = 0.5
+    JOBS_MAX_ATTEMPTS = 5
+    JOBS_BACKOFF_BASE = 2
+    JOBS_BACKOFF_MAX = 300
+    JOBS_LOCK_TIMEOUT = 300
+    JOBS_MAINTENANCE_INTERVAL = 60
+    JOBS_RETENTION = 7 * 24 * 60 * 60
+
+    # Compressão de respostas (gzip e brotli, quando instalado)
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+    COMPRESS_MIMETYPES = ["application/json", "text/html", "text/plain", "text/css", "application/javascript"]
+    COMPRESS_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+    # Métricas em /metrics (formato Prometheus); com vários workers os valores
+    # são combinados através deste diretório
+    METRICS_ENABLED = True
+    METRICS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    METRICS_FLUSH_INTERVAL = 5
+
+    # Orçamento de consultas SQL por rota (ver @query_budget nas rotas)
+    QUERY_BUDGET_ENABLED = False
+    QUERY_BUDGET_MODE = "log"
+    QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = 3
+
+    # Log de consultas lentas com EXPLAIN QUERY PLAN; o relatório em
+    # /debug/slow-queries expõe o SQL e não tem autenticação (nunca em produção)
+    SLOW_QUERY_LOG_ENABLED = True
+    SLOW_QUERY_REPORT_ENABLED = True
+    SLOW_QUERY_THRESHOLD_MS = 100
+    SLOW_QUERY_EXPLAIN = True
+    SLOW_QUERY_TOP_N = 20
+    SLOW_QUERY_MAX_STATEMENTS = 1000
+
+    # Server-Sent Events de alterações de equipes (/teams/events)
+    EVENTS_POLL_INTERVAL = 0.25
+    EVENTS_HEARTBEAT_INTERVAL = 15
+    EVENTS_QUEUE_SIZE = 100
+    EVENTS_REPLAY_LIMIT = 1000
+    EVENTS_MAX_STREAM_SECONDS = 300
+    EVENTS_RETRY_MS = 3000
+
+    # Profiling sob demanda (header X-Profile ou ?_profile=); nunca em produção
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_INTERVAL = 0.001
     
     # Swagger Configuration
     SWAGGER = {
@@ -47,6 +186,10 @@ class Config:
                 'name': 'Teams',
                 'description': 'Operações relacionadas a equipes'
             },
+            {
+                'name': 'Matches',
+                'description': 'Resultados de partidas e ranking das equipes'
+            },
             {
                 'name': 'Users',
                 'description': 'Operações relacionadas a usuários'
@@ -63,6 +206,8 @@ class DevelopmentConfig(Config):
     """Development configuration"""
 
     DEBUG = True
+    QUERY_BUDGET_ENABLED = True
+    PROFILING_ENABLED = True
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(Config.BASE_DIR, "src", "database", Config.DATABASE_NAME)}'
     JWT_COOKIE_SECURE = False
 
@@ -71,14 +216,27 @@ class ProductionConfig(Config):
     """Production configuration"""
 
     DEBUG = False
+    PROFILING_ENABLED = False
+    SLOW_QUERY_REPORT_ENABLED = False
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
     SQLALCHEMY_DATABASE_URI = os.getenv(
         "DATABASE_URL",
         f'sqlite:///{os.path.join(Config.BASE_DIR, "src", "database", Config.DATABASE_NAME)}',
     )
 
+
+class TestingConfig(Config):
+    """Testing and benchmark configuration"""
+
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite://")
+    JWT_COOKIE_SECURE = False
+
+
 # Mapeamento de ambientes
 config = {
     "development": DevelopmentConfig,
     "production": ProductionConfig,
+    "testing": TestingConfig,
     "default": DevelopmentConfig,
 }
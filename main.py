@@ -1,4 +1,7 @@
 from src import create_app
+from src.server import PreforkServer
+import argparse
+import logging
 import os
 
 app = create_app()
@@ -9,9 +12,41 @@ def helth_check():
     return {"message": "Football API is running", "status": "healthy"}
 
 
-if __name__ == "__main__":
-    app.run(
-        debug=app.config.get("DEBUG", False),
-        host=os.getenv("HOST", "0.0.0.0"),
-        port=os.getenv("PORT", 5000)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Soccer MVP API")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the multi-process production server")
+    serve_parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    serve_parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 5000)))
+    serve_parser.add_argument(
+        "--workers", type=int, default=app.config["SERVER_WORKERS"],
+        help="Number of worker processes (default: number of CPUs)",
     )
+    serve_parser.add_argument(
+        "--graceful-timeout", type=float, default=app.config["SERVER_GRACEFUL_TIMEOUT"],
+        help="Seconds to wait for in-flight requests on shutdown",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+        PreforkServer(
+            app,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            graceful_timeout=args.graceful_timeout,
+            keepalive_timeout=app.config["SERVER_KEEPALIVE_TIMEOUT"],
+        ).run()
+    else:
+        app.run(
+            debug=app.config.get("DEBUG", False),
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=os.getenv("PORT", 5000)
+        )
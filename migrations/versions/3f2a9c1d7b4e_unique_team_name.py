@@ -0,0 +1,31 @@
+"""unique index on teams.name
+
+Revision ID: 3f2a9c1d7b4e
+Revises: 
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b4e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_team passa a depender do índice (INSERT ... ON CONFLICT (name));
+    # nomes duplicados precisam ser resolvidos antes
+    duplicates = op.get_bind().execute(
+        sa.text("SELECT name FROM teams GROUP BY name HAVING COUNT(*) > 1 LIMIT 10")
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Rename the duplicated team names before upgrading: {duplicates}")
+    op.create_index('uq_teams_name', 'teams', ['name'], unique=True, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('uq_teams_name', table_name='teams', if_exists=True)
@@ -0,0 +1,25 @@
+"""version column on teams
+
+Revision ID: 8c41e7a2d5f0
+Revises: 3f2a9c1d7b4e
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41e7a2d5f0'
+down_revision = '3f2a9c1d7b4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('teams', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('teams') as batch_op:
+        batch_op.drop_column('version')
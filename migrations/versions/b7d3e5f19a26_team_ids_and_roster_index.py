@@ -0,0 +1,30 @@
+"""never reuse team ids; index team_players.team_id
+
+Revision ID: b7d3e5f19a26
+Revises: 8c41e7a2d5f0
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e5f19a26'
+down_revision = '8c41e7a2d5f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # AUTOINCREMENT só pode ser definido recriando a tabela no SQLite
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('teams', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+    op.create_index('ix_team_players_team_id', 'team_players', ['team_id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_team_players_team_id', 'team_players', if_exists=True)
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('teams', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
@@ -0,0 +1,25 @@
+"""unrounded ranking rating on teams
+
+Revision ID: d4a8f2c61e07
+Revises: b7d3e5f19a26
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8f2c61e07'
+down_revision = 'b7d3e5f19a26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('teams', sa.Column('ranking_rating', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('teams') as batch_op:
+        batch_op.drop_column('ranking_rating')
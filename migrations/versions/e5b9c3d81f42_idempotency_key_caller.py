@@ -0,0 +1,34 @@
+"""caller on idempotency_keys
+
+Revision ID: e5b9c3d81f42
+Revises: d4a8f2c61e07
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9c3d81f42'
+down_revision = 'd4a8f2c61e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # As respostas guardadas não têm dono conhecido: descartadas em vez de
+    # repetidas para qualquer chamador (duram no máximo IDEMPOTENCY_TTL)
+    op.execute('DELETE FROM idempotency_keys')
+    with op.batch_alter_table('idempotency_keys') as batch_op:
+        batch_op.add_column(sa.Column('caller', sa.String(length=100), server_default='', nullable=False))
+        batch_op.drop_constraint('unique_idempotency_key', type_='unique')
+        batch_op.create_unique_constraint('unique_idempotency_key', ['key', 'caller', 'method', 'path'])
+
+
+def downgrade():
+    op.execute('DELETE FROM idempotency_keys')
+    with op.batch_alter_table('idempotency_keys') as batch_op:
+        batch_op.drop_constraint('unique_idempotency_key', type_='unique')
+        batch_op.create_unique_constraint('unique_idempotency_key', ['key', 'method', 'path'])
+        batch_op.drop_column('caller')
@@ -4,9 +4,25 @@ from flask import Flask
 from flask_migrate import Migrate
 from flask_cors import CORS
 from src.api import register_routes
+from src.api.teams_route import build_team_snapshot
+from src.commands import register_commands
 from src.database.db import db
 from src.extensions import bcrypt
 from src.extensions import login_manager
+from src.utils.offload import init_offload
+from src.utils.compression import init_compression
+from src.utils.admission import init_admission_control
+from src.utils.events import init_events
+from src.utils.group_commit import init_group_commit
+from src.utils.idempotency import init_idempotency
+from src.utils.job_queue import init_job_queue
+from src.utils.metrics import init_metrics
+from src.utils.profiling import init_profiling
+from src.utils.query_budget import init_query_budget
+from src.utils.single_flight import init_single_flight
+from src.utils.slow_queries import init_slow_query_log
+from src.utils.snapshot import init_team_snapshot
+from src.utils.validation import init_request_validation
 from dotenv import load_dotenv
 from config import config
 
@@ -23,6 +39,13 @@ def create_app(config_name=None):
     app = Flask(__name__)
     
     app.config.from_object(config[config_name])
+
+    # Registrado primeiro para que a latência medida inclua os demais hooks
+    if app.config["METRICS_ENABLED"]:
+        init_metrics(app)
+
+    if app.config["ADMISSION_ENABLED"]:
+        init_admission_control(app)
     
     # Configurar CORS
     CORS(app, 
@@ -33,8 +56,18 @@ def create_app(config_name=None):
              "http://127.0.0.1:8000",
          ],
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-         allow_headers=['Content-Type', 'Authorization'],
+         allow_headers=['Content-Type', 'Authorization', 'If-Match'],
+         expose_headers=['ETag'],
          supports_credentials=True)
+
+    if app.config["QUERY_BUDGET_ENABLED"]:
+        init_query_budget(app)
+
+    if app.config["SLOW_QUERY_LOG_ENABLED"]:
+        init_slow_query_log(app)
+
+    if app.config["COMPRESS_ENABLED"]:
+        init_compression(app)
     
     login_manager.init_app(app)
     bcrypt.init_app(app)
@@ -64,10 +97,39 @@ def create_app(config_name=None):
     with app.app_context():
         from src.models.teams import Team
         from src.models.team_players import TeamPlayer
+        from src.models.team_changes import TeamChange
+        from src.models.idempotency_keys import IdempotencyKey
+        from src.models.matches import Match
+        from src.models.ranking_history import RankingHistoryBlock
+        from src.models.jobs import Job
         # from src.models.user import User  # Se existir
         db.create_all()
     
+    init_events(app)
+    init_job_queue(app, start_workers=app.config["JOBS_WORKER_ENABLED"])
     register_routes(app)
+    register_commands(app)
+
+    if app.config["TEAM_SNAPSHOT_ENABLED"]:
+        init_team_snapshot(app, build_team_snapshot)
+
+    if app.config["SINGLE_FLIGHT_ENABLED"]:
+        init_single_flight(app)
+
+    if app.config["GROUP_COMMIT_ENABLED"]:
+        init_group_commit(app)
+
+    if app.config["OFFLOAD_ENABLED"]:
+        init_offload(app)
+
+    init_idempotency(app)
+
+    # Por último: a validação envolve as demais camadas e rejeita corpos
+    # inválidos antes de qualquer acesso ao banco
+    init_request_validation(app)
+
+    if app.config["PROFILING_ENABLED"] and config_name != "production":
+        init_profiling(app)
 
     return app
     
\ No newline at end of file
@@ -1,8 +1,12 @@
 from .users_route import users_bp
 from .auth_route import auth_bp
 from .teams_route import teams_bp
+from .matches_route import matches_bp
+from .media_route import media_bp
 
 def register_routes(app):
     app.register_blueprint(users_bp)
     app.register_blueprint(auth_bp)
-    app.register_blueprint(teams_bp)
\ No newline at end of file
+    app.register_blueprint(teams_bp)
+    app.register_blueprint(matches_bp)
+    app.register_blueprint(media_bp)
\ No newline at end of file
@@ -5,6 +5,8 @@ from src.extensions import login_manager
 from src.database.db import db
 from datetime import datetime, timedelta
 from src.utils.helper import token_required
+from src.utils.offload import offload
+from src.utils.query_budget import query_budget
 import jwt
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
@@ -18,11 +20,14 @@ def load_user(user_id):
 
 @auth_bp.route("/protected", methods=["GET"])
 @token_required
+@query_budget(0)
 def protected_route(user_id):
     return jsonify({"message": "Access granted", "user_id": user_id})
 
 
 @auth_bp.route("/login", methods=["POST"])
+@offload("auth")
+@query_budget(1)
 def login():
     """
     Documentação
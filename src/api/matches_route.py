@@ -0,0 +1,179 @@
+from datetime import datetime, timezone
+from flask import Blueprint, current_app, request, jsonify
+from src.models.teams import Team
+from src.database.db import db
+from src.utils.offload import offload
+from src.utils.query_budget import query_budget
+from src.utils.ranking import ingest_matches
+
+matches_bp = Blueprint("matches", __name__, url_prefix="/matches")
+
+MATCH_FIELDS = ("home_team_id", "away_team_id", "home_score", "away_score", "played_at")
+
+
+def _validation_error(message):
+    return jsonify({
+        "error": "Validation error",
+        "message": message
+    }), 400
+
+
+def _parse_match(index, data):
+    """Valida uma partida do lote; retorna (partida, mensagem de erro)."""
+    if not isinstance(data, dict):
+        return None, f"matches[{index}] deve ser um objeto"
+    missing = [field for field in MATCH_FIELDS if data.get(field) is None]
+    if missing:
+        return None, f"matches[{index}]: campos obrigatórios ausentes: {', '.join(missing)}"
+
+    for field in MATCH_FIELDS[:4]:
+        value = data[field]
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            return None, f"matches[{index}].{field} deve ser um número inteiro não negativo"
+    if data["home_team_id"] == data["away_team_id"]:
+        return None, f"matches[{index}]: uma equipe não pode jogar contra si mesma"
+
+    try:
+        played_at = datetime.fromisoformat(str(data["played_at"]))
+    except ValueError:
+        return None, f"matches[{index}].played_at deve estar no formato ISO 8601"
+    # Armazenado em UTC sem fuso, como as demais datas
+    if played_at.tzinfo is not None:
+        played_at = played_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return {
+        "home_team_id": data["home_team_id"],
+        "away_team_id": data["away_team_id"],
+        "home_score": data["home_score"],
+        "away_score": data["away_score"],
+        "played_at": played_at,
+        "create_date": datetime.utcnow(),
+    }, None
+
+
+@matches_bp.route("/", methods=["POST"])
+@offload("writes")
+@query_budget(10)
+def create_matches():
+    """
+    Registra resultados de partidas em lote e atualiza o ranking das equipes
+    ---
+    tags:
+      - Matches
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              matches:
+                type: array
+                description: Resultados das partidas (até MATCHES_MAX_BATCH por requisição)
+                items:
+                  type: object
+                  properties:
+                    home_team_id:
+                      type: integer
+                    away_team_id:
+                      type: integer
+                    home_score:
+                      type: integer
+                    away_score:
+                      type: integer
+                    played_at:
+                      type: string
+                      format: date-time
+                  required:
+                    - home_team_id
+                    - away_team_id
+                    - home_score
+                    - away_score
+                    - played_at
+            required:
+              - matches
+    responses:
+      201:
+        description: Partidas registradas; o ranking é atualizado incrementalmente ou recalculado quando há partidas anteriores ao histórico
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                message:
+                  type: string
+                data:
+                  type: object
+                  properties:
+                    matches_created:
+                      type: integer
+                    teams_updated:
+                      type: integer
+                    ranking_mode:
+                      type: string
+                      enum: [incremental, recompute]
+      400:
+        description: Validation error
+      404:
+        description: Equipe não encontrada
+      500:
+        description: Database error
+    """
+    payload = request.get_json(silent=True)
+    if (
+        not isinstance(payload, dict)
+        or not isinstance(payload.get("matches"), list)
+        or not payload["matches"]
+    ):
+        return jsonify({
+            "error": "Invalid request",
+            "message": "Informações Ausentes. O campo 'matches' deve ser uma lista não vazia."
+        }), 400
+
+    max_batch = current_app.config["MATCHES_MAX_BATCH"]
+    if len(payload["matches"]) > max_batch:
+        return _validation_error(f"No máximo {max_batch} partidas por requisição")
+
+    matches = []
+    for index, data in enumerate(payload["matches"]):
+        match, error = _parse_match(index, data)
+        if error:
+            return _validation_error(error)
+        matches.append(match)
+
+    team_ids = {m["home_team_id"] for m in matches} | {m["away_team_id"] for m in matches}
+    found = set(db.session.scalars(db.select(Team.id).where(Team.id.in_(team_ids))))
+    missing = sorted(team_ids - found)
+    if missing:
+        return jsonify({
+            "error": "Team not found",
+            "message": f"Equipes não encontradas: {', '.join(map(str, missing))}"
+        }), 404
+
+    config = current_app.config
+    try:
+        mode, teams_updated = ingest_matches(
+            db.session, matches,
+            base_rating=config["RANKING_BASE_RATING"],
+            k=config["RANKING_K_FACTOR"],
+            home_advantage=config["RANKING_HOME_ADVANTAGE"],
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return jsonify({
+            "error": "Database error",
+            "message": "Falha ao registrar partidas. Por favor, tente novamente."
+        }), 500
+
+    return jsonify({
+        "success": True,
+        "message": "Partidas registradas com sucesso",
+        "data": {
+            "matches_created": len(matches),
+            "teams_updated": teams_updated,
+            "ranking_mode": mode,
+        }
+    }), 201
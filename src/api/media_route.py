@@ -0,0 +1,91 @@
+import os
+from flask import Blueprint, current_app, jsonify, send_file
+from src.utils import media
+from src.utils.query_budget import query_budget
+
+media_bp = Blueprint("media", __name__, url_prefix="/media")
+
+
+def _not_found():
+    return jsonify({
+        "error": "Not found",
+        "message": "Imagem não encontrada"
+    }), 404
+
+
+def _find_original(directory):
+    for ext in media.MIMETYPES:
+        path = os.path.join(directory, media.original_filename(ext))
+        if os.path.exists(path):
+            return path, ext
+    return None, None
+
+
+@media_bp.route("/images/<digest>/<filename>", methods=["GET"])
+@query_budget(0)
+def get_image(digest, filename):
+    """
+    Obter uma imagem enviada ou uma de suas variantes
+    ---
+    tags:
+      - Teams
+    description: |
+      O nome do arquivo é derivado do conteúdo, então a resposta nunca muda:
+      vai com Cache-Control de um ano (immutable) e ETag, aceita
+      If-None-Match e Range, e o corpo é enviado com sendfile pelo servidor
+      (src/server.py). Uma variante que ainda não foi gerada entrega o
+      original sem cache.
+    parameters:
+      - in: path
+        name: digest
+        required: true
+        schema:
+          type: string
+        description: SHA-256 do arquivo original
+      - in: path
+        name: filename
+        required: true
+        schema:
+          type: string
+          example: profile-thumb-96x96.webp
+        description: original.<ext> ou <kind>-<variante>-<largura>x<altura>.webp
+    responses:
+      200:
+        description: Conteúdo da imagem
+      206:
+        description: Parte da imagem (Range)
+      304:
+        description: Não modificada (If-None-Match)
+      404:
+        description: Imagem não encontrada
+    """
+    if not media.DIGEST_RE.fullmatch(digest) or not media.FILENAME_RE.fullmatch(filename):
+        return _not_found()
+
+    config = current_app.config
+    directory = media.image_dir(config["MEDIA_ROOT"], digest)
+    path = os.path.join(directory, filename)
+    ext = filename.rsplit(".", 1)[1]
+    immutable = os.path.exists(path)
+    if not immutable:
+        if filename.startswith("original."):
+            return _not_found()
+        # Variante ainda na fila: o original, revalidado até a variante existir
+        path, ext = _find_original(directory)
+        if path is None:
+            return _not_found()
+
+    response = send_file(
+        path,
+        mimetype=media.MIMETYPES[ext],
+        conditional=True,
+        etag=f"{digest}-{os.path.basename(path)}",
+        max_age=config["MEDIA_CACHE_MAX_AGE"] if immutable else None,
+    )
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,109 @@
+"""
+Schemas JSON dos corpos de requisição, compilados na importação e aplicados
+com @validate_json. "x-message" traz a mensagem devolvida na falha, por
+palavra-chave quando a mesma propriedade tem mensagens diferentes.
+"""
+from src.utils.validation import compile_schema
+
+JSON_REQUIRED_MESSAGE = "Informações Ausentes. JSON data é obrigatório."
+
+_nullable_text = {"type": ["string", "null"]}
+
+TEAM_FIELDS = {
+    "name": {
+        "type": "string",
+        "minLength": 1,
+        # Ao menos 2 caracteres além dos espaços nas pontas
+        "pattern": r"\S[\s\S]*\S",
+        "maxLength": 255,
+        "x-message": {
+            "type": "O campo 'name' deve ser um texto",
+            "minLength": "O campo 'name' é obrigatório e não pode estar vazio",
+            "pattern": "O nome da equipe deve ter pelo menos 2 caracteres",
+            "maxLength": "O nome da equipe não pode exceder 255 caracteres",
+        },
+    },
+    "description": {
+        **_nullable_text,
+        "maxLength": 350,
+        "x-message": "A descrição não pode exceder 350 caracteres",
+    },
+    "team_profile_image": {
+        **_nullable_text,
+        "maxLength": 255,
+        "x-message": "A URL da imagem de perfil não pode exceder 255 caracteres",
+    },
+    "team_banner_image": {
+        **_nullable_text,
+        "maxLength": 255,
+        "x-message": "A URL da imagem de banner não pode exceder 255 caracteres",
+    },
+    "captain_id": {
+        "type": ["integer", "null"],
+        "x-message": "O ID do capitão deve ser um número inteiro válido",
+    },
+    "notes": {
+        **_nullable_text,
+        "maxLength": 350,
+        "x-message": "As notas não podem exceder 350 caracteres",
+    },
+}
+
+CREATE_TEAM = compile_schema({
+    "type": "object",
+    "required": ["name"],
+    "properties": TEAM_FIELDS,
+    "x-message": {
+        "type": JSON_REQUIRED_MESSAGE,
+        "required": "O campo 'name' é obrigatório e não pode estar vazio",
+    },
+})
+
+EDIT_TEAM = compile_schema({
+    "type": "object",
+    "minProperties": 1,
+    "properties": TEAM_FIELDS,
+    "x-message": {
+        "type": JSON_REQUIRED_MESSAGE,
+        "minProperties": JSON_REQUIRED_MESSAGE,
+    },
+})
+
+ADD_TEAM_PLAYER = compile_schema({
+    "type": "object",
+    "required": ["user_id"],
+    "properties": {
+        "user_id": {
+            "type": "integer",
+            "minimum": 1,
+            "x-message": "O ID do usuário deve ser um número inteiro válido",
+        },
+    },
+    "x-message": {
+        "type": JSON_REQUIRED_MESSAGE,
+        "required": "É obrigatório fornecer um usuário válido.",
+    },
+})
+
+USER_FIELDS = {
+    "name": {"type": "string", "minLength": 1, "maxLength": 255, "x-message": "Name must be 1 to 255 characters"},
+    "email": {"type": "string", "minLength": 3, "maxLength": 120, "x-message": "Email must be 3 to 120 characters"},
+    "password": {"type": "string", "minLength": 1, "maxLength": 128, "x-message": "Password must be 1 to 128 characters"},
+    "birth": {**_nullable_text, "maxLength": 10, "x-message": "Birth must be at most 10 characters"},
+}
+
+CREATE_USER = compile_schema({
+    "type": "object",
+    "required": ["name", "email", "password"],
+    "properties": USER_FIELDS,
+    "x-message": {
+        "type": "JSON data is required",
+        "required": "Missing required fields",
+    },
+})
+
+EDIT_USER = compile_schema({
+    "type": "object",
+    "properties": USER_FIELDS,
+    "x-message": {"type": "JSON data is required"},
+})
@@ -1,20 +1,292 @@
+import logging
+from collections import defaultdict
 from datetime import datetime
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from src.models.ranking_history import RankingHistoryBlock
 from src.models.teams import Team
+from src.models.team_changes import TeamChange, changes_cursor_supported, record_team_changes
 from src.models.team_players import TeamPlayer
 from src.models.user import User
+from src.api import schemas
 from src.database.db import db
+from src.utils.admission import admission_exempt
+from src.utils.events import event_stream, team_events
+from src.utils.group_commit import batched_write
+from src.utils.idempotency import idempotent
+from src.utils.job_queue import enqueue
+from src.utils import media
+from src.utils.offload import offload
+from src.utils.query_budget import query_budget
+from src.utils.ranking_history import from_epoch, query_history, to_epoch
+from src.utils.single_flight import coalesce
+from src.utils.snapshot import response_chunk, team_snapshots
+from src.utils.upsert import insert_from_select_or_ignore, insert_or_ignore
+from src.utils.validation import validate_json
+
+logger = logging.getLogger(__name__)
 
 teams_bp = Blueprint("teams", __name__, url_prefix="/teams")
 teamModel = db.select(Team)
 
+TEAM_CHANGES_DEFAULT_LIMIT = 500
+TEAM_CHANGES_MAX_LIMIT = 1000
+INCLUDE_OPTIONS = {"captain", "players"}
+# Ids por consulta IN: o SQLite limita o número de parâmetros por instrução
+INCLUDE_BATCH_SIZE = 500
+# Resposta padrão de GET /teams/<id>, a única guardada no snapshot
+SNAPSHOT_INCLUDES = {"players"}
+# Unidades aceitas em ?resolution= do histórico de ranking, em segundos
+RESOLUTION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _team_summary(team, includes=()):
+    summary = {
+        "team_id": team.id,
+        "name": team.name,
+        "description": team.description,
+        "team_profile_image": team.team_profile_image,
+        "team_banner_image": team.team_banner_image,
+        "captain_id": team.captain_id,
+        "is_active": team.is_active,
+        "ranking_points": team.ranking_points,
+        "members_count": team.members_count,
+        "create_date": team.create_date.isoformat() if team.create_date else None,
+        "update_date": team.update_date.isoformat() if team.update_date else None,
+        "thumbnails": _team_thumbnails(team)
+    }
+    if "captain" in includes:
+        summary["captain"] = _captain_summary(team.captain)
+    if "players" in includes:
+        summary["players"] = _players_list(team)
+    return summary
+
+
+def _team_detail(team, includes=()):
+    detail = {
+        "team_id": team.id,
+        "name": team.name,
+        "description": team.description,
+        "team_profile_image": team.team_profile_image,
+        "team_banner_image": team.team_banner_image,
+        "captain_id": team.captain_id,
+        "notes": team.notes,
+        "is_active": team.is_active,
+        "ranking_points": team.ranking_points,
+        "members_count": team.members_count,
+        "create_date": team.create_date.isoformat() if team.create_date else None,
+        "update_date": team.update_date.isoformat() if team.update_date else None
+    }
+    if "captain" in includes:
+        detail["captain"] = _captain_summary(team.captain)
+    if "players" in includes:
+        detail["players"] = _players_list(team)
+    return detail
+
+
+def _team_thumbnails(team):
+    """Miniaturas das imagens enviadas por upload; None para URLs externas."""
+    variants = current_app.config["MEDIA_VARIANTS"]
+    return {
+        "profile": media.variant_url(team.team_profile_image, "profile", "thumb", variants),
+        "banner": media.variant_url(team.team_banner_image, "banner", "thumb", variants),
+    }
+
+
+def _captain_summary(captain):
+    if captain is None:
+        return None
+    return {
+        "user_id": captain.id,
+        "name": captain.name,
+        "email": captain.email
+    }
+
+
+def _player_entry(user, join_date):
+    return {
+        "user_id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "join_date": join_date.isoformat() if join_date else None
+    }
+
+
+def _players_list(team):
+    return [_player_entry(team_player.user, team_player.create_date) for team_player in team.team_players]
+
+
+def _team_etag(version):
+    return f"v{version}"
+
+
+def _snapshot_etag(version):
+    return "s{}-{}".format(*version)
+
+
+def _if_match_versions():
+    """
+    Versões aceitas pelo If-Match; None sem o header ou com "*". ETags fracas
+    também valem: a compressão enfraquece a ETag da resposta (W/"v3").
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    return {
+        int(tag[1:]) for tag in if_match.as_set(include_weak=True)
+        if tag[:1] == "v" and tag[1:].isdigit()
+    }
+
+
+def _parse_include(default=()):
+    """Lê ?include=captain,players; retorna (relações, mensagem de erro)."""
+    value = request.args.get("include")
+    if value is None:
+        return set(default), None
+    includes = {item.strip() for item in value.split(",") if item.strip()}
+    invalid = includes - INCLUDE_OPTIONS
+    if invalid:
+        return None, f"Valores inválidos em 'include': {', '.join(sorted(invalid))}. Use: {', '.join(sorted(INCLUDE_OPTIONS))}"
+    return includes, None
+
+
+def _in_batches(column, ids):
+    """Condições ``column IN (...)`` com até INCLUDE_BATCH_SIZE ids cada."""
+    ids = list(ids)
+    return [
+        column.in_(ids[start:start + INCLUDE_BATCH_SIZE])
+        for start in range(0, len(ids), INCLUDE_BATCH_SIZE)
+    ]
+
+
+def _load_includes(teams, includes, team_ids=None):
+    """
+    Carrega as relações pedidas das equipes e preenche team.captain e
+    team.team_players sem marcar as equipes como alteradas. ``team_ids`` é
+    o SELECT dos ids de ``teams``, usado como subconsulta (uma consulta por
+    relação, qualquer que seja o número de equipes); sem ele, os ids vão em
+    consultas IN de até INCLUDE_BATCH_SIZE.
+    """
+    if not teams:
+        return
+
+    if "captain" in includes:
+        if team_ids is not None:
+            conditions = [User.id.in_(db.select(Team.captain_id).where(Team.id.in_(team_ids)))]
+        else:
+            conditions = _in_batches(User.id, {team.captain_id for team in teams if team.captain_id})
+        captains = {
+            user.id: user
+            for condition in conditions
+            for user in db.session.scalars(db.select(User).where(condition))
+        }
+        for team in teams:
+            set_committed_value(team, "captain", captains.get(team.captain_id))
+
+    if "players" in includes:
+        if team_ids is not None:
+            conditions = [TeamPlayer.team_id.in_(team_ids)]
+        else:
+            conditions = _in_batches(TeamPlayer.team_id, [team.id for team in teams])
+        players = defaultdict(list)
+        for condition in conditions:
+            team_players = db.session.scalars(
+                db.select(TeamPlayer)
+                .options(joinedload(TeamPlayer.user, innerjoin=True))
+                .where(condition)
+                .order_by(TeamPlayer.id)
+            )
+            for team_player in team_players:
+                players[team_player.team_id].append(team_player)
+        for team in teams:
+            set_committed_value(team, "team_players", players[team.id])
+
+
+def build_team_snapshot():
+    """
+    Documentos do snapshot compartilhado: o envelope e os itens da resposta de
+    GET /teams/ e a resposta de GET /teams/<id> (com jogadores) de cada
+    equipe, com a versão da equipe.
+    """
+    # Linhas do Core em vez de objetos do ORM: o snapshot lê todos os elencos
+    teams = db.session.execute(db.select(Team.__table__).order_by(Team.id)).all()
+    players = defaultdict(list)
+    rows = db.session.execute(
+        db.select(TeamPlayer.team_id, TeamPlayer.create_date, User.id, User.name, User.email)
+        .join(User, TeamPlayer.user_id == User.id)
+        .order_by(TeamPlayer.id)
+    )
+    for row in rows:
+        players[row.team_id].append(_player_entry(row, row.create_date))
+
+    teams_envelope = {
+        "success": True,
+        "message": "Busca realizada com sucesso!"
+    }
+    summaries = {team.id: _team_summary(team) for team in teams}
+    team_documents = {
+        team.id: ({
+            "success": True,
+            "message": "Equipe encontrada com sucesso",
+            "data": {**_team_detail(team), "players": players[team.id]}
+        }, team.version)
+        for team in teams
+    }
+    return teams_envelope, summaries, team_documents
+
+
+def _cursor_unsupported():
+    return jsonify({
+        "error": "Não suportado",
+        "message": "O feed de alterações de equipes só está disponível com SQLite"
+    }), 501
+
+
+def _event_stream_response(team_id=None):
+    if not changes_cursor_supported(db.engine):
+        return _cursor_unsupported()
+
+    # EventSource envia o header ao reconectar; o parâmetro serve a clientes sem header
+    last_event_id = request.headers.get("Last-Event-ID", type=int)
+    if last_event_id is None:
+        last_event_id = request.args.get("last_event_id", type=int)
+    subscription = team_events.subscribe(team_id, last_event_id)
+
+    # O stream pode durar minutos: não segura a conexão (e o lock de leitura) da sessão
+    db.session.close()
+    config = current_app.config
+    return Response(
+        event_stream(
+            subscription,
+            heartbeat_interval=config["EVENTS_HEARTBEAT_INTERVAL"],
+            max_duration=config["EVENTS_MAX_STREAM_SECONDS"],
+            retry_ms=config["EVENTS_RETRY_MS"],
+        ),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @teams_bp.route("/", methods=["POST"])
+@validate_json(schemas.CREATE_TEAM)
+@offload("writes")
+@batched_write
+@idempotent
+@query_budget(4)
 def create_team():
     """
     Cria uma nova equipe
     ---
     tags:
       - Teams
+    parameters:
+      - in: header
+        name: Idempotency-Key
+        required: false
+        schema:
+          type: string
+        description: Chave para repetir a requisição com segurança; a primeira resposta é reenviada
     requestBody:
       required: true
       content:
@@ -95,83 +367,51 @@ def create_team():
                   type: string
                 message:
                   type: string
+      413:
+        description: Corpo da requisição maior que o limite
       500:
         description: Database error
     """
     team_data = request.get_json()
-
-    if not team_data:
-        return jsonify({
-            "error": "Invalid request",
-            "message": "Informações Ausentes. JSON data é obrigatório."
-        }), 400
-    
-    if "name" not in team_data or not team_data.get("name"):
-        return jsonify({
-            "error": "Validation error",
-            "message": "O campo 'name' é obrigatório e não pode estar vazio"
-        }), 400
-    
-    team_name = team_data.get("name").strip()
-    if len(team_name) < 2:
-        return jsonify({
-            "error": "Validation error",
-            "message": "O nome da equipe deve ter pelo menos 2 caracteres"
-        }), 400
-    
-    if len(team_name) > 255:
-        return jsonify({
-            "error": "Validation error",
-            "message": "O nome da equipe não pode exceder 255 caracteres"
-        }), 400
-    
+    team_name = team_data["name"].strip()
     description = team_data.get("description")
-    if description and len(description) > 350:
-        return jsonify({
-            "error": "Validation error",
-            "message": "A descrição não pode exceder 350 caracteres"
-        }), 400
-        
     captain_id = team_data.get("captain_id")
-    if captain_id and not isinstance(captain_id, int):
-        return jsonify({
-            "error": "Validation error",
-            "message": "O ID do capitão deve ser um número inteiro válido"
-        }), 400
-    
     notes = team_data.get("notes")
-    if notes and len(notes) > 350:
-        return jsonify({
-            "error": "Validation error",
-            "message": "As notas não podem exceder 350 caracteres"
-        }), 400
 
     try:
-        # Verificar se já existe uma equipe com o mesmo nome
-        existing_team = db.session.query(Team).filter_by(name=team_name).first()
-        if existing_team:
-            return jsonify({
-                "error": "Conflict",
-                "message": "Já existe uma equipe com este nome. Escolha um nome diferente."
-            }), 409
-
-        new_team = Team(name=team_name)
-        
+        values = {"name": team_name}
         if description:
-            new_team.description = description.strip()
+            values["description"] = description.strip()
         if team_data.get("team_profile_image"):
-            new_team.team_profile_image = team_data.get("team_profile_image")
+            values["team_profile_image"] = team_data.get("team_profile_image")
         if team_data.get("team_banner_image"):
-            new_team.team_banner_image = team_data.get("team_banner_image")
+            values["team_banner_image"] = team_data.get("team_banner_image")
         if captain_id:
-            new_team.captain_id = captain_id
+            values["captain_id"] = captain_id
         if notes:
-            new_team.notes = notes.strip()
+            values["notes"] = notes.strip()
+
+        # O índice único de teams.name decide o conflito na própria inserção
+        columns = Team.__table__.c
+        new_team = insert_or_ignore(
+            db.session, Team.__table__, values, ["name"],
+            returning=(
+                columns.id, columns.name, columns.description, columns.captain_id,
+                columns.is_active, columns.ranking_points, columns.members_count, columns.create_date,
+                columns.version,
+            ),
+        )
+        if new_team is None:
+            db.session.rollback()
+            return jsonify({
+                "error": "Conflict",
+                "message": "Já existe uma equipe com este nome. Escolha um nome diferente."
+            }), 409
 
-        db.session.add(new_team)
+        record_team_changes(db.session.connection(), [(new_team.id, TeamChange.CREATED)])
         db.session.commit()
 
-        return jsonify({
+        response = jsonify({
             "success": True,
             "message": "Equipe criada com sucesso",
             "data": {
@@ -184,7 +424,9 @@ def create_team():
                 "members_count": new_team.members_count,
                 "create_date": new_team.create_date.isoformat() if new_team.create_date else None
             }
-        }), 201
+        })
+        response.set_etag(_team_etag(new_team.version))
+        return response, 201
         
     except Exception as e:
         db.session.rollback()
@@ -195,6 +437,10 @@ def create_team():
 
 
 @teams_bp.route("/<int:team_id>", methods=["PUT"])
+@validate_json(schemas.EDIT_TEAM)
+@offload("writes")
+@batched_write
+@query_budget(2)
 def edit_team(team_id):
     """
     Atualiza uma equipe existente
@@ -208,6 +454,13 @@ def edit_team(team_id):
         schema:
           type: integer
         description: O ID da equipe a ser atualizada
+      - in: header
+        name: If-Match
+        required: false
+        schema:
+          type: string
+          example: '"v3"'
+        description: ETag obtida em GET /teams/<id>; a atualização só é aplicada se a equipe ainda estiver nessa versão
     requestBody:
       required: true
       content:
@@ -236,6 +489,11 @@ def edit_team(team_id):
     responses:
       200:
         description: Equipe atualizada com sucesso
+        headers:
+          ETag:
+            description: Versão da equipe após a atualização
+            schema:
+              type: string
         content:
           application/json:
             schema:
@@ -278,97 +536,69 @@ def edit_team(team_id):
         description: Equipe não encontrada
       409:
         description: Conflict - Nome da equipe já existe
+      412:
+        description: A equipe mudou desde a versão enviada em If-Match (a ETag atual vem na resposta)
+      413:
+        description: Corpo da requisição maior que o limite
       500:
         description: Erro no banco de dados
     """
     team_data = request.get_json()
-    print(team_data)
-    if not team_data:
-        return jsonify({
-            "error": "Invalid request",
-            "message": "JSON data is required"
-        }), 400
+
+    # Corpo já validado (EDIT_TEAM): a transação se resume ao UPDATE
+    values = {}
+    if "name" in team_data:
+        values["name"] = team_data["name"].strip()
+
+    if "description" in team_data:
+        description = team_data.get("description")
+        values["description"] = description.strip() if description else None
+    
+    if "team_profile_image" in team_data:
+        values["team_profile_image"] = team_data.get("team_profile_image")
+    
+    if "team_banner_image" in team_data:
+        values["team_banner_image"] = team_data.get("team_banner_image")
+    
+    if "captain_id" in team_data:
+        values["captain_id"] = team_data.get("captain_id")
+    
+    if "notes" in team_data:
+        notes = team_data.get("notes")
+        values["notes"] = notes.strip() if notes else None
+
+    values["update_date"] = datetime.utcnow()
+    values["version"] = Team.version + 1
     
     try:
-        team = db.session.get(Team, team_id)
-        if not team:
-            return jsonify({
-                "error": "Not found",
-                "message": f"Team with ID {team_id} not found"
-            }), 404
-        
-        if "name" in team_data:
-            team_name = team_data.get("name")
-            if not team_name or not team_name.strip():
-                return jsonify({
-                    "error": "Validation error",
-                    "message": "Field 'name' cannot be empty"
-                }), 400
-            
-            team_name = team_name.strip()
-            if len(team_name) < 2:
-                return jsonify({
-                    "error": "Validation error",
-                    "message": "Team name must be at least 2 characters long"
-                }), 400
-            
-            if len(team_name) > 255:
-                return jsonify({
-                    "error": "Erro de validação",
-                    "message": "O nome da equipe não pode exceder 255 caracteres"
-                }), 400
-            
-            # Verificar se já existe outra equipe com o mesmo nome (exceto a atual)
-            existing_team = db.session.query(Team).filter(
-                Team.name == team_name,
-                Team.id != team_id
-            ).first()
-            if existing_team:
-                return jsonify({
-                    "error": "Conflict",
-                    "message": "Já existe uma equipe com este nome. Escolha um nome diferente."
-                }), 409
-            
-            team.name = team_name
-
-        if "description" in team_data:
-            description = team_data.get("description")
-            if description and len(description) > 350:
-                return jsonify({
-                    "error": "Erro de validação",
-                    "message": "A descrição não pode exceder 350 caracteres"
-                }), 400
-            team.description = description.strip() if description else None
-        
-        if "team_profile_image" in team_data:
-            team.team_profile_image = team_data.get("team_profile_image")
-        
-        if "team_banner_image" in team_data:
-            team.team_banner_image = team_data.get("team_banner_image")
-        
-        if "captain_id" in team_data:
-            captain_id = team_data.get("captain_id")
-            if captain_id is not None and not isinstance(captain_id, int):
-                return jsonify({
-                    "error": "Erro de validação",
-                    "message": "O ID do capitão deve ser um número inteiro válido"
-                }), 400
-            team.captain_id = captain_id
-        
-        if "notes" in team_data:
-            notes = team_data.get("notes")
-            if notes and len(notes) > 350:
+        # UPDATE condicional: com If-Match só grava se a versão ainda for a do cliente
+        conditions = [Team.id == team_id]
+        versions = _if_match_versions()
+        if versions is not None:
+            conditions.append(Team.version.in_(versions))
+        team = db.session.execute(
+            db.update(Team.__table__).where(*conditions).values(**values).returning(*Team.__table__.c)
+        ).first()
+
+        if team is None:
+            current_version = db.session.scalar(db.select(Team.version).where(Team.id == team_id))
+            db.session.rollback()
+            if current_version is None:
                 return jsonify({
-                    "error": "Erro de validação",
-                    "message": "As notas não podem exceder 350 caracteres"
-                }), 400
-            team.notes = notes.strip() if notes else None
-        
-        team.update_date = datetime.utcnow()
-        
+                    "error": "Not found",
+                    "message": f"Team with ID {team_id} not found"
+                }), 404
+            response = jsonify({
+                "error": "Precondition failed",
+                "message": "A equipe foi alterada por outra requisição. Busque a versão atual e tente novamente."
+            })
+            response.set_etag(_team_etag(current_version))
+            return response, 412
+
+        record_team_changes(db.session.connection(), [(team_id, TeamChange.UPDATED)])
         db.session.commit()
         
-        return jsonify({
+        response = jsonify({
             "success": True,
             "message": "Equipe atualizada com sucesso",
             "data": {
@@ -385,8 +615,17 @@ def edit_team(team_id):
                 "create_date": team.create_date.isoformat() if team.create_date else None,
                 "update_date": team.update_date.isoformat() if team.update_date else None
             }
-        }), 200
+        })
+        response.set_etag(_team_etag(team.version))
+        return response, 200
         
+    except IntegrityError:
+        # O índice único de teams.name decide o conflito no próprio UPDATE
+        db.session.rollback()
+        return jsonify({
+            "error": "Conflict",
+            "message": "Já existe uma equipe com este nome. Escolha um nome diferente."
+        }), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -396,6 +635,8 @@ def edit_team(team_id):
 
 
 @teams_bp.route("/", methods=["GET"])
+@coalesce
+@query_budget(5)
 def get_teams():
     """
     Obter todas as equipes cadastradas
@@ -407,9 +648,24 @@ def get_teams():
       Retorna uma lista completa de todas as equipes cadastradas no sistema, 
       ordenadas por ID. Cada equipe inclui informações básicas como nome, 
       descrição, imagens, capitão, status, pontos de ranking e número de membros.
+      Com `include`, o capitão e/ou os jogadores de todas as equipes são
+      carregados com uma consulta por relação.
+    parameters:
+      - in: query
+        name: include
+        required: false
+        schema:
+          type: string
+          example: captain,players
+        description: Relações a incluir em cada equipe, separadas por vírgula (captain, players)
     responses:
       200:
         description: Lista de equipes recuperada com sucesso
+        headers:
+          ETag:
+            description: Versão da lista (ausente quando lida do banco ou com alterações ainda fora do snapshot)
+            schema:
+              type: string
         content:
           application/json:
             schema:
@@ -481,6 +737,47 @@ def get_teams():
                         nullable: true
                         description: Data da última atualização (ISO 8601)
                         example: "2024-02-20T14:45:00Z"
+                      thumbnails:
+                        type: object
+                        description: |
+                          Miniaturas de tamanho fixo das imagens enviadas em
+                          POST /teams/<id>/images/<kind>; null para URLs externas
+                        properties:
+                          profile:
+                            type: string
+                            nullable: true
+                            example: "/media/images/9f86d0…/profile-thumb-96x96.webp"
+                          banner:
+                            type: string
+                            nullable: true
+                            example: "/media/images/2c26b4…/banner-thumb-480x120.webp"
+                      captain:
+                        type: object
+                        nullable: true
+                        description: Capitão da equipe (somente com include=captain)
+                        properties:
+                          user_id:
+                            type: integer
+                          name:
+                            type: string
+                          email:
+                            type: string
+                      players:
+                        type: array
+                        description: Jogadores da equipe (somente com include=players)
+                        items:
+                          type: object
+                          properties:
+                            user_id:
+                              type: integer
+                            name:
+                              type: string
+                            email:
+                              type: string
+                            join_date:
+                              type: string
+      400:
+        description: Valor inválido em include
       500:
         description: Erro interno do servidor
         content:
@@ -497,25 +794,41 @@ def get_teams():
                   description: Mensagem detalhada do erro
                   example: "Falha ao encontrar equipes. Por favor, tente novamente."
     """
+    includes, error = _parse_include()
+    if error:
+        return jsonify({
+            "error": "Erro de validação",
+            "message": error
+        }), 400
+
+    state = team_snapshots.current() if not includes else None
+    if state is not None:
+        snapshot, changed = state
+        if not changed:
+            response = Response([response_chunk(snapshot.teams_body())], mimetype="application/json")
+            # Mesmo corpo para a mesma versão: a compressão reaproveita o corpo comprimido
+            response.set_etag(_snapshot_etag(snapshot.version))
+            return response
+        try:
+            # Snapshot anterior + delta: só as equipes alteradas vêm do banco
+            dumps = current_app.json.dumps
+            summaries = dict.fromkeys(changed)
+            # Linhas do Core, como em build_team_snapshot
+            teams = db.session.execute(db.select(Team.__table__).where(Team.id.in_(changed)))
+            for team in teams:
+                summaries[team.id] = dumps(_team_summary(team)).encode()
+            return Response([response_chunk(snapshot.teams_body(summaries))], mimetype="application/json")
+        except Exception as e:
+            return jsonify({
+                "error": "Erro no banco de dados",
+                "message": "Falha ao encontrar equipes. Por favor, tente novamente."
+            }), 500
+
     try:
         teams = db.session.execute(teamModel.order_by(Team.id)).scalars().all()
+        _load_includes(teams, includes, team_ids=db.select(Team.id))
         
-        team_list = [
-            {
-                "team_id": team.id,
-                "name": team.name,
-                "description": team.description,
-                "team_profile_image": team.team_profile_image,
-                "team_banner_image": team.team_banner_image,
-                "captain_id": team.captain_id,
-                "is_active": team.is_active,
-                "ranking_points": team.ranking_points,
-                "members_count": team.members_count,
-                "create_date": team.create_date.isoformat() if team.create_date else None,
-                "update_date": team.update_date.isoformat() if team.update_date else None
-            }
-            for team in teams
-        ]
+        team_list = [_team_summary(team, includes) for team in teams]
         
         return jsonify({
             "success": True,
@@ -530,7 +843,240 @@ def get_teams():
         }), 500
 
 
+@teams_bp.route("/changes", methods=["GET"])
+@coalesce
+@query_budget(4)
+def get_team_changes():
+    """
+    Obter as equipes alteradas desde um cursor (sincronização incremental)
+    ---
+    tags:
+      - Teams
+    summary: Feed de alterações de equipes
+    description: |
+      Sem `since` (ou com `since=0`) retorna todas as equipes e o cursor atual.
+      Com `since`, retorna apenas as equipes criadas, editadas ou com elenco
+      alterado depois do cursor, e os IDs das equipes removidas. Use o `cursor`
+      da resposta na próxima chamada; enquanto `has_more` for verdadeiro há
+      mais alterações a buscar.
+    parameters:
+      - in: query
+        name: since
+        required: false
+        schema:
+          type: integer
+          minimum: 0
+        description: Cursor retornado pela chamada anterior
+      - in: query
+        name: limit
+        required: false
+        schema:
+          type: integer
+          minimum: 1
+          maximum: 1000
+        description: Número máximo de alterações lidas por chamada (padrão 500)
+      - in: query
+        name: include
+        required: false
+        schema:
+          type: string
+        description: Relações a incluir em cada equipe alterada (captain, players)
+    responses:
+      200:
+        description: Alterações recuperadas com sucesso
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                message:
+                  type: string
+                data:
+                  type: object
+                  properties:
+                    changed:
+                      type: array
+                      description: Equipes alteradas (mesmo formato de GET /teams/)
+                      items:
+                        type: object
+                    deleted:
+                      type: array
+                      description: IDs das equipes removidas
+                      items:
+                        type: integer
+                    cursor:
+                      type: integer
+                    has_more:
+                      type: boolean
+      400:
+        description: Parâmetros inválidos
+      500:
+        description: Erro no banco de dados
+      501:
+        description: Banco de dados sem suporte ao cursor (somente SQLite)
+    """
+    if not changes_cursor_supported(db.engine):
+        return _cursor_unsupported()
+
+    since = request.args.get("since", 0, type=int)
+    limit = request.args.get("limit", TEAM_CHANGES_DEFAULT_LIMIT, type=int)
+    if since < 0 or not 1 <= limit <= TEAM_CHANGES_MAX_LIMIT:
+        return jsonify({
+            "error": "Erro de validação",
+            "message": f"'since' deve ser >= 0 e 'limit' deve estar entre 1 e {TEAM_CHANGES_MAX_LIMIT}"
+        }), 400
+    includes, error = _parse_include()
+    if error:
+        return jsonify({
+            "error": "Erro de validação",
+            "message": error
+        }), 400
+
+    try:
+        if since == 0:
+            # Sincronização completa: o cursor é lido antes das equipes, então
+            # uma alteração concorrente é entregue de novo, nunca perdida
+            cursor = db.session.scalar(db.select(db.func.max(TeamChange.id))) or 0
+            teams = db.session.execute(teamModel.order_by(Team.id)).scalars().all()
+            _load_includes(teams, includes, team_ids=db.select(Team.id))
+            return jsonify({
+                "success": True,
+                "message": "Busca realizada com sucesso!",
+                "data": {
+                    "changed": [_team_summary(team, includes) for team in teams],
+                    "deleted": [],
+                    "cursor": cursor,
+                    "has_more": False
+                }
+            }), 200
+
+        # Varredura pela chave primária: custo proporcional ao número de alterações
+        changes = db.session.execute(
+            db.select(TeamChange.id, TeamChange.team_id)
+            .where(TeamChange.id > since)
+            .order_by(TeamChange.id)
+            .limit(limit)
+        ).all()
+        team_ids = list(dict.fromkeys(team_id for _, team_id in changes))
+
+        teams = []
+        if team_ids:
+            teams = db.session.execute(
+                teamModel.where(Team.id.in_(team_ids)).order_by(Team.id)
+            ).scalars().all()
+        existing_ids = {team.id for team in teams}
+        _load_includes(teams, includes)
+
+        return jsonify({
+            "success": True,
+            "message": "Busca realizada com sucesso!",
+            "data": {
+                "changed": [_team_summary(team, includes) for team in teams],
+                "deleted": [team_id for team_id in team_ids if team_id not in existing_ids],
+                "cursor": changes[-1].id if changes else since,
+                "has_more": len(changes) == limit
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "error": "Erro no banco de dados",
+            "message": "Falha ao buscar alterações. Por favor, tente novamente."
+        }), 500
+
+
+@teams_bp.route("/events", methods=["GET"])
+@admission_exempt
+@query_budget(1)
+def stream_teams_events():
+    """
+    Stream (Server-Sent Events) de alterações de todas as equipes
+    ---
+    tags:
+      - Teams
+    description: |
+      Envia um evento a cada equipe criada, editada, com elenco alterado ou
+      removida. O `id` de cada evento é o cursor de GET /teams/changes; ao
+      reconectar, o cliente envia `Last-Event-ID` e recebe os eventos perdidos.
+      Linhas de comentário (heartbeat) mantêm a conexão aberta.
+    parameters:
+      - in: header
+        name: Last-Event-ID
+        required: false
+        schema:
+          type: integer
+        description: Último evento recebido; os eventos seguintes são reenviados
+      - in: query
+        name: last_event_id
+        required: false
+        schema:
+          type: integer
+        description: Alternativa ao header Last-Event-ID
+    responses:
+      200:
+        description: Stream de eventos (`event` é created, updated, roster ou deleted)
+        content:
+          text/event-stream:
+            schema:
+              type: string
+      501:
+        description: Banco de dados sem suporte ao cursor (somente SQLite)
+    """
+    return _event_stream_response()
+
+
+@teams_bp.route("/<int:team_id>/events", methods=["GET"])
+@admission_exempt
+@query_budget(2)
+def stream_team_events(team_id):
+    """
+    Stream (Server-Sent Events) de alterações de uma equipe
+    ---
+    tags:
+      - Teams
+    description: |
+      Envia um evento quando a equipe é editada, tem o elenco alterado ou é
+      removida. Ao reconectar, o cliente envia `Last-Event-ID` e recebe os
+      eventos perdidos.
+    parameters:
+      - in: path
+        name: team_id
+        required: true
+        schema:
+          type: integer
+        description: O ID da equipe
+      - in: header
+        name: Last-Event-ID
+        required: false
+        schema:
+          type: integer
+        description: Último evento recebido; os eventos seguintes são reenviados
+    responses:
+      200:
+        description: Stream de eventos (`event` é updated, roster ou deleted)
+        content:
+          text/event-stream:
+            schema:
+              type: string
+      404:
+        description: Equipe não encontrada
+      501:
+        description: Banco de dados sem suporte ao cursor (somente SQLite)
+    """
+    if not db.session.get(Team, team_id):
+        return jsonify({
+            "error": "Não encontrado",
+            "message": "Equipe não encontrada"
+        }), 404
+
+    return _event_stream_response(team_id)
+
+
 @teams_bp.route("/<int:team_id>", methods=["GET"])
+@coalesce
+@query_budget(5)
 def get_team(team_id):
     """
     Obter uma equipe por ID com lista de jogadores
@@ -544,6 +1090,13 @@ def get_team(team_id):
         schema:
           type: integer
         description: O ID da equipe a ser recuperada
+      - in: query
+        name: include
+        required: false
+        schema:
+          type: string
+          example: captain,players
+        description: Relações a incluir (captain, players); sem o parâmetro, inclui os jogadores
     responses:
       200:
         description: Equipe encontrada
@@ -583,8 +1136,20 @@ def get_team(team_id):
                       type: string
                     update_date:
                       type: string
+                    captain:
+                      type: object
+                      nullable: true
+                      description: Somente com include=captain
+                      properties:
+                        user_id:
+                          type: integer
+                        name:
+                          type: string
+                        email:
+                          type: string
                     players:
                       type: array
+                      description: Omitido quando include não contém players
                       items:
                         type: object
                         properties:
@@ -596,6 +1161,8 @@ def get_team(team_id):
                             type: string
                           join_date:
                             type: string
+      400:
+        description: Valor inválido em include
       404:
         description: Equipe não encontrada
         content:
@@ -619,6 +1186,24 @@ def get_team(team_id):
                 message:
                   type: string
     """
+    # Sem include, mantém a resposta anterior (com jogadores)
+    includes, error = _parse_include(default=SNAPSHOT_INCLUDES)
+    if error:
+        return jsonify({
+            "error": "Erro de validação",
+            "message": error
+        }), 400
+
+    state = team_snapshots.current() if includes == SNAPSHOT_INCLUDES else None
+    # Equipe alterada depois do snapshot: lida do banco
+    if state is not None and team_id not in state[1]:
+        entry = state[0].team_entry(team_id)
+        if entry is not None:
+            body, version = entry
+            response = Response([response_chunk(body)], mimetype="application/json")
+            response.set_etag(_team_etag(version))
+            return response
+
     try:
         team = db.session.get(Team, team_id)
         if not team:
@@ -627,49 +1212,182 @@ def get_team(team_id):
                 "message": f"Equipe não encontrada"
             }), 404
         
-        # Buscar jogadores da equipe
-        team_players_query = db.session.query(TeamPlayer, User).join(
-            User, TeamPlayer.user_id == User.id
-        ).filter(TeamPlayer.team_id == team_id).all()
+        _load_includes([team], includes)
         
-        # Montar lista de jogadores
-        players_list = []
-        for team_player, user in team_players_query:
-            players_list.append({
-                "user_id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "join_date": team_player.create_date.isoformat() if team_player.create_date else None
-            })
+        response = jsonify({
+            "success": True,
+            "message": "Equipe encontrada com sucesso",
+            "data": _team_detail(team, includes)
+        })
+        response.set_etag(_team_etag(team.version))
+        return response, 200
         
+    except Exception as e:
+        return jsonify({
+            "error": "Erro no banco de dados",
+            "message": "Falha ao encontrar equipe. Por favor, tente novamente."
+        }), 500
+
+
+def _parse_resolution(value):
+    """'3600', '15m', '1h', '1d' ou '1w' em segundos; None se inválido."""
+    if value.isdigit():
+        return int(value)
+    number, unit = value[:-1], value[-1:]
+    if number.isdigit() and unit in RESOLUTION_UNITS:
+        return int(number) * RESOLUTION_UNITS[unit]
+    return None
+
+
+@teams_bp.route("/<int:team_id>/ranking-history", methods=["GET"])
+@coalesce
+@query_budget(2)
+def get_team_ranking_history(team_id):
+    """
+    Obter o histórico de ranking_points de uma equipe
+    ---
+    tags:
+      - Teams
+    description: |
+      Série temporal reduzida no servidor: o intervalo é dividido em faixas de
+      `resolution` segundos (ampliadas para no máximo RANKING_HISTORY_MAX_POINTS
+      pontos) e cada faixa traz o último valor, o mínimo e o máximo. Cada
+      ponto tem a data (`played_at`) da partida que o gerou.
+    parameters:
+      - in: path
+        name: team_id
+        required: true
+        schema:
+          type: integer
+      - in: query
+        name: from
+        required: false
+        schema:
+          type: string
+          format: date-time
+        description: Início do intervalo (padrão o primeiro ponto do histórico ou a criação da equipe)
+      - in: query
+        name: to
+        required: false
+        schema:
+          type: string
+          format: date-time
+        description: Fim do intervalo (padrão agora)
+      - in: query
+        name: resolution
+        required: false
+        schema:
+          type: string
+        description: Tamanho de cada faixa em segundos ou com unidade (15m, 1h, 1d, 1w)
+    responses:
+      200:
+        description: Histórico encontrado
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                message:
+                  type: string
+                data:
+                  type: object
+                  properties:
+                    team_id:
+                      type: integer
+                    from:
+                      type: string
+                    to:
+                      type: string
+                    resolution:
+                      type: integer
+                    points:
+                      type: array
+                      items:
+                        type: object
+                        properties:
+                          timestamp:
+                            type: string
+                          ranking_points:
+                            type: integer
+                          min:
+                            type: integer
+                          max:
+                            type: integer
+      400:
+        description: Erro de validação
+      404:
+        description: Equipe não encontrada
+      500:
+        description: Erro no banco de dados
+    """
+    try:
+        start = request.args.get("from", type=datetime.fromisoformat)
+        end = request.args.get("to", type=datetime.fromisoformat)
+    except ValueError:
+        start = end = None
+    resolution = request.args.get("resolution")
+    if resolution is not None:
+        resolution = _parse_resolution(resolution)
+    if ("from" in request.args and start is None) or ("to" in request.args and end is None) \
+            or ("resolution" in request.args and not resolution):
+        return jsonify({
+            "error": "Erro de validação",
+            "message": "'from' e 'to' devem estar no formato ISO 8601 e 'resolution' deve ser um intervalo positivo (ex.: 3600, 15m, 1h, 1d)"
+        }), 400
+
+    try:
+        # Partidas antigas registradas depois podem ser anteriores à criação da equipe
+        first_point = db.select(db.func.min(RankingHistoryBlock.start_time)).where(
+            RankingHistoryBlock.team_id == team_id
+        ).scalar_subquery()
+        team = db.session.execute(
+            db.select(Team.create_date, first_point.label("first_point")).where(Team.id == team_id)
+        ).first()
+        if team is None:
+            return jsonify({
+                "error": "Não encontrado",
+                "message": "Equipe não encontrada"
+            }), 404
+
+        start = to_epoch(start or team.create_date)
+        if "from" not in request.args and team.first_point is not None:
+            start = min(start, team.first_point)
+        end = to_epoch(end or datetime.utcnow())
+        if start > end:
+            return jsonify({
+                "error": "Erro de validação",
+                "message": "'from' deve ser anterior a 'to'"
+            }), 400
+
+        resolution, points = query_history(
+            db.session.connection(), team_id, start, end, resolution,
+            max_points=current_app.config["RANKING_HISTORY_MAX_POINTS"],
+        )
         return jsonify({
             "success": True,
-            "message": "Equipe encontrada com sucesso",
+            "message": "Histórico encontrado com sucesso",
             "data": {
-                "team_id": team.id,
-                "name": team.name,
-                "description": team.description,
-                "team_profile_image": team.team_profile_image,
-                "team_banner_image": team.team_banner_image,
-                "captain_id": team.captain_id,
-                "notes": team.notes,
-                "is_active": team.is_active,
-                "ranking_points": team.ranking_points,
-                "members_count": team.members_count,
-                "create_date": team.create_date.isoformat() if team.create_date else None,
-                "update_date": team.update_date.isoformat() if team.update_date else None,
-                "players": players_list
+                "team_id": team_id,
+                "from": from_epoch(start).isoformat(),
+                "to": from_epoch(end).isoformat(),
+                "resolution": resolution,
+                "points": points
             }
         }), 200
-        
+
     except Exception as e:
         return jsonify({
             "error": "Erro no banco de dados",
-            "message": "Falha ao encontrar equipe. Por favor, tente novamente."
+            "message": "Falha ao buscar histórico de ranking. Por favor, tente novamente."
         }), 500
 
 
 @teams_bp.route("/<int:team_id>", methods=["DELETE"])
+@offload("writes")
+@batched_write
+@query_budget(6)
 def delete_team(team_id):
     """
     Deletar uma equipe por ID
@@ -708,13 +1426,15 @@ def delete_team(team_id):
                 "message": f"Equipe não encontrada. Tente novamente."
             }), 404
         
-        # Primeiro, deletar todos os jogadores da equipe
-        team_players = db.session.query(TeamPlayer).filter_by(team_id=team_id).all()
-        for team_player in team_players:
-            db.session.delete(team_player)
-        
-        # Depois, deletar a equipe
+        # O elenco sai junto com a equipe; só o histórico de ranking, que pode
+        # ser grande, é removido em segundo plano (job gravado na mesma transação)
+        db.session.execute(db.delete(TeamPlayer).where(TeamPlayer.team_id == team_id))
+        has_history = db.session.scalar(
+            db.select(db.exists().where(RankingHistoryBlock.team_id == team_id))
+        )
         db.session.delete(team)
+        if has_history:
+            enqueue("teams.delete_cascade", {"team_id": team_id, "deleted_at": datetime.utcnow().isoformat()})
         db.session.commit()
         
         return jsonify({
@@ -732,6 +1452,11 @@ def delete_team(team_id):
 
 
 @teams_bp.route("/<int:team_id>/players", methods=["POST"])
+@validate_json(schemas.ADD_TEAM_PLAYER)
+@offload("writes")
+@batched_write
+@idempotent
+@query_budget(5)
 def add_team_player(team_id):
     """
     Adicionar um jogador a uma equipe
@@ -745,6 +1470,12 @@ def add_team_player(team_id):
         schema:
           type: integer
         description: O ID da equipe
+      - in: header
+        name: Idempotency-Key
+        required: false
+        schema:
+          type: string
+        description: Chave para repetir a requisição com segurança; a primeira resposta é reenviada
     requestBody:
       required: true
       content:
@@ -795,55 +1526,45 @@ def add_team_player(team_id):
         description: Equipe não encontrada
       409:
         description: Jogador já está na equipe
+      413:
+        description: Corpo da requisição maior que o limite
       500:
         description: Erro no banco de dados
     """
-    player_data = request.get_json()
-    
-    if not player_data:
-        return jsonify({
-            "error": "Invalid request",
-            "message": "JSON data é obrigatório."
-        }), 400
-    
-    if "user_id" not in player_data or not player_data.get("user_id"):
-        return jsonify({
-            "error": "Validation error",
-            "message": "É obrigatório fornecer um usuário válido."
-        }), 400
-    
-    user_id = player_data.get("user_id")
-    if not isinstance(user_id, int):
-        return jsonify({
-            "error": "Validation error",
-            "message": "O ID do usuário deve ser um número inteiro válido"
-        }), 400
+    user_id = request.get_json()["user_id"]
     
     try:
-        team = db.session.get(Team, team_id)
-        if not team:
-            return jsonify({
-                "error": "Not found",
-                "message": "Equipe não encontrada"
-            }), 404
-        
-        existing_player = db.session.query(TeamPlayer).filter_by(
-            user_id=user_id, team_id=team_id
-        ).first()
-        
-        if existing_player:
+        # INSERT ... SELECT da equipe: uma só instrução confere se a equipe existe
+        # e, pela constraint unique_user_team, se o jogador já está no elenco
+        now = datetime.utcnow()
+        columns = TeamPlayer.__table__.c
+        new_team_player = insert_from_select_or_ignore(
+            db.session, TeamPlayer.__table__,
+            ["user_id", "team_id", "create_date", "update_date"],
+            db.select(db.literal(user_id), Team.id, db.literal(now), db.literal(now)).where(Team.id == team_id),
+            ["user_id", "team_id"],
+            returning=(columns.id, columns.user_id, columns.team_id, columns.create_date),
+        )
+
+        if new_team_player is None:
+            team_exists = db.session.scalar(db.select(Team.id).where(Team.id == team_id))
+            db.session.rollback()
+            if team_exists is None:
+                return jsonify({
+                    "error": "Not found",
+                    "message": "Equipe não encontrada"
+                }), 404
             return jsonify({
                 "error": "Conflict",
                 "message": "Jogador já está nesta equipe"
             }), 409
-        
-        new_team_player = TeamPlayer(user_id=user_id, team_id=team_id)
-        
-        db.session.add(new_team_player)
-        
-        team.members_count += 1
-        team.update_date = datetime.utcnow()
-        
+
+        db.session.execute(
+            db.update(Team)
+            .where(Team.id == team_id)
+            .values(members_count=Team.members_count + 1, update_date=now, version=Team.version + 1)
+        )
+        record_team_changes(db.session.connection(), [(team_id, TeamChange.ROSTER)])
         db.session.commit()
         
         return jsonify({
@@ -863,3 +1584,182 @@ def add_team_player(team_id):
             "error": "Database error",
             "message": "Falha ao adicionar jogador à equipe. Por favor, tente novamente."
         }), 500
+
+
+@teams_bp.route("/<int:team_id>/images/<any(profile, banner):kind>", methods=["POST"])
+@offload("uploads")
+@query_budget(3)
+def upload_team_image(team_id, kind):
+    """
+    Enviar a imagem de perfil ou de banner de uma equipe
+    ---
+    tags:
+      - Teams
+    description: |
+      A imagem é gravada em disco com o SHA-256 do conteúdo no nome (o mesmo
+      arquivo enviado duas vezes é guardado uma vez) e a URL do original passa
+      a ser team_profile_image ou team_banner_image. As variantes de tamanho
+      fixo (MEDIA_VARIANTS) são geradas em segundo plano; até ficarem prontas,
+      as URLs delas entregam o original.
+    parameters:
+      - in: path
+        name: team_id
+        required: true
+        schema:
+          type: integer
+        description: O ID da equipe
+      - in: path
+        name: kind
+        required: true
+        schema:
+          type: string
+          enum: [profile, banner]
+        description: Imagem a substituir
+      - in: header
+        name: If-Match
+        required: false
+        schema:
+          type: string
+          example: '"v3"'
+        description: ETag obtida em GET /teams/<id>; a imagem só é trocada se a equipe ainda estiver nessa versão
+    requestBody:
+      required: true
+      content:
+        multipart/form-data:
+          schema:
+            type: object
+            properties:
+              image:
+                type: string
+                format: binary
+                description: Arquivo JPEG, PNG, WEBP ou GIF
+            required:
+              - image
+    responses:
+      200:
+        description: Imagem da equipe atualizada
+        headers:
+          ETag:
+            description: Versão da equipe após a atualização
+            schema:
+              type: string
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                message:
+                  type: string
+                data:
+                  type: object
+                  properties:
+                    team_id:
+                      type: integer
+                    kind:
+                      type: string
+                    url:
+                      type: string
+                      description: URL do original
+                    variants:
+                      type: object
+                      description: URL de cada variante, por nome
+                      additionalProperties:
+                        type: string
+      400:
+        description: Arquivo ausente, formato não suportado ou imagem grande demais
+      404:
+        description: Equipe não encontrada
+      412:
+        description: A equipe mudou desde a versão enviada em If-Match (a ETag atual vem na resposta)
+      413:
+        description: Arquivo maior que MEDIA_MAX_UPLOAD_SIZE
+      500:
+        description: Erro ao gravar a imagem
+    """
+    config = current_app.config
+    # Limite próprio do upload no lugar do MAX_CONTENT_LENGTH geral (413 ao ler o corpo)
+    request.max_content_length = config["MEDIA_MAX_UPLOAD_SIZE"]
+    upload = request.files.get("image")
+    if upload is None:
+        return jsonify({
+            "error": "Invalid request",
+            "message": "Envie a imagem no campo 'image' (multipart/form-data)"
+        }), 400
+
+    # Formato e dimensões vêm do cabeçalho do arquivo, antes de gravar ou tocar no banco
+    try:
+        ext = media.inspect_image(upload.stream, config["MEDIA_MAX_PIXELS"])
+    except media.InvalidImage as e:
+        return jsonify({"error": "Invalid image", "message": str(e)}), 400
+
+    root = config["MEDIA_ROOT"]
+    try:
+        digest = media.store_original(upload.stream, root, ext)
+    except OSError:
+        logger.exception("Failed to store the image of team %s", team_id)
+        return jsonify({
+            "error": "Storage error",
+            "message": "Falha ao gravar a imagem. Por favor, tente novamente."
+        }), 500
+
+    url = media.image_url(digest, media.original_filename(ext))
+    sizes = config["MEDIA_VARIANTS"][kind]
+    column = "team_profile_image" if kind == "profile" else "team_banner_image"
+
+    try:
+        conditions = [Team.id == team_id]
+        versions = _if_match_versions()
+        if versions is not None:
+            conditions.append(Team.version.in_(versions))
+        team = db.session.execute(
+            db.update(Team.__table__)
+            .where(*conditions)
+            .values({column: url, "update_date": datetime.utcnow(), "version": Team.version + 1})
+            .returning(Team.__table__.c.id, Team.__table__.c.version)
+        ).first()
+
+        if team is None:
+            current_version = db.session.scalar(db.select(Team.version).where(Team.id == team_id))
+            db.session.rollback()
+            if current_version is None:
+                return jsonify({
+                    "error": "Not found",
+                    "message": "Equipe não encontrada"
+                }), 404
+            response = jsonify({
+                "error": "Precondition failed",
+                "message": "A equipe foi alterada por outra requisição. Busque a versão atual e tente novamente."
+            })
+            response.set_etag(_team_etag(current_version))
+            return response, 412
+
+        record_team_changes(db.session.connection(), [(team_id, TeamChange.UPDATED)])
+        # Imagem já enviada antes (mesmo digest) pode ter as variantes prontas
+        if media.missing_variants(root, digest, kind, sizes):
+            enqueue("media.resize_image", {"digest": digest, "ext": ext, "kind": kind})
+        db.session.commit()
+
+        response = jsonify({
+            "success": True,
+            "message": "Imagem da equipe atualizada com sucesso",
+            "data": {
+                "team_id": team_id,
+                "kind": kind,
+                "url": url,
+                "variants": {
+                    name: media.image_url(digest, media.variant_filename(kind, name, size))
+                    for name, size in sizes.items()
+                }
+            }
+        })
+        response.set_etag(_team_etag(team.version))
+        return response, 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Erro no banco de dados",
+            "message": "Falha ao atualizar a imagem da equipe. Por favor, tente novamente."
+        }), 500
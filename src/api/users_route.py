@@ -1,13 +1,22 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import User
+from src.api import schemas
 from src.database.db import db
 from src.extensions import bcrypt
+from src.utils.idempotency import idempotent
+from src.utils.offload import offload
+from src.utils.query_budget import query_budget
+from src.utils.single_flight import coalesce
+from src.utils.upsert import insert_or_ignore
+from src.utils.validation import validate_json
 
 users_bp = Blueprint("users", __name__, url_prefix="/users")
 userModel = db.select(User)
 
 
 @users_bp.route("/", methods=["GET"])
+@coalesce
+@query_budget(1)
 def get_users():
     users = db.session.execute(userModel.order_by(User.id)).scalars().all()
 
@@ -22,6 +31,8 @@ def get_users():
 
 
 @users_bp.route("/<int:id>", methods=["GET"])
+@coalesce
+@query_budget(1)
 def get_user(id):
     """
     Get a user by ID
@@ -73,12 +84,23 @@ def get_user(id):
 
 
 @users_bp.route("/", methods=["POST"])
+@validate_json(schemas.CREATE_USER)
+@offload("auth")
+@idempotent
+@query_budget(3)
 def create_user():
     """
     Create a new user
     ---
     tags:
       - Users
+    parameters:
+      - in: header
+        name: Idempotency-Key
+        required: false
+        schema:
+          type: string
+        description: Key to safely retry the request; the first response is replayed
     requestBody:
       required: true
       content:
@@ -99,28 +121,31 @@ def create_user():
         description: User created successfully
       400:
         description: Email already exists
+      413:
+        description: Request body too large
     """
     user_data = request.get_json()
 
-    stmt = userModel.filter_by(email=user_data["email"])
-    existing_user = db.session.execute(stmt).scalar_one_or_none()
-    if existing_user:
-        return jsonify({"message": "Email already in use"}), 400
-
-    if not all(field in user_data for field in ("name", "email", "password")):
-        return jsonify({"message": "Missing required fields"}), 400
-
     hashed_password = bcrypt.generate_password_hash(user_data["password"]).decode(
         "utf-8"
     )
-    new_user = User(
-        name=user_data["name"],
-        email=user_data["email"],
-        birth=user_data["birth"],
-        password=hashed_password,
+    # The unique email constraint decides: no SELECT before the insert to race with
+    new_user = insert_or_ignore(
+        db.session,
+        User.__table__,
+        {
+            "name": user_data["name"],
+            "email": user_data["email"],
+            "birth": user_data.get("birth"),
+            "password": hashed_password,
+        },
+        ["email"],
+        returning=(User.__table__.c.id, User.__table__.c.name),
     )
+    if new_user is None:
+        db.session.rollback()
+        return jsonify({"message": "Email already in use"}), 400
 
-    db.session.add(new_user)
     db.session.commit()
 
     return (
@@ -138,6 +163,8 @@ def create_user():
 
 
 @users_bp.route("/<int:id>", methods=["PUT"])
+@validate_json(schemas.EDIT_USER)
+@query_budget(6)
 def edit_user(id):
     """Update an existing user
     ---
@@ -172,6 +199,8 @@ def edit_user(id):
         description: Email already in use
       404:
         description: User not found
+      413:
+        description: Request body too large
     """
     stmt = userModel.filter_by(id=id)
     user = db.session.execute(stmt).scalar_one_or_none()
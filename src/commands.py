@@ -0,0 +1,83 @@
+import json
+import threading
+import click
+from src.database.db import db
+from src.database.seed import SEED_PASSWORD, seed_database
+from src.utils.job_queue import enqueue, job_queue
+from src.utils.ranking import recompute_rankings
+
+
+def register_commands(app):
+    @app.cli.command("seed")
+    @click.option("--users", default=1_000, show_default=True, help="Number of users to create")
+    @click.option("--teams", default=100, show_default=True, help="Number of teams to create")
+    @click.option("--memberships", default=5_000, show_default=True, help="Number of team_players rows")
+    @click.option("--seed", "seed_value", default=42, show_default=True, help="Random seed")
+    @click.option("--chunk-size", default=50_000, show_default=True, help="Rows per executemany call")
+    @click.option(
+        "--truncate", is_flag=True,
+        help="Delete existing users, teams, memberships, matches, jobs and idempotency keys first",
+    )
+    def seed(users, teams, memberships, seed_value, chunk_size, truncate):
+        """Generate deterministic synthetic data (flask --app main seed)."""
+        try:
+            result = seed_database(
+                db.engine, users, teams, memberships,
+                seed=seed_value, chunk_size=chunk_size, truncate=truncate,
+            )
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+        rows = result["users"] + result["teams"] + result["memberships"]
+        click.echo(
+            f"Seeded {result['users']} users, {result['teams']} teams and "
+            f"{result['memberships']} memberships in {result['elapsed']:.2f}s "
+            f"({rows / result['elapsed']:,.0f} rows/s)"
+        )
+        click.echo(f"Every seeded user has the password '{SEED_PASSWORD}'")
+
+    @app.cli.command("recompute-rankings")
+    def recompute_rankings_command():
+        """Recompute every team's ranking_points from the full match history."""
+        config = app.config
+        result = recompute_rankings(
+            db.session,
+            base_rating=config["RANKING_BASE_RATING"],
+            k=config["RANKING_K_FACTOR"],
+            home_advantage=config["RANKING_HOME_ADVANTAGE"],
+        )
+        db.session.commit()
+        click.echo(
+            f"Recomputed rankings from {result['matches']} matches in {result['elapsed']:.2f}s, "
+            f"{result['teams_updated']} teams updated"
+        )
+
+    @app.cli.group("jobs")
+    def jobs():
+        """Background job queue."""
+
+    @jobs.command("worker")
+    @click.option("--concurrency", type=int, default=None, help="Worker threads (default JOBS_CONCURRENCY)")
+    def jobs_worker(concurrency):
+        """Run job workers in the foreground (flask --app main jobs worker)."""
+        if concurrency is not None:
+            app.config["JOBS_CONCURRENCY"] = concurrency
+        job_queue.configure(app)
+        job_queue.ensure_started()
+        click.echo(f"Job worker running with {app.config['JOBS_CONCURRENCY']} threads (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+    @jobs.command("enqueue")
+    @click.argument("name")
+    @click.option("--payload", default="{}", show_default=True, help="Job arguments as JSON")
+    def jobs_enqueue(name, payload):
+        """Queue a job, e.g. flask jobs enqueue teams.recount_members."""
+        try:
+            new_job = enqueue(name, json.loads(payload))
+        except (LookupError, ValueError) as e:
+            raise click.BadParameter(str(e))
+        db.session.commit()
+        click.echo(f"Queued job {new_job.name} #{new_job.id}")
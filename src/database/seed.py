@@ -0,0 +1,160 @@
+import random
+import time
+from datetime import datetime
+from sqlalchemy import func, select
+from src.extensions import bcrypt
+from src.models.idempotency_keys import IdempotencyKey
+from src.models.jobs import Job
+from src.models.matches import Match
+from src.models.ranking_history import RankingHistoryBlock
+from src.models.team_changes import TeamChange
+from src.models.team_players import TeamPlayer
+from src.models.teams import Team
+from src.models.user import User
+
+SEED_PASSWORD = "password123"
+SEED_EMAIL_DOMAIN = "seed.local"
+
+_PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+# Apagadas pelo truncate, dependentes antes: partidas e histórico apontam
+# para equipes, jobs e respostas guardadas (Idempotency-Key) para ids antigos
+TRUNCATED_MODELS = (IdempotencyKey, Job, RankingHistoryBlock, Match, TeamPlayer, Team, User)
+# PRAGMAs do SQLite relaxados durante a carga
+SEED_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": -262144,
+}
+
+
+def _insert_sql(engine, table, columns):
+    placeholder = _PLACEHOLDERS[engine.dialect.paramstyle]
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join([placeholder] * len(columns))})"
+    )
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _team_sizes(teams, memberships):
+    base, remainder = divmod(memberships, teams) if teams else (0, 0)
+    return [base + (1 if i < remainder else 0) for i in range(teams)]
+
+
+def seed_database(engine, users, teams, memberships, seed=42, chunk_size=50_000,
+                  truncate=False, password_hash=None):
+    """
+    Insert deterministic synthetic users, teams and memberships.
+
+    All rows are written with ``executemany`` in chunks inside one transaction,
+    every user shares one precomputed password hash (``SEED_PASSWORD``) and each
+    team's ``members_count`` matches its generated roster. The created (and,
+    with ``truncate``, deleted) teams go to ``team_changes`` like any other
+    write, so sync clients, event streams and the team snapshot see them.
+    ``truncate`` also empties the tables that refer to teams or users
+    (``TRUNCATED_MODELS``) and keeps the changelog: new team ids continue
+    after the highest one ever logged, so no id is reused.
+    Returns the number of rows inserted per table and the elapsed time.
+    """
+    if memberships and not teams:
+        raise ValueError("Memberships require at least one team")
+    if teams and -(-memberships // teams) > users:
+        raise ValueError("Not enough users for the requested memberships per team")
+
+    rng = random.Random(seed)
+    is_sqlite = engine.dialect.name == "sqlite"
+    now = datetime.utcnow()
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S.%f") if is_sqlite else now
+    if password_hash is None:
+        password_hash = bcrypt.generate_password_hash(SEED_PASSWORD).decode("utf-8")
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if is_sqlite:
+            # Durabilidade não importa para dados sintéticos; restaurado no final,
+            # mesmo se a carga falhar: a conexão volta ao pool com os PRAGMAs
+            previous = {
+                pragma: conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                for pragma in SEED_PRAGMAS
+            }
+            for pragma, value in SEED_PRAGMAS.items():
+                conn.exec_driver_sql(f"PRAGMA {pragma} = {value}")
+            conn.commit()
+
+        try:
+            with conn.begin():
+                changes_sql = _insert_sql(engine, "team_changes", ("team_id", "change_type", "create_date"))
+                if truncate:
+                    deleted = [
+                        (team_id, TeamChange.DELETED, timestamp) for team_id in conn.scalars(select(Team.id))
+                    ]
+                    for chunk in _chunks(deleted, chunk_size):
+                        conn.exec_driver_sql(changes_sql, chunk)
+                    for model in TRUNCATED_MODELS:
+                        conn.execute(model.__table__.delete())
+
+                first_user = (conn.scalar(select(func.max(User.id))) or 0) + 1
+                # O log guarda os ids de equipes excluídas (tombstones)
+                first_team = max(
+                    conn.scalar(select(func.max(Team.id))) or 0,
+                    conn.scalar(select(func.max(TeamChange.team_id))) or 0,
+                ) + 1
+                user_ids = range(first_user, first_user + users)
+
+                user_rows = (
+                    (user_id, f"User {user_id}", f"user{user_id}@{SEED_EMAIL_DOMAIN}", "1990-01-01", password_hash)
+                    for user_id in user_ids
+                )
+                sql = _insert_sql(engine, "users", ("id", "name", "email", "birth", "password"))
+                for chunk in _chunks(user_rows, chunk_size):
+                    conn.exec_driver_sql(sql, chunk)
+
+                rosters = [rng.sample(user_ids, size) for size in _team_sizes(teams, memberships)]
+
+                team_rows = (
+                    (first_team + i, f"Team {first_team + i}", f"Synthetic team {first_team + i}",
+                     roster[0] if roster else None, 1, 0, len(roster), timestamp, timestamp)
+                    for i, roster in enumerate(rosters)
+                )
+                sql = _insert_sql(engine, "teams", (
+                    "id", "name", "description", "captain_id", "is_active",
+                    "ranking_points", "members_count", "create_date", "update_date",
+                ))
+                for chunk in _chunks(team_rows, chunk_size):
+                    conn.exec_driver_sql(sql, chunk)
+
+                membership_rows = (
+                    (user_id, first_team + i, timestamp, timestamp)
+                    for i, roster in enumerate(rosters)
+                    for user_id in roster
+                )
+                sql = _insert_sql(engine, "team_players", ("user_id", "team_id", "create_date", "update_date"))
+                for chunk in _chunks(membership_rows, chunk_size):
+                    conn.exec_driver_sql(sql, chunk)
+
+                created = ((first_team + i, TeamChange.CREATED, timestamp) for i in range(teams))
+                for chunk in _chunks(created, chunk_size):
+                    conn.exec_driver_sql(changes_sql, chunk)
+        finally:
+            if is_sqlite:
+                for pragma, value in previous.items():
+                    conn.exec_driver_sql(f"PRAGMA {pragma} = {value}")
+                conn.commit()
+
+    return {
+        "users": users,
+        "teams": teams,
+        "memberships": memberships,
+        "elapsed": time.perf_counter() - started,
+    }
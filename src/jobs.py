@@ -0,0 +1,63 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import bindparam, delete, func, select, update
+from src.database.db import db
+from src.models.ranking_history import RankingHistoryBlock
+from src.models.team_changes import TeamChange, record_team_changes
+from src.models.team_players import TeamPlayer
+from src.models.teams import Team
+from src.utils.job_queue import job
+from src.utils.media import generate_variants
+from src.utils.ranking_history import to_epoch
+
+
+@job("teams.delete_cascade")
+def delete_team_cascade(team_id, deleted_at):
+    """
+    Remove the ranking history of a deleted team. The roster is deleted with
+    the team; the roster delete here only covers jobs queued before that.
+    """
+    deleted_at = datetime.fromisoformat(deleted_at)
+    # Só linhas anteriores à exclusão
+    db.session.execute(
+        delete(TeamPlayer).where(TeamPlayer.team_id == team_id, TeamPlayer.create_date <= deleted_at)
+    )
+    db.session.execute(
+        delete(RankingHistoryBlock).where(
+            RankingHistoryBlock.team_id == team_id,
+            RankingHistoryBlock.start_time <= to_epoch(deleted_at),
+        )
+    )
+
+
+@job("teams.recount_members")
+def recount_members(team_ids=None):
+    """Fix ``members_count`` from the actual rosters (all teams by default)."""
+    actual = func.count(TeamPlayer.id)
+    query = (
+        select(Team.id, actual.label("actual"))
+        .outerjoin(TeamPlayer, TeamPlayer.team_id == Team.id)
+        .group_by(Team.id)
+        .having(Team.members_count != actual)
+    )
+    if team_ids is not None:
+        query = query.where(Team.id.in_(team_ids))
+    wrong = db.session.execute(query).all()
+    if not wrong:
+        return
+
+    teams = Team.__table__
+    db.session.execute(
+        update(teams).where(teams.c.id == bindparam("b_id")).values(
+            members_count=bindparam("b_count"), version=teams.c.version + 1
+        ),
+        [{"b_id": row.id, "b_count": row.actual} for row in wrong],
+    )
+    record_team_changes(db.session.connection(), [(row.id, TeamChange.UPDATED) for row in wrong])
+
+
+@job("media.resize_image")
+def resize_image(digest, ext, kind):
+    """Generate the fixed-size variants of an uploaded team image."""
+    config = current_app.config
+    generate_variants(config["MEDIA_ROOT"], digest, ext, kind, config["MEDIA_VARIANTS"][kind])
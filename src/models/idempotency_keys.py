@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.db import db
+
+
+class IdempotencyKey(db.Model):
+    """First response stored for an ``Idempotency-Key`` until ``expires_at``."""
+
+    __tablename__ = "idempotency_keys"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Quem enviou a chave: "user:<id>", digest das credenciais ou "" (anônimo)
+    caller: Mapped[str] = mapped_column(String(100), nullable=False, server_default="")
+    method: Mapped[str] = mapped_column(String(10), nullable=False)
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    state: Mapped[str] = mapped_column(String(20), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    mimetype: Mapped[str] = mapped_column(String(100), nullable=True)
+    response_body: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    create_date: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("key", "caller", "method", "path", name="unique_idempotency_key"),
+    )
+
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, Text, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.db import db
+
+
+class Job(db.Model):
+    """A unit of background work, see ``src.utils.job_queue``."""
+
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Argumentos da função do job em JSON
+    payload: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    run_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    locked_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    locked_by: Mapped[str] = mapped_column(String(100), nullable=True)
+    create_date: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    update_date: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    __table_args__ = (
+        # Próximo job a executar: status = 'queued' AND run_at <= agora ORDER BY run_at
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.db import db
+
+
+class Match(db.Model):
+    __tablename__ = "matches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    home_team_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("teams.id"), nullable=False, index=True
+    )
+    away_team_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("teams.id"), nullable=False, index=True
+    )
+    home_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    away_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    played_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    create_date: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    __table_args__ = (
+        # Ordem cronológica usada pelo cálculo do ranking
+        Index("ix_matches_played_at_id", "played_at", "id"),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import Integer, LargeBinary, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.db import db
+
+
+class RankingHistoryBlock(db.Model):
+    """
+    Up to ``BLOCK_SIZE`` consecutive ``ranking_points`` values of one team,
+    timestamped with the ``played_at`` of the match that produced them and
+    stored as delta-encoded arrays (see ``src.utils.ranking_history``).
+    """
+
+    __tablename__ = "ranking_history_blocks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    team_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Segundos desde a época (UTC) do primeiro e do último ponto do bloco
+    start_time: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_time: Mapped[int] = mapped_column(Integer, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Resumo do bloco, usado quando ele cabe inteiro em um intervalo da consulta
+    min_points: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_points: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_points: Mapped[int] = mapped_column(Integer, nullable=False)
+    time_deltas: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    point_deltas: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index("ix_ranking_history_team_time", "team_id", "start_time"),
+    )
@@ -0,0 +1,101 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, DateTime, bindparam, event, inspect, literal, select, union
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from src.database.db import db
+from src.models.team_players import TeamPlayer
+from src.models.teams import Team
+from src.models.user import User
+
+# Campos de usuário exibidos nos elencos e no capitão das equipes
+ROSTER_USER_FIELDS = ("name", "email")
+# Bancos em que os ids do log são confirmados em ordem (escritor único)
+CURSOR_DIALECTS = ("sqlite",)
+
+
+class TeamChange(db.Model):
+    """
+    Append-only log of team changes. The autoincrement ``id`` is the sync
+    cursor: SQLite serializes writers, so ids are committed in order and a
+    client that reads ``id > cursor`` never misses a change. Other databases
+    hand out ids before commit, so a slower transaction can commit a lower
+    id after a reader moved past it; the cursor readers (GET /teams/changes,
+    the event streams and the team snapshot) refuse to run there, see
+    :func:`changes_cursor_supported`.
+    """
+
+    __tablename__ = "team_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Sem ForeignKey: a linha precisa sobreviver à exclusão da equipe (tombstone)
+    team_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    change_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    create_date: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ROSTER = "roster"
+
+
+# Equipes em que usuários renomeados jogam ou são capitães, registradas com um
+# único INSERT ... SELECT montado uma vez (cacheado pelo SQLAlchemy); pula as
+# equipes que o flush já registrou
+_user_ids = bindparam("user_ids", expanding=True)
+_user_teams = union(
+    select(TeamPlayer.team_id).where(TeamPlayer.user_id.in_(_user_ids)),
+    select(Team.id).where(Team.captain_id.in_(_user_ids)),
+).subquery()
+_RECORD_USER_TEAMS = TeamChange.__table__.insert().from_select(
+    ["team_id", "change_type", "create_date"],
+    select(
+        _user_teams.c.team_id, literal(TeamChange.ROSTER), bindparam("now", type_=DateTime)
+    ).where(_user_teams.c.team_id.not_in(bindparam("recorded", expanding=True))),
+)
+
+
+def changes_cursor_supported(bind):
+    """Whether ``team_changes.id`` can be used as a cursor on ``bind``'s database."""
+    return bind.dialect.name in CURSOR_DIALECTS
+
+
+def record_team_changes(connection, changes):
+    """Insert ``(team_id, change_type)`` pairs; for writes that bypass the ORM session."""
+    if changes:
+        now = datetime.utcnow()
+        connection.execute(TeamChange.__table__.insert(), [
+            {"team_id": team_id, "change_type": change_type, "create_date": now}
+            for team_id, change_type in changes
+        ])
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_changes(session, flush_context):
+    changes = {}
+    for team in session.deleted:
+        if isinstance(team, Team):
+            changes[team.id] = TeamChange.DELETED
+    for team in session.new:
+        if isinstance(team, Team):
+            changes.setdefault(team.id, TeamChange.CREATED)
+    for member in list(session.new) + list(session.deleted):
+        if isinstance(member, TeamPlayer):
+            changes.setdefault(member.team_id, TeamChange.ROSTER)
+    for team in session.dirty:
+        if isinstance(team, Team) and session.is_modified(team, include_collections=False):
+            changes.setdefault(team.id, TeamChange.UPDATED)
+
+    # Nome ou e-mail de um jogador/capitão mudou: o elenco das equipes dele mudou
+    user_ids = [
+        user.id for user in session.dirty
+        if isinstance(user, User)
+        and any(inspect(user).attrs[field].history.has_changes() for field in ROSTER_USER_FIELDS)
+    ]
+    if user_ids:
+        session.connection().execute(_RECORD_USER_TEAMS, {
+            "user_ids": user_ids, "recorded": list(changes), "now": datetime.utcnow(),
+        })
+
+    record_team_changes(session.connection(), list(changes.items()))
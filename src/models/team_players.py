@@ -1,6 +1,6 @@
 from datetime import datetime
-from sqlalchemy import Integer, DateTime, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, backref, mapped_column, relationship
 from src.database.db import db
 
 
@@ -22,10 +22,12 @@ class TeamPlayer(db.Model):
     )
     
     user = relationship("User", backref="team_memberships")
-    team = relationship("Team", backref="team_players")
+    # Excluir uma equipe não carrega o elenco: delete_team o remove com um DELETE pelo team_id
+    team = relationship("Team", backref=backref("team_players", passive_deletes="all"))
     
     __table_args__ = (
         UniqueConstraint('user_id', 'team_id', name='unique_user_team'),
+        Index('ix_team_players_team_id', 'team_id'),
     )
     
     def __init__(self, user_id=None, team_id=None):
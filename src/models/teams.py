@@ -1,6 +1,6 @@
 from datetime import datetime
-from sqlalchemy import Integer, String, DateTime, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, Float, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database.db import db
 
 
@@ -17,6 +17,9 @@ class Team(db.Model):
     )
     is_active: Mapped[bool] = mapped_column(Integer, default=1, nullable=False)
     ranking_points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Rating Elo sem arredondamento, base das atualizações incrementais;
+    # ranking_points é o valor arredondado exibido. NULL: nunca pontuada
+    ranking_rating: Mapped[float] = mapped_column(Float, nullable=True)
     members_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     notes: Mapped[str] = mapped_column(String(350), nullable=True)
     create_date: Mapped[datetime] = mapped_column(
@@ -25,6 +28,18 @@ class Team(db.Model):
     update_date: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # Incrementada a cada UPDATE da linha: ETag e If-Match de /teams/<id>
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+
+    captain = relationship("User", foreign_keys=[captain_id])
+
+    __table_args__ = (
+        # Índice (e não constraint) para poder ser criado em tabelas existentes no SQLite
+        Index("uq_teams_name", "name", unique=True),
+        # Ids nunca reutilizados: elenco, histórico e changes de uma equipe
+        # excluída não podem aparecer numa equipe nova com o mesmo id
+        {"sqlite_autoincrement": True},
+    )
 
     def __init__(self, name=None):
         self.name = name
@@ -0,0 +1,315 @@
+import errno
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from functools import partial
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+from werkzeug.wsgi import FileWrapper
+from src.database.db import db
+from src.utils.events import team_events
+from src.utils.metrics import clear_multiproc_dir
+from src.utils.snapshot import BUFFER_PASSTHROUGH_KEY
+
+logger = logging.getLogger(__name__)
+
+# Socket do cliente no environ, para _BufferPassthrough
+CONNECTION_KEY = "soccer_mvp.connection"
+
+
+class _SendfileWrapper(FileWrapper):
+    """
+    ``wsgi.file_wrapper`` that hands the file to ``socket.sendfile`` (the
+    kernel copies it to the socket, no reads into Python) instead of yielding
+    it in blocks. The first item is empty so the handler sends the status and
+    headers; the body follows straight to the connection. Range responses
+    seek the file first and fall back to reading blocks.
+    """
+
+    def __init__(self, connection, file, buffer_size=8192):
+        super().__init__(file, buffer_size)
+        self.connection = connection
+        self._sendfile = hasattr(file, "fileno")
+        self._headers_sent = False
+
+    def seek(self, *args):
+        self._sendfile = False
+        super().seek(*args)
+
+    def __next__(self):
+        if not self._sendfile:
+            return super().__next__()
+        if not self._headers_sent:
+            self._headers_sent = True
+            return b""
+        self._sendfile = False
+        self.connection.sendfile(self.file)
+        raise StopIteration()
+
+
+class _BufferPassthrough:
+    """
+    WSGI middleware of the workers: it sets ``BUFFER_PASSTHROUGH_KEY`` in the
+    environ, so the snapshot views return memoryviews (bodies mapped from
+    disk) instead of ``bytes``, and sends those chunks straight to the socket
+    with ``sendall``. The werkzeug handler only writes ``bytes``, which would
+    mean copying them. Responses without Content-Length (chunked) get the
+    bytes copy. Without this middleware (``app.run``, other WSGI servers)
+    the views return ``bytes``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        sized = False
+
+        def start(status, headers, exc_info=None):
+            nonlocal sized
+            sized = any(name.lower() == "content-length" for name, _ in headers)
+            return start_response(status, headers, exc_info)
+
+        environ[BUFFER_PASSTHROUGH_KEY] = True
+        return self._chunks(self.app(environ, start), environ[CONNECTION_KEY], lambda: sized)
+
+    @staticmethod
+    def _chunks(iterable, connection, sized):
+        try:
+            for chunk in iterable:
+                if not isinstance(chunk, memoryview):
+                    yield chunk
+                elif sized():
+                    # O handler envia status e headers ao receber o primeiro item
+                    yield b""
+                    connection.sendall(chunk)
+                else:
+                    yield chunk.tobytes()
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+
+class _KeepAliveRequestHandler(WSGIRequestHandler):
+    """
+    Request handler that drops idle keep-alive connections after a timeout,
+    sends files (``send_file``) with sendfile and exposes the client socket
+    to :class:`_BufferPassthrough`.
+    """
+
+    timeout = 5
+
+    def make_environ(self):
+        environ = super().make_environ()
+        environ["wsgi.file_wrapper"] = partial(_SendfileWrapper, self.connection)
+        environ[CONNECTION_KEY] = self.connection
+        return environ
+
+
+class _DrainingWSGIServer(ThreadedWSGIServer):
+    """
+    Threaded server whose ``server_close`` waits for in-flight requests.
+    The listening socket is shared by every worker and non-blocking: all of
+    them wake up for a new connection, and the ones that lose the race get
+    ``BlockingIOError`` from ``accept`` (ignored by ``handle_request``, like
+    any ``OSError``) instead of blocking there, where SIGTERM would not reach
+    them until the next connection.
+    """
+
+    daemon_threads = False
+    block_on_close = True
+
+
+class PreforkServer:
+    """
+    Pre-fork WSGI server.
+    The application is loaded once in the master process, which binds the listening
+    socket and forks ``workers`` children that accept on it. The master restarts
+    workers that die, re-forks all workers on SIGHUP and drains them on SIGTERM/SIGINT.
+    """
+
+    def __init__(self, app, host="0.0.0.0", port=5000, workers=None,
+                 graceful_timeout=30, keepalive_timeout=5):
+        self.app = app
+        self.host = host
+        self.port = int(port)
+        self.num_workers = workers or os.cpu_count() or 1
+        self.graceful_timeout = graceful_timeout
+        self.keepalive_timeout = keepalive_timeout
+
+        self.socket = None
+        self.workers = {}  # pid -> generation
+        self.generation = 0
+        self.master_pid = None
+        self._stopping = False
+        self._reload = False
+        self._last_spawn_failure = 0.0
+
+    # ------------------------------------------------------------------ master
+
+    def run(self):
+        self.master_pid = os.getpid()
+        self.socket = self._bind()
+        self._dispose_engine()
+
+        multiproc_dir = self.app.config.get("METRICS_MULTIPROC_DIR")
+        if multiproc_dir and os.path.isdir(multiproc_dir):
+            clear_multiproc_dir(multiproc_dir)
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        logger.info(
+            "Master %s listening on %s:%s with %s workers",
+            self.master_pid, self.host, self.port, self.num_workers,
+        )
+
+        try:
+            while not self._stopping:
+                self._reap_workers()
+                if self._reload:
+                    self._reload = False
+                    self._reload_workers()
+                self._spawn_workers()
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+
+    def _bind(self):
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(socket.SOMAXCONN)
+        sock.setblocking(False)
+        sock.set_inheritable(True)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def _dispose_engine(self):
+        # Conexões abertas pelo create_app não podem ser compartilhadas entre processos
+        with self.app.app_context():
+            db.engine.dispose()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload = True
+
+    def _spawn_workers(self):
+        current = [pid for pid, gen in self.workers.items() if gen == self.generation]
+        missing = self.num_workers - len(current)
+        if missing <= 0:
+            return
+
+        # Evita um loop de fork quando os workers morrem logo ao iniciar
+        if time.monotonic() - self._last_spawn_failure < 1.0:
+            return
+
+        for _ in range(missing):
+            self._spawn_worker()
+
+    def _spawn_worker(self):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._run_worker()
+            except Exception:
+                logger.exception("Worker %s crashed", os.getpid())
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        self.workers[pid] = self.generation
+        logger.info("Started worker %s (generation %s)", pid, self.generation)
+
+    def _reap_workers(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            generation = self.workers.pop(pid, None)
+            if generation is None:
+                continue
+
+            exit_code = os.waitstatus_to_exitcode(status)
+            if generation == self.generation and not self._stopping:
+                logger.warning("Worker %s exited unexpectedly (code %s), restarting", pid, exit_code)
+                if exit_code != 0:
+                    self._last_spawn_failure = time.monotonic()
+
+    def _reload_workers(self):
+        logger.info("Reloading workers")
+        old_workers = list(self.workers)
+        self.generation += 1
+        self._last_spawn_failure = 0.0
+        self._spawn_workers()
+        for pid in old_workers:
+            self._kill_worker(pid, signal.SIGTERM)
+
+    def _kill_worker(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except OSError as e:
+            if e.errno != errno.ESRCH:
+                raise
+
+    def _shutdown(self):
+        logger.info("Shutting down, draining %s workers", len(self.workers))
+        for pid in list(self.workers):
+            self._kill_worker(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self._reap_workers()
+            time.sleep(0.1)
+
+        for pid in list(self.workers):
+            logger.warning("Worker %s did not stop in time, killing it", pid)
+            self._kill_worker(pid, signal.SIGKILL)
+        while self.workers:
+            pid, _ = os.waitpid(-1, 0)
+            self.workers.pop(pid, None)
+
+        self.socket.close()
+
+    # ------------------------------------------------------------------ worker
+
+    def _run_worker(self):
+        alive = True
+
+        def stop(signum, frame):
+            nonlocal alive
+            alive = False
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        random.seed()
+
+        handler = type("WorkerRequestHandler", (_KeepAliveRequestHandler,), {
+            "timeout": self.keepalive_timeout,
+        })
+        server = _DrainingWSGIServer(
+            self.host, self.port, _BufferPassthrough(self.app), handler=handler, fd=self.socket.fileno()
+        )
+        server.timeout = 1.0
+        # socket.fromfd não herda o modo do socket do master
+        server.socket.setblocking(False)
+
+        while alive and os.getppid() == self.master_pid:
+            server.handle_request()
+
+        # Encerra os streams SSE (clientes retomam em outro worker via Last-Event-ID),
+        # fecha o socket e espera as requisições em andamento terminarem
+        team_events.close()
+        server.server_close()
@@ -0,0 +1,143 @@
+import threading
+import time
+from flask import current_app, jsonify, request
+from src.utils.metrics import metrics
+
+ENVIRON_KEY = "soccer_mvp.admission"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+admission_shed = metrics.counter(
+    "admission_shed_total", "Requests rejected with 503 by admission control.", ("route_class",)
+)
+admission_limit = metrics.gauge(
+    "admission_limit", "Current adaptive concurrency limit.", ("route_class",)
+)
+admission_in_flight = metrics.gauge(
+    "admission_in_flight", "Requests admitted and still running.", ("route_class",)
+)
+
+
+def admission_exempt(f):
+    """Decorator that keeps a view out of admission control (e.g. long-lived streams)."""
+    f.admission_exempt = True
+    return f
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by latency: every completion under
+    ``latency_target`` adds ``1 / limit`` (about +1 per round of requests),
+    a slower one multiplies the limit by ``backoff``, at most once per
+    ``latency_target`` so a burst of slow requests counts as one signal.
+    """
+
+    def __init__(self, name, initial, min_limit, max_limit, latency_target, backoff=0.9):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            in_flight = self.in_flight
+        admission_in_flight.set(in_flight, route_class=self.name)
+        return True
+
+    def release(self, latency):
+        now = time.monotonic()
+        with self._lock:
+            utilized = self.in_flight >= self.limit / 2
+            self.in_flight -= 1
+            if latency > self.latency_target:
+                if now - self._last_decrease >= self.latency_target:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            elif utilized:
+                # Só cresce quando o limite atual está de fato sendo usado
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            limit, in_flight = self.limit, self.in_flight
+        admission_limit.set(int(limit), route_class=self.name)
+        admission_in_flight.set(in_flight, route_class=self.name)
+
+
+def route_class_for(view, method):
+    """The ``@offload`` class of the view, otherwise "reads" or "writes" by HTTP method."""
+    route_class = getattr(view, "route_class", None)
+    if route_class is not None:
+        return route_class
+    return "reads" if method in READ_METHODS else "writes"
+
+
+def _shed_response(retry_after):
+    response = jsonify({
+        "error": "Service unavailable",
+        "message": "Servidor sobrecarregado. Por favor, tente novamente."
+    })
+    response.status_code = 503
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def init_admission_control(app):
+    """
+    Cap concurrent requests per route class (auth, writes, uploads, reads)
+    with an :class:`AdaptiveLimiter` each. Requests over the limit get an
+    immediate 503 with ``Retry-After`` instead of queueing in server
+    threads. Endpoints or blueprints in ``ADMISSION_EXEMPT_ENDPOINTS`` and
+    views marked :func:`admission_exempt` are never limited.
+    """
+    backoff = app.config["ADMISSION_BACKOFF"]
+    limiters = {
+        route_class: AdaptiveLimiter(
+            route_class,
+            initial=settings["initial"],
+            min_limit=settings["min"],
+            max_limit=settings["max"],
+            latency_target=settings["latency_target"],
+            backoff=backoff,
+        )
+        for route_class, settings in app.config["ADMISSION_LIMITS"].items()
+    }
+    for limiter in limiters.values():
+        admission_limit.set(int(limiter.limit), route_class=limiter.name)
+    exempt_endpoints = set(app.config["ADMISSION_EXEMPT_ENDPOINTS"])
+    retry_after = app.config["ADMISSION_RETRY_AFTER"]
+
+    @app.before_request
+    def admit_request():
+        if request.endpoint is None or {request.endpoint, request.blueprint} & exempt_endpoints:
+            return None
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, "admission_exempt", False):
+            return None
+
+        route_class = route_class_for(view, request.method)
+        limiter = limiters.get(route_class)
+        if limiter is None:
+            return None
+        if not limiter.try_acquire():
+            admission_shed.inc(route_class=route_class)
+            return _shed_response(retry_after)
+
+        request.environ[ENVIRON_KEY] = (limiter, time.perf_counter(), threading.get_ident())
+        return None
+
+    @app.teardown_request
+    def release_request(exc):
+        admitted = request.environ.get(ENVIRON_KEY)
+        # Só o contexto original libera a vaga (views em offload têm um contexto copiado)
+        if admitted is None or admitted[2] != threading.get_ident():
+            return
+        request.environ.pop(ENVIRON_KEY)
+        limiter, started, _ = admitted
+        limiter.release(time.perf_counter() - started)
+
+    app.extensions["admission"] = limiters
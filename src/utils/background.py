@@ -0,0 +1,40 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundThread:
+    """
+    Daemon thread that calls ``target`` every ``interval`` seconds.
+    Threads do not survive ``fork``, so ``ensure_started`` starts the thread
+    once per process and is cheap enough to be called on every request.
+    """
+
+    def __init__(self, name, target, interval):
+        self.name = name
+        self.target = target
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.target()
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
@@ -0,0 +1,143 @@
+import gzip
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from flask import current_app, request
+from src.utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedBodyCache:
+    """LRU cache of compressed bodies, bounded by the total size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._items[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+
+compressed_responses = metrics.counter(
+    "http_compression_responses_total", "Responses compressed, by encoding.", ("encoding",)
+)
+compression_cache_hits = metrics.counter(
+    "http_compression_cache_hits_total", "Compressed bodies served from the cache.", ("encoding",)
+)
+compression_bytes_in = metrics.counter(
+    "http_compression_bytes_in_total", "Response bytes before compression.", ("encoding",)
+)
+compression_bytes_out = metrics.counter(
+    "http_compression_bytes_out_total", "Response bytes after compression.", ("encoding",)
+)
+compression_cpu_seconds = metrics.counter(
+    "http_compression_cpu_seconds_total", "Thread CPU time spent compressing responses.", ("encoding",)
+)
+
+
+def _compress(body, encoding, config):
+    if encoding == "br":
+        return brotli.compress(body, quality=config["COMPRESS_BROTLI_QUALITY"])
+    return gzip.compress(body, compresslevel=config["COMPRESS_LEVEL"], mtime=0)
+
+
+def init_compression(app):
+    """
+    Register an ``after_request`` hook that compresses responses with gzip
+    (or brotli, when installed) according to the request's Accept-Encoding.
+    Bodies smaller than ``COMPRESS_MIN_SIZE`` are sent as they are, and the
+    compressed bodies of responses that carry an ETag are kept in an LRU cache.
+    """
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+    cache = CompressedBodyCache(app.config["COMPRESS_CACHE_MAX_BYTES"])
+
+    @app.after_request
+    def compress_response(response):
+        config = current_app.config
+
+        if response.mimetype not in config["COMPRESS_MIMETYPES"]:
+            return response
+
+        if (
+            not 200 <= response.status_code < 300
+            or response.status_code == 204
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+
+        # Os pedaços do corpo como estão (memoryviews dos snapshots inclusive):
+        # só são juntados em bytes quando for preciso comprimir
+        chunks = list(response.iter_encoded())
+        size = sum(len(chunk) for chunk in chunks)
+        if size < config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        etag, _ = response.get_etag()
+        cache_key = None
+        compressed = None
+        if etag:
+            crc = 0
+            for chunk in chunks:
+                crc = zlib.crc32(chunk, crc)
+            cache_key = (request.path, etag, encoding, crc)
+            compressed = cache.get(cache_key)
+
+        cache_hit = compressed is not None
+        cpu_seconds = 0.0
+        if not cache_hit:
+            body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+            start = time.thread_time()
+            compressed = _compress(body, encoding, config)
+            cpu_seconds = time.thread_time() - start
+            if cache_key is not None:
+                cache.set(cache_key, compressed)
+
+        compressed_responses.inc(encoding=encoding)
+        compression_bytes_in.inc(size, encoding=encoding)
+        compression_bytes_out.inc(len(compressed), encoding=encoding)
+        if cache_hit:
+            compression_cache_hits.inc(encoding=encoding)
+        else:
+            compression_cpu_seconds.inc(cpu_seconds, encoding=encoding)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            # O corpo mudou, então a ETag forte passa a ser fraca (como faz o nginx)
+            response.set_etag(etag, weak=True)
+
+        return response
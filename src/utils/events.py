@@ -0,0 +1,210 @@
+import json
+import os
+import queue
+import threading
+import time
+from sqlalchemy import select
+from src.database.db import db
+from src.models.team_changes import TeamChange
+from src.utils.background import BackgroundThread
+
+
+class Subscription:
+    """A client stream: a bounded queue of changes for one team, or all teams when ``team_id`` is None."""
+
+    def __init__(self, team_id, maxsize, start_id):
+        self.team_id = team_id
+        self.start_id = start_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        # Cliente lento: o stream é encerrado e o cliente retoma via Last-Event-ID
+        self.dropped = False
+
+    def matches(self, change):
+        return self.team_id is None or self.team_id == change["team_id"]
+
+
+class TeamEventBroker:
+    """
+    In-process pub/sub for team changes.
+
+    The ``team_changes`` table is the outbox shared by every worker process:
+    each process polls it (only when ``PRAGMA data_version`` says another
+    connection committed) and fans new rows out to its own subscribers.
+    """
+
+    def __init__(self, poll_interval=0.25, queue_size=100, replay_limit=1000):
+        self.engine = None
+        self.queue_size = queue_size
+        self.replay_limit = replay_limit
+        self.closed = threading.Event()
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._poller = BackgroundThread("team-events-poll", self.poll, poll_interval)
+        self._connection = None
+        self._pid = None
+        self._data_version = None
+        self._last_id = None
+
+    def configure(self, engine, poll_interval, queue_size, replay_limit):
+        self.engine = engine
+        self.queue_size = queue_size
+        self.replay_limit = replay_limit
+        self._poller.interval = poll_interval
+
+    def subscribe(self, team_id=None, last_event_id=None):
+        """Subscribe to the changes after ``last_event_id`` (default: from now on)."""
+        if last_event_id is None:
+            last_event_id = self.latest_id()
+        subscription = Subscription(team_id, self.queue_size, last_event_id)
+        self._poller.ensure_started()
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def close(self):
+        """Ask every open stream of this process to finish (worker shutdown)."""
+        self.closed.set()
+
+    def publish(self, change):
+        with self._lock:
+            subscribers = [subscription for subscription in self._subscribers if subscription.matches(change)]
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(change)
+            except queue.Full:
+                subscription.dropped = True
+
+    def latest_id(self, connection=None):
+        query = select(TeamChange.id).order_by(TeamChange.id.desc()).limit(1)
+        if connection is not None:
+            return connection.scalar(query) or 0
+        with self.engine.connect() as conn:
+            return conn.scalar(query) or 0
+
+    def changes_since(self, last_id, team_id=None, connection=None):
+        """Read up to ``replay_limit`` changes after ``last_id`` from the outbox."""
+        query = (
+            select(TeamChange.id, TeamChange.team_id, TeamChange.change_type, TeamChange.create_date)
+            .where(TeamChange.id > last_id)
+            .order_by(TeamChange.id)
+            .limit(self.replay_limit)
+        )
+        if team_id is not None:
+            query = query.where(TeamChange.team_id == team_id)
+
+        if connection is not None:
+            rows = connection.execute(query).all()
+        else:
+            with self.engine.connect() as conn:
+                rows = conn.execute(query).all()
+        return [
+            {
+                "id": row.id,
+                "team_id": row.team_id,
+                "change_type": row.change_type,
+                "create_date": row.create_date.isoformat(),
+            }
+            for row in rows
+        ]
+
+    def poll(self):
+        # Conexão própria e persistente: data_version só muda com commits de outras conexões
+        if self._pid != os.getpid():
+            self._connection = self.engine.connect()
+            self._pid = os.getpid()
+            self._data_version = None
+            self._last_id = None
+
+        if self._last_id is None:
+            with self._lock:
+                start_ids = [subscription.start_id for subscription in self._subscribers]
+            if not start_ids:
+                return
+            # Começa do menor cursor pedido para não haver lacuna com o replay
+            self._last_id = min(start_ids)
+
+        conn = self._connection
+        try:
+            if self.engine.dialect.name == "sqlite":
+                data_version = conn.exec_driver_sql("PRAGMA data_version").scalar()
+                if data_version == self._data_version:
+                    return
+                self._data_version = data_version
+
+            while True:
+                changes = self.changes_since(self._last_id, connection=conn)
+                for change in changes:
+                    self.publish(change)
+                if changes:
+                    self._last_id = changes[-1]["id"]
+                if len(changes) < self.replay_limit:
+                    break
+        finally:
+            # Não mantém a transação de leitura aberta entre as consultas
+            conn.rollback()
+
+
+team_events = TeamEventBroker()
+
+
+def format_event(change):
+    return (
+        f"id: {change['id']}\n"
+        f"event: {change['change_type']}\n"
+        f"data: {json.dumps(change)}\n\n"
+    )
+
+
+def event_stream(subscription, heartbeat_interval, max_duration, retry_ms):
+    """
+    Generate the SSE stream of ``subscription``: first the changes after its
+    ``start_id`` read from the outbox, then live changes, with comment
+    heartbeats while idle. The stream ends after ``max_duration`` seconds, on
+    worker shutdown or when the client falls behind; clients reconnect with
+    ``Last-Event-ID`` and lose nothing.
+    """
+    try:
+        yield f"retry: {retry_ms}\n\n"
+
+        last_sent = subscription.start_id
+        while True:
+            changes = team_events.changes_since(last_sent, subscription.team_id)
+            for change in changes:
+                yield format_event(change)
+                last_sent = change["id"]
+            if len(changes) < team_events.replay_limit:
+                break
+
+        deadline = time.monotonic() + max_duration
+        while not subscription.dropped and not team_events.closed.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                change = subscription.queue.get(timeout=min(heartbeat_interval, remaining))
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+            # Já entregue pelo replay
+            if change["id"] <= last_sent:
+                continue
+            yield format_event(change)
+            last_sent = change["id"]
+    finally:
+        team_events.unsubscribe(subscription)
+
+
+def init_events(app):
+    """Configure the team change broker used by the SSE routes."""
+    with app.app_context():
+        engine = db.engine
+    team_events.configure(
+        engine,
+        poll_interval=app.config["EVENTS_POLL_INTERVAL"],
+        queue_size=app.config["EVENTS_QUEUE_SIZE"],
+        replay_limit=app.config["EVENTS_REPLAY_LIMIT"],
+    )
@@ -0,0 +1,152 @@
+import asyncio
+import queue
+import time
+from concurrent.futures import Future
+from functools import wraps
+from flask import copy_current_request_context
+from sqlalchemy.orm import Session
+from src.database.db import db
+from src.utils.background import BackgroundThread
+from src.utils.metrics import metrics
+from src.utils.offload import HAS_ASYNC_VIEWS
+
+group_commit_batch_size = metrics.histogram(
+    "db_group_commit_batch_size",
+    "Number of write requests committed together by the group-commit writer.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+def batched_write(f):
+    """
+    Decorator that opts a short, single-row write view (also marked
+    ``@offload("writes")``) into the group-commit writer, see
+    :func:`init_group_commit`. Heavy writes (bulk imports, uploads) stay on
+    the offload pool: on the single writer thread they would stall every
+    request queued behind them.
+    """
+    f.batched_write = True
+    return f
+
+
+class GroupCommitWriter:
+    """
+    Single writer thread that applies queued write functions in batched transactions.
+
+    Each function receives a session joined to the batch transaction through a
+    SAVEPOINT, so its ``commit``/``rollback`` only affect its own work; the
+    batch is committed once (one fsync on SQLite) and only then are the
+    callers' futures resolved. If the batch commit fails every caller gets the error.
+    """
+
+    def __init__(self, engine, max_batch_size=64, max_delay=0.002):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = BackgroundThread("group-commit", self.run_batch, 0)
+
+    def submit(self, fn):
+        """Queue ``fn(session)`` and return a future with its result."""
+        future = Future()
+        self._queue.put((fn, future))
+        self._thread.ensure_started()
+        return future
+
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=1)]
+        except queue.Empty:
+            return []
+
+        # Junta o que chegar até max_delay depois da primeira escrita
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run_batch(self):
+        batch = self._collect()
+        if not batch:
+            return
+
+        outcomes = []
+        try:
+            with self.engine.connect() as conn:
+                if self.engine.dialect.name == "sqlite":
+                    # BEGIN explícito: sem ele o pysqlite trataria o primeiro
+                    # SAVEPOINT como a transação e o RELEASE faria o commit
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+                for fn, future in batch:
+                    session = Session(bind=conn, join_transaction_mode="create_savepoint")
+                    try:
+                        outcomes.append((future, fn(session), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                    finally:
+                        session.close()
+                conn.commit()
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        group_commit_batch_size.observe(len(batch))
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+def init_group_commit(app):
+    """
+    Route the views marked :func:`batched_write` through a :class:`GroupCommitWriter`.
+    The request is answered only after the batch holding its write commits.
+    These views are then left alone by :func:`~src.utils.offload.init_offload`;
+    the other ``@offload("writes")`` views keep running on the offload pool.
+    """
+    with app.app_context():
+        engine = db.engine
+    writer = GroupCommitWriter(
+        engine,
+        max_batch_size=app.config["GROUP_COMMIT_MAX_BATCH_SIZE"],
+        max_delay=app.config["GROUP_COMMIT_MAX_DELAY_MS"] / 1000,
+    )
+
+    for endpoint, view in list(app.view_functions.items()):
+        if getattr(view, "batched_write", False):
+            app.view_functions[endpoint] = _wrap_view(view, writer)
+
+    app.extensions["group_commit"] = writer
+
+
+def _wrap_view(view, writer):
+    def submit(*args, **kwargs):
+        @copy_current_request_context
+        def run_view(session):
+            # db.session passa a ser a sessão ligada à transação do lote
+            db.session.registry.set(session)
+            return view(*args, **kwargs)
+
+        return writer.submit(run_view)
+
+    if HAS_ASYNC_VIEWS:
+        @wraps(view)
+        async def async_view(*args, **kwargs):
+            return await asyncio.wrap_future(submit(*args, **kwargs))
+
+        async_view.group_commit = True
+        return async_view
+
+    @wraps(view)
+    def sync_view(*args, **kwargs):
+        return submit(*args, **kwargs).result()
+
+    sync_view.group_commit = True
+    return sync_view
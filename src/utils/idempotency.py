@@ -0,0 +1,226 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+import jwt
+from flask import Response, current_app, jsonify, request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from src.database.db import db
+from src.models.idempotency_keys import IdempotencyKey
+from src.utils.background import BackgroundThread
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+
+# Requisições em andamento neste processo: duplicatas esperam o evento em vez de consultar o banco
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def idempotent(f):
+    """
+    Decorator that makes a POST view honour the ``Idempotency-Key`` header,
+    see :func:`init_idempotency`.
+    """
+    f.idempotent = True
+    return f
+
+
+def _forget(scope, done):
+    with _in_flight_lock:
+        _in_flight.pop(scope, None)
+    done.set()
+
+
+def _caller():
+    """
+    Subject the key belongs to, so callers never see each other's responses:
+    the user of a valid token, else a digest of the credentials sent, else
+    ``""`` for anonymous requests.
+    """
+    token = request.cookies.get("token")
+    if token:
+        try:
+            data = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
+            return f"user:{data['user_id']}"
+        except (jwt.InvalidTokenError, KeyError):
+            pass
+    credentials = (token or "") + "\0" + (request.headers.get("Authorization") or "")
+    if credentials == "\0":
+        return ""
+    return "credentials:" + hashlib.sha256(credentials.encode()).hexdigest()
+
+
+def _request_hash():
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.full_path.encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _error(status, error, message):
+    response = jsonify({"error": error, "message": message})
+    response.status_code = status
+    return response
+
+
+def _matches(key, caller, method, path):
+    return (
+        IdempotencyKey.key == key, IdempotencyKey.caller == caller,
+        IdempotencyKey.method == method, IdempotencyKey.path == path,
+    )
+
+
+def _replay(row):
+    response = Response(row.response_body, status=row.status_code, mimetype=row.mimetype)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+class _IdempotencyStore:
+    """Rows are written on their own connection, outside the view's session and transaction."""
+
+    def __init__(self, engine, ttl, lock_timeout):
+        self.engine = engine
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+
+    def claim(self, key, caller, method, path, request_hash):
+        """Insert an in-progress row; return ``None`` on success or the existing row."""
+        now = datetime.utcnow()
+        for _ in range(2):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(IdempotencyKey).values(
+                        key=key, caller=caller, method=method, path=path, request_hash=request_hash,
+                        state=IdempotencyKey.IN_PROGRESS, create_date=now,
+                        expires_at=now + timedelta(seconds=self.ttl),
+                    ))
+                return None
+            except IntegrityError:
+                pass
+
+            row = self.get(key, caller, method, path)
+            if row is None:
+                continue
+            # Chave expirada ou abandonada por um processo que morreu: assume o lugar dela
+            abandoned = row.state == IdempotencyKey.IN_PROGRESS and row.create_date < now - timedelta(seconds=self.lock_timeout)
+            if row.expires_at > now and not abandoned:
+                return row
+            self.release(key, caller, method, path)
+        return self.get(key, caller, method, path)
+
+    def get(self, key, caller, method, path):
+        with self.engine.connect() as conn:
+            return conn.execute(select(IdempotencyKey).where(*_matches(key, caller, method, path))).first()
+
+    def complete(self, key, caller, method, path, response):
+        with self.engine.begin() as conn:
+            conn.execute(update(IdempotencyKey).where(*_matches(key, caller, method, path)).values(
+                state=IdempotencyKey.COMPLETED,
+                status_code=response.status_code,
+                mimetype=response.mimetype,
+                response_body=response.get_data(),
+            ))
+
+    def release(self, key, caller, method, path):
+        with self.engine.begin() as conn:
+            conn.execute(delete(IdempotencyKey).where(*_matches(key, caller, method, path)))
+
+    def purge(self):
+        with self.engine.begin() as conn:
+            conn.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+
+
+def init_idempotency(app):
+    """
+    Wrap the views marked with :func:`idempotent`.
+
+    The first request with a given ``Idempotency-Key`` (per caller, method
+    and path, see :func:`_caller`) runs the view and its response is stored for ``IDEMPOTENCY_TTL`` seconds;
+    retries get the stored response back with ``Idempotent-Replayed: true``.
+    A duplicate that arrives while the first is still running waits for it
+    (up to ``IDEMPOTENCY_WAIT_TIMEOUT``) instead of running the view again.
+    5xx responses are not stored so the request can be retried. Must run
+    after :func:`~src.utils.offload.init_offload`, so the key is claimed
+    before any work is queued.
+    """
+    with app.app_context():
+        engine = db.engine
+    store = _IdempotencyStore(engine, app.config["IDEMPOTENCY_TTL"], app.config["IDEMPOTENCY_LOCK_TIMEOUT"])
+    purger = BackgroundThread("idempotency-purge", store.purge, app.config["IDEMPOTENCY_PURGE_INTERVAL"])
+    wait_timeout = app.config["IDEMPOTENCY_WAIT_TIMEOUT"]
+
+    for endpoint, view in list(app.view_functions.items()):
+        if getattr(view, "idempotent", False):
+            app.view_functions[endpoint] = _wrap_view(view, store, purger, wait_timeout)
+
+    app.extensions["idempotency"] = store
+
+
+def _wrap_view(view, store, purger, wait_timeout):
+    @wraps(view)
+    def idempotent_view(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return current_app.ensure_sync(view)(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return _error(400, "Invalid request", f"O header {HEADER} deve ter entre 1 e {MAX_KEY_LENGTH} caracteres")
+
+        purger.ensure_started()
+        request_hash = _request_hash()
+        scope = (key, _caller(), request.method, request.path)
+        deadline = time.monotonic() + wait_timeout
+
+        while True:
+            with _in_flight_lock:
+                local = _in_flight.get(scope)
+                if local is None:
+                    done = _in_flight[scope] = threading.Event()
+
+            if local is None:
+                try:
+                    row = store.claim(*scope, request_hash)
+                except BaseException:
+                    _forget(scope, done)
+                    raise
+                if row is None:
+                    break
+                # Já concluída ou em andamento em outro worker
+                _forget(scope, done)
+            else:
+                local.wait(max(0, deadline - time.monotonic()))
+                row = store.get(*scope)
+                if row is None:
+                    # A original falhou (5xx ou exceção) e liberou a chave: executa de novo
+                    if time.monotonic() < deadline:
+                        continue
+                    return _error(409, "Conflict", "Uma requisição com esta Idempotency-Key ainda está em andamento.")
+
+            if row.request_hash != request_hash:
+                return _error(422, "Unprocessable entity", "Esta Idempotency-Key já foi usada com outra requisição.")
+            if row.state == IdempotencyKey.COMPLETED:
+                return _replay(row)
+            # Em andamento em outro worker: consulta o banco até terminar
+            if time.monotonic() >= deadline:
+                return _error(409, "Conflict", "Uma requisição com esta Idempotency-Key ainda está em andamento.")
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            response = current_app.make_response(current_app.ensure_sync(view)(*args, **kwargs))
+            if response.status_code < 500 and not response.is_streamed:
+                store.complete(*scope, response)
+            else:
+                store.release(*scope)
+            return response
+        except BaseException:
+            store.release(*scope)
+            raise
+        finally:
+            _forget(scope, done)
+
+    return idempotent_view
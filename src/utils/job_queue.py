@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, select, update
+from src.database.db import db
+from src.models.jobs import Job
+from src.utils.background import BackgroundThread
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_ERROR_LENGTH = 4000
+
+jobs_processed = metrics.counter(
+    "jobs_processed_total", "Job executions by outcome: done, retried or failed.", ("name", "outcome")
+)
+job_duration = metrics.histogram("job_duration_seconds", "Job execution time.", ("name",))
+
+_registry = {}
+
+
+def job(name, max_attempts=None):
+    """
+    Register ``f`` as the job ``name``. The function receives the payload as
+    keyword arguments and runs in the worker's transaction: it must not
+    commit, its writes are committed together with the job's completion.
+    """
+    def decorator(f):
+        f.job_name = name
+        f.max_attempts = max_attempts
+        _registry[name] = f
+        return f
+
+    return decorator
+
+
+def enqueue(name, payload=None, run_at=None, max_attempts=None, session=None):
+    """
+    Add a job to ``session`` (default ``db.session``). Nothing runs until the
+    caller commits, and a rollback discards the job with the caller's writes.
+    ``name`` is a job name or a function registered with :func:`job`.
+    """
+    func = _registry.get(name) if isinstance(name, str) else name
+    if func is None:
+        raise LookupError(f"Unknown job {name!r}")
+    config = job_queue.config
+    new_job = Job(
+        name=func.job_name,
+        payload=json.dumps(payload or {}),
+        status=Job.QUEUED,
+        run_at=run_at or datetime.utcnow(),
+        attempts=0,
+        max_attempts=max_attempts or func.max_attempts or config.get("JOBS_MAX_ATTEMPTS", 5),
+    )
+    session = session or db.session()
+    session.add(new_job)
+    # Acorda os workers deste processo assim que o job estiver gravado
+    event.listen(session, "after_commit", lambda _: job_queue.wakeup(), once=True)
+    return new_job
+
+
+class JobQueue:
+    """
+    Workers that poll the ``jobs`` table. A job is claimed with a conditional
+    UPDATE (``status = 'queued'``), so any number of threads and processes
+    can share the table. Failures are retried with exponential backoff and
+    jitter until ``max_attempts``; jobs left ``running`` by a dead worker for
+    longer than ``JOBS_LOCK_TIMEOUT`` are queued again.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.config = {}
+        self._workers = []
+        self._maintenance = None
+        self._wakeup = threading.Event()
+
+    def configure(self, app):
+        self.app = app
+        self.config = app.config
+        self._workers = [
+            BackgroundThread(f"jobs-worker-{index}", self.work_once, 0)
+            for index in range(app.config["JOBS_CONCURRENCY"])
+        ]
+        self._maintenance = BackgroundThread("jobs-maintenance", self.maintain, app.config["JOBS_MAINTENANCE_INTERVAL"])
+
+    def ensure_started(self):
+        for worker in self._workers:
+            worker.ensure_started()
+        self._maintenance.ensure_started()
+
+    def wakeup(self):
+        self._wakeup.set()
+
+    def _worker_id(self):
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+    def claim(self):
+        """Mark the next due job as running and return it, or ``None``."""
+        engine = db.engine
+        while True:
+            now = datetime.utcnow()
+            with engine.begin() as conn:
+                row = conn.execute(
+                    select(Job.id)
+                    .where(Job.status == Job.QUEUED, Job.run_at <= now)
+                    .order_by(Job.run_at, Job.id)
+                    .limit(1)
+                ).first()
+                if row is None:
+                    return None
+                claimed = conn.execute(
+                    update(Job)
+                    .where(Job.id == row.id, Job.status == Job.QUEUED)
+                    .values(
+                        status=Job.RUNNING, attempts=Job.attempts + 1,
+                        locked_at=now, locked_by=self._worker_id(), update_date=now,
+                    )
+                ).rowcount
+                if claimed:
+                    return conn.execute(select(Job.__table__).where(Job.id == row.id)).first()
+            # Outro worker pegou o mesmo job: tenta o próximo
+
+    def run(self, claimed):
+        func = _registry.get(claimed.name)
+        started = time.perf_counter()
+        try:
+            if func is None:
+                raise LookupError(f"Unknown job {claimed.name!r}")
+            func(**json.loads(claimed.payload))
+            finished = db.session.execute(
+                update(Job)
+                .where(Job.id == claimed.id, Job.status == Job.RUNNING, Job.locked_by == claimed.locked_by)
+                .values(status=Job.DONE, locked_at=None, last_error=None, update_date=datetime.utcnow())
+            ).rowcount
+            if not finished:
+                # Passou de JOBS_LOCK_TIMEOUT e foi devolvido à fila: o novo dono conclui o job
+                db.session.rollback()
+                logger.warning("Job %s #%s lost its lock, discarding this run", claimed.name, claimed.id)
+                return
+            db.session.commit()
+            jobs_processed.inc(name=claimed.name, outcome="done")
+        except Exception:
+            db.session.rollback()
+            self._retry_or_fail(claimed, traceback.format_exc())
+        finally:
+            db.session.remove()
+            job_duration.observe(time.perf_counter() - started, name=claimed.name)
+
+    def _retry_or_fail(self, claimed, error):
+        now = datetime.utcnow()
+        values = {"locked_at": None, "locked_by": None, "last_error": error[-MAX_ERROR_LENGTH:], "update_date": now}
+        if claimed.attempts >= claimed.max_attempts:
+            values["status"] = Job.FAILED
+            outcome = "failed"
+            logger.error("Job %s #%s failed after %s attempts:\n%s", claimed.name, claimed.id, claimed.attempts, error)
+        else:
+            delay = min(
+                self.config["JOBS_BACKOFF_MAX"],
+                self.config["JOBS_BACKOFF_BASE"] * 2 ** (claimed.attempts - 1),
+            )
+            # Jitter para que falhas simultâneas não voltem todas juntas
+            values["status"] = Job.QUEUED
+            values["run_at"] = now + timedelta(seconds=delay * random.uniform(0.5, 1.0))
+            outcome = "retried"
+            logger.warning("Job %s #%s failed (attempt %s), retrying in %.1fs", claimed.name, claimed.id, claimed.attempts, delay)
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(Job)
+                .where(Job.id == claimed.id, Job.status == Job.RUNNING, Job.locked_by == claimed.locked_by)
+                .values(**values)
+            )
+        jobs_processed.inc(name=claimed.name, outcome=outcome)
+
+    def work_once(self):
+        with self.app.app_context():
+            claimed = self.claim()
+            if claimed is not None:
+                self.run(claimed)
+                return
+        self._wakeup.wait(self.config["JOBS_POLL_INTERVAL"])
+        self._wakeup.clear()
+
+    def maintain(self):
+        """Requeue jobs abandoned by dead workers and purge old finished jobs."""
+        now = datetime.utcnow()
+        with self.app.app_context(), db.engine.begin() as conn:
+            conn.execute(
+                update(Job)
+                .where(Job.status == Job.RUNNING, Job.locked_at < now - timedelta(seconds=self.config["JOBS_LOCK_TIMEOUT"]))
+                .values(status=Job.QUEUED, locked_at=None, locked_by=None, run_at=now, update_date=now)
+            )
+            conn.execute(
+                delete(Job).where(
+                    Job.status == Job.DONE,
+                    Job.update_date < now - timedelta(seconds=self.config["JOBS_RETENTION"]),
+                )
+            )
+
+
+job_queue = JobQueue()
+
+
+def init_job_queue(app, start_workers=True):
+    """
+    Configure the job queue and, with ``start_workers``, run its workers in
+    every server process (started on the first request, after the fork).
+    ``flask jobs worker`` runs them in a separate process instead.
+    """
+    # Registra os jobs da aplicação
+    import src.jobs  # noqa: F401
+
+    job_queue.configure(app)
+    if start_workers:
+        @app.before_request
+        def start_job_workers():
+            job_queue.ensure_started()
+
+    app.extensions["job_queue"] = job_queue
@@ -0,0 +1,155 @@
+import hashlib
+import os
+import re
+import tempfile
+from PIL import Image, ImageOps
+
+# Formatos aceitos no upload -> extensão do original
+IMAGE_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+MIMETYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp", "gif": "image/gif"}
+VARIANT_FORMAT = "webp"
+VARIANT_QUALITY = 82
+
+URL_PREFIX = "/media/images"
+DIGEST_PATTERN = r"[0-9a-f]{64}"
+ORIGINAL_PATTERN = r"original\.(?:jpg|png|webp|gif)"
+VARIANT_PATTERN = r"[a-z]+-[a-z]+-\d+x\d+\.webp"
+FILENAME_RE = re.compile(rf"(?:{ORIGINAL_PATTERN}|{VARIANT_PATTERN})")
+DIGEST_RE = re.compile(DIGEST_PATTERN)
+ORIGINAL_URL_RE = re.compile(rf"{re.escape(URL_PREFIX)}/({DIGEST_PATTERN})/original\.(jpg|png|webp|gif)")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class InvalidImage(ValueError):
+    """Upload that is not an accepted image (the message goes back to the client)."""
+
+
+def image_dir(root, digest):
+    """Directory of an image and its variants: ``images/ab/<digest>``, 256 buckets."""
+    return os.path.join(root, "images", digest[:2], digest)
+
+
+def original_filename(ext):
+    return f"original.{ext}"
+
+
+def variant_filename(kind, name, size):
+    width, height = size
+    return f"{kind}-{name}-{width}x{height}.{VARIANT_FORMAT}"
+
+
+def image_url(digest, filename):
+    return f"{URL_PREFIX}/{digest}/{filename}"
+
+
+def parse_image_url(url):
+    """``(digest, ext)`` of a URL returned by the upload, ``None`` for external URLs."""
+    match = ORIGINAL_URL_RE.fullmatch(url) if url else None
+    return match.groups() if match else None
+
+
+def variant_url(url, kind, name, variants):
+    """URL of the ``name`` variant of an uploaded image, ``None`` for external URLs."""
+    parsed = parse_image_url(url)
+    size = variants.get(kind, {}).get(name)
+    if parsed is None or size is None:
+        return None
+    return image_url(parsed[0], variant_filename(kind, name, size))
+
+
+def inspect_image(stream, max_pixels):
+    """
+    Extension of the uploaded image, read from its header (not from the name
+    or Content-Type sent by the client). Raises :class:`InvalidImage`.
+    """
+    try:
+        with Image.open(stream) as image:
+            ext = IMAGE_FORMATS.get(image.format)
+            if ext is None:
+                raise InvalidImage("Formato não suportado. Use JPEG, PNG, WEBP ou GIF.")
+            width, height = image.size
+            if width * height > max_pixels:
+                raise InvalidImage(f"A imagem não pode ter mais de {max_pixels} pixels")
+            image.verify()
+    except InvalidImage:
+        raise
+    except Exception:
+        raise InvalidImage("O arquivo enviado não é uma imagem válida")
+    finally:
+        stream.seek(0)
+    return ext
+
+
+def store_original(stream, root, ext):
+    """
+    Copy the upload to ``images/ab/<sha256>/original.<ext>`` and return the
+    digest. The file is hashed while it is written to a temporary file in the
+    same tree and renamed into place, so readers never see a partial file and
+    the same image uploaded twice is stored once.
+    """
+    tmp_dir = os.path.join(root, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                tmp.write(chunk)
+        digest = digest.hexdigest()
+        directory = image_dir(root, digest)
+        path = os.path.join(directory, original_filename(ext))
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(directory, exist_ok=True)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return digest
+
+
+def missing_variants(root, digest, kind, sizes):
+    """``{name: size}`` of the variants of ``kind`` not generated yet."""
+    directory = image_dir(root, digest)
+    return {
+        name: size for name, size in sizes.items()
+        if not os.path.exists(os.path.join(directory, variant_filename(kind, name, size)))
+    }
+
+
+def _save_atomic(image, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            image.save(tmp, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def generate_variants(root, digest, ext, kind, sizes):
+    """
+    Write the missing variants of ``kind``: the original, rotated by its EXIF
+    orientation, cropped to each size around the center. Returns the names of
+    the variants written.
+    """
+    missing = missing_variants(root, digest, kind, sizes)
+    if not missing:
+        return []
+
+    directory = image_dir(root, digest)
+    with Image.open(os.path.join(directory, original_filename(ext))) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for name, size in missing.items():
+            variant = ImageOps.fit(image, tuple(size), Image.Resampling.LANCZOS)
+            _save_atomic(variant, os.path.join(directory, variant_filename(kind, name, size)))
+    return list(missing)
@@ -0,0 +1,372 @@
+import glob
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from flask import Response, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.utils.background import BackgroundThread
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels):
+        return (self.name, tuple(str(labels[label]) for label in self.labelnames))
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        shard = self.registry._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Gauge aggregated as the sum of ``inc``/``dec`` calls across threads and workers.
+    ``set`` stores an absolute value instead; use one style or the other per gauge.
+    """
+
+    type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        shard = self.registry._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        self.registry._set_value(self._key(labels), value)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        shard = self.registry._shard()
+        key = self._key(labels)
+        values = shard.get(key)
+        if values is None:
+            # Contagem por bucket (não cumulativa) + soma + total
+            values = shard[key] = [0] * (len(self.buckets) + 3)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+
+class _ShardToken:
+    pass
+
+
+class MetricsRegistry:
+    """
+    Registry of counters, gauges and histograms.
+    Each thread records into its own shard, so recording takes no lock; the
+    shards are summed when the metrics are collected. Shards of finished
+    threads are folded into a single "retired" shard.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        self._set_values = {}
+        self.multiproc_dir = None
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            token = self._local.token = _ShardToken()
+            with self._lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(token, self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            self._shards.pop(id(shard), None)
+            _merge(self._retired, shard)
+
+    def _set_value(self, key, value):
+        with self._lock:
+            self._set_values[key] = value
+
+    def collect_local(self):
+        """Values recorded by this process, keyed by ``(name, label values)``."""
+        with self._lock:
+            shards = list(self._shards.values())
+            totals = _merge({}, self._retired)
+            set_values = dict(self._set_values)
+
+        for shard in shards:
+            _merge(totals, dict(shard))
+        totals.update(set_values)
+        return totals
+
+    def collect(self):
+        """Values of every worker process when ``multiproc_dir`` is configured."""
+        totals = self.collect_local()
+        if not self.multiproc_dir:
+            return totals
+
+        self.write_multiproc_file(totals)
+        merged = {}
+        for path in glob.glob(os.path.join(self.multiproc_dir, "metrics-*.json")):
+            pid = int(os.path.basename(path)[len("metrics-"):-len(".json")])
+            try:
+                with open(path) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            alive = _pid_alive(pid)
+            values = {}
+            for name, labelvalues, value in entries:
+                metric = self._metrics.get(name)
+                # Gauges de workers que já morreram não valem mais
+                if metric is None or (metric.type == "gauge" and not alive):
+                    continue
+                values[(name, tuple(labelvalues))] = value
+            _merge(merged, values)
+        return merged
+
+    def write_multiproc_file(self, totals=None):
+        if not self.multiproc_dir:
+            return
+
+        if totals is None:
+            totals = self.collect_local()
+        entries = [[name, list(labelvalues), value] for (name, labelvalues), value in totals.items()]
+        path = os.path.join(self.multiproc_dir, f"metrics-{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format."""
+        totals = self.collect()
+        by_name = {}
+        for (name, labelvalues), value in totals.items():
+            by_name.setdefault(name, []).append((labelvalues, value))
+
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+
+            for labelvalues, value in sorted(by_name.get(name, [])):
+                labels = list(zip(metric.labelnames, labelvalues))
+                if metric.type != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), value):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _merge(target, source):
+    for key, value in source.items():
+        current = target.get(key)
+        if isinstance(value, list):
+            target[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+        else:
+            target[key] = value if current is None else current + value
+    return target
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def clear_multiproc_dir(path):
+    """Remove metric files left by workers of a previous server run."""
+    for file_path in glob.glob(os.path.join(path, "metrics-*.json*")):
+        os.remove(file_path)
+
+
+metrics = MetricsRegistry()
+
+request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by endpoint, method and status.",
+    ("endpoint", "method", "status"),
+)
+requests_in_flight = metrics.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed.",
+    ("endpoint",),
+)
+db_queries_per_request = metrics.histogram(
+    "db_queries_per_request",
+    "Number of SQL statements executed per request.",
+    ("endpoint",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+db_time_per_request = metrics.histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL statements per request.",
+    ("endpoint",),
+)
+
+
+class _RequestStats:
+    __slots__ = ("start", "endpoint", "thread", "queries", "db_time", "recorded")
+
+    def __init__(self, endpoint):
+        self.start = time.perf_counter()
+        self.thread = threading.get_ident()
+        self.endpoint = endpoint
+        self.queries = 0
+        self.db_time = 0.0
+        self.recorded = False
+
+
+ENVIRON_KEY = "soccer_mvp.metrics"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("metrics_query_start")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    # O environ é compartilhado com contextos copiados (ex.: views em offload)
+    if has_request_context():
+        stats = request.environ.get(ENVIRON_KEY)
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+
+def init_metrics(app):
+    """
+    Instrument requests and SQL statements and expose them at ``/metrics``.
+    With ``METRICS_MULTIPROC_DIR`` set, each worker process periodically dumps
+    its values to that directory and ``/metrics`` merges every worker's file.
+    """
+    metrics.multiproc_dir = app.config.get("METRICS_MULTIPROC_DIR")
+    if metrics.multiproc_dir:
+        os.makedirs(metrics.multiproc_dir, exist_ok=True)
+    flusher = BackgroundThread(
+        "metrics-flush", metrics.write_multiproc_file, app.config["METRICS_FLUSH_INTERVAL"]
+    )
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_request_metrics():
+        if metrics.multiproc_dir:
+            flusher.ensure_started()
+
+        endpoint = request.endpoint or "unmatched"
+        request.environ[ENVIRON_KEY] = _RequestStats(endpoint)
+        requests_in_flight.inc(endpoint=endpoint)
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = request.environ.get(ENVIRON_KEY)
+        if stats is not None and not stats.recorded:
+            _record(stats, response.status_code)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        stats = request.environ.get(ENVIRON_KEY)
+        # Views em offload fazem teardown de um contexto copiado em outra thread;
+        # só o contexto original finaliza as métricas
+        if stats is None or stats.thread != threading.get_ident():
+            return
+        request.environ.pop(ENVIRON_KEY)
+        if not stats.recorded:
+            _record(stats, 500)
+        requests_in_flight.dec(endpoint=stats.endpoint)
+
+    def metrics_view():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
+
+
+def _record(stats, status):
+    stats.recorded = True
+    elapsed = time.perf_counter() - stats.start
+    request_duration.observe(
+        elapsed, endpoint=stats.endpoint, method=request.method, status=status
+    )
+    db_queries_per_request.observe(stats.queries, endpoint=stats.endpoint)
+    db_time_per_request.observe(stats.db_time, endpoint=stats.endpoint)
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from flask import copy_current_request_context, jsonify
+
+try:
+    import asgiref  # noqa: F401  (Flask precisa do asgiref para views async)
+    HAS_ASYNC_VIEWS = True
+except ImportError:
+    HAS_ASYNC_VIEWS = False
+
+
+def offload(route_class):
+    """
+    Decorator that marks a view as blocking work of the given route class
+    (e.g. "auth" for bcrypt, "writes" for database writes).
+    The view is only changed when the offload mode is enabled in the config,
+    see :func:`init_offload`.
+    """
+    def decorator(f):
+        f.route_class = route_class
+        return f
+
+    return decorator
+
+
+def init_offload(app):
+    """
+    Replace the views marked with :func:`offload` by async views that run the
+    original view in a bounded thread pool, with a concurrency cap per route class.
+    Requests above the cap wait for a slot for up to ``OFFLOAD_QUEUE_TIMEOUT``
+    seconds and then get a 503. The caps must fit in ``OFFLOAD_MAX_WORKERS``,
+    otherwise a slot could be granted with no thread left to run the view.
+
+    The server thread that received the request (Werkzeug's or a gunicorn
+    worker's) is held for the whole offloaded call, waiting included: Flask
+    runs async views to completion on it. The caps bound how many of these
+    views run at once, not how many server threads they occupy, so cheap
+    requests are only protected from a flood of them when an admission limit
+    (``ADMISSION_LIMITS``) is also set for the route class.
+    """
+    max_workers = app.config["OFFLOAD_MAX_WORKERS"]
+    limits = app.config["OFFLOAD_CONCURRENCY"]
+    if sum(limits.values()) > max_workers:
+        raise ValueError(
+            f"OFFLOAD_CONCURRENCY caps add up to {sum(limits.values())}, "
+            f"more than OFFLOAD_MAX_WORKERS ({max_workers})"
+        )
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="offload")
+    semaphores = {
+        route_class: threading.BoundedSemaphore(limit)
+        for route_class, limit in limits.items()
+    }
+    queue_timeout = app.config["OFFLOAD_QUEUE_TIMEOUT"]
+
+    for endpoint, view in list(app.view_functions.items()):
+        route_class = getattr(view, "route_class", None)
+        # Views do group commit já rodam na thread de escrita
+        if route_class is None or getattr(view, "group_commit", False):
+            continue
+
+        semaphore = semaphores.get(route_class)
+        app.view_functions[endpoint] = _wrap_view(view, executor, semaphore, queue_timeout)
+
+    app.extensions["offload"] = executor
+
+
+def _busy_response():
+    response = jsonify({
+        "error": "Service unavailable",
+        "message": "Servidor ocupado. Por favor, tente novamente."
+    })
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+async def _acquire_async(semaphore, timeout):
+    """
+    ``semaphore.acquire(timeout=timeout)`` for a coroutine: the semaphore is
+    shared by the requests of every thread and event loop, so it stays a
+    ``threading`` one. A free slot is taken at once; otherwise the blocking
+    wait runs in the loop's executor, so the slot is taken as soon as it is
+    released.
+    """
+    if semaphore.acquire(blocking=False):
+        return True
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(semaphore.acquire, timeout=timeout))
+
+
+def _wrap_view(view, executor, semaphore, queue_timeout):
+    def submit(*args, **kwargs):
+        future = executor.submit(copy_current_request_context(view), *args, **kwargs)
+        if semaphore is not None:
+            future.add_done_callback(lambda _: semaphore.release())
+        return future
+
+    if HAS_ASYNC_VIEWS:
+        @wraps(view)
+        async def async_view(*args, **kwargs):
+            if semaphore is not None and not await _acquire_async(semaphore, queue_timeout):
+                return _busy_response()
+            return await asyncio.wrap_future(submit(*args, **kwargs))
+
+        return async_view
+
+    @wraps(view)
+    def sync_view(*args, **kwargs):
+        if semaphore is not None and not semaphore.acquire(timeout=queue_timeout):
+            return _busy_response()
+        return submit(*args, **kwargs).result()
+
+    return sync_view
@@ -0,0 +1,218 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+FORMAT_HEADER = "HTTP_X_PROFILE_FORMAT"
+PROFILE_PARAM = "_profile"
+FORMAT_PARAM = "_profile_format"
+
+FORMATS = {
+    "cprofile": ("pstats", "json"),
+    "sample": ("collapsed", "json"),
+}
+
+# Ordem de prioridade: o primeiro que casar define a categoria
+CATEGORIES = (
+    ("bcrypt", ("bcrypt",)),
+    ("sqlalchemy", ("sqlalchemy", "sqlite3")),
+    ("json", ("json",)),
+)
+
+
+def categorize(filename, function_name):
+    """Return the breakdown category of a function."""
+    location = f"{filename} {function_name}".lower()
+    for category, markers in CATEGORIES:
+        if any(marker in location for marker in markers):
+            return category
+    if filename.startswith(SRC_DIR) and filename != __file__:
+        return "view"
+    return None
+
+
+class _Sampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_name, frame.f_lineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        lines = []
+        for stack, count in self.stacks.most_common():
+            frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for filename, name, line in stack)
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def breakdown(self):
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            category = "other"
+            for filename, name, _ in reversed(stack):
+                found = categorize(filename, name)
+                if found is not None:
+                    category = found
+                    break
+            totals[category] += count * self.interval
+        return totals
+
+
+def _cprofile_breakdown(stats):
+    totals = Counter()
+    for (filename, _, function_name), (_, _, tottime, _, _) in stats.stats.items():
+        totals[categorize(filename, function_name) or "other"] += tottime
+    return totals
+
+
+def _top_functions(stats, limit=25):
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{function_name} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for (filename, line, function_name), (_, calls, tottime, cumtime, _) in rows
+    ]
+
+
+class ProfilingMiddleware:
+    """
+    WSGI middleware that profiles a single request on demand.
+
+    Send ``X-Profile: cprofile`` (deterministic, returns a ``.pstats`` file) or
+    ``X-Profile: sample`` (low overhead, returns a collapsed-stack flame graph),
+    or the ``_profile`` query parameter. ``X-Profile-Format: json`` (or
+    ``_profile_format=json``) returns the time breakdown and top functions instead.
+    The profiled response body is discarded; its status is kept in ``X-Profile-Status``.
+    Views running in the offload executor are not seen by the profiler.
+    """
+
+    def __init__(self, wsgi_app, sample_interval=0.001):
+        self.wsgi_app = wsgi_app
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+
+    def _requested(self, environ):
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        mode = environ.get(PROFILE_HEADER) or query.get(PROFILE_PARAM, [None])[0]
+        if mode not in FORMATS:
+            return None, None
+
+        output = environ.get(FORMAT_HEADER) or query.get(FORMAT_PARAM, [None])[0]
+        if output not in FORMATS[mode]:
+            output = FORMATS[mode][0]
+        return mode, output
+
+    def __call__(self, environ, start_response):
+        mode, output = self._requested(environ)
+        # Um perfil por vez: requisições concorrentes seguem sem profiling
+        if mode is None or not self._lock.acquire(blocking=False):
+            return self.wsgi_app(environ, start_response)
+
+        try:
+            return self._profile(environ, start_response, mode, output)
+        finally:
+            self._lock.release()
+
+    def _run(self, environ):
+        captured = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured["status"] = status
+            return lambda data: None
+
+        app_iter = self.wsgi_app(environ, capture_start_response)
+        try:
+            for _ in app_iter:
+                pass
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+        return captured.get("status", "500 INTERNAL SERVER ERROR")
+
+    def _profile(self, environ, start_response, mode, output):
+        started = time.perf_counter()
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                status = self._run(environ)
+            finally:
+                profiler.disable()
+            stats = pstats.Stats(profiler)
+            breakdown = _cprofile_breakdown(stats)
+        else:
+            sampler = _Sampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            try:
+                status = self._run(environ)
+            finally:
+                sampler.stop()
+            breakdown = sampler.breakdown()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        breakdown_ms = {category: round(seconds * 1000, 3) for category, seconds in breakdown.most_common()}
+        headers = [
+            ("X-Profile-Status", status),
+            ("X-Profile-Duration-Ms", f"{elapsed_ms:.3f}"),
+            ("X-Profile-Breakdown", json.dumps(breakdown_ms)),
+        ]
+        name = f"profile-{environ.get('PATH_INFO', '/').strip('/').replace('/', '-') or 'root'}-{int(time.time())}"
+
+        if output == "json":
+            document = {"mode": mode, "status": status, "duration_ms": round(elapsed_ms, 3), "breakdown_ms": breakdown_ms}
+            if mode == "cprofile":
+                document["top_functions"] = _top_functions(stats)
+            else:
+                document["samples"] = sum(sampler.stacks.values())
+            body = json.dumps(document).encode("utf-8")
+            headers.append(("Content-Type", "application/json"))
+        elif output == "pstats":
+            with tempfile.NamedTemporaryFile(suffix=".pstats") as f:
+                stats.dump_stats(f.name)
+                body = f.read()
+            headers.append(("Content-Type", "application/octet-stream"))
+            headers.append(("Content-Disposition", f'attachment; filename="{name}.pstats"'))
+        else:
+            body = sampler.collapsed().encode("utf-8")
+            headers.append(("Content-Type", "text/plain; charset=utf-8"))
+            headers.append(("Content-Disposition", f'attachment; filename="{name}.collapsed.txt"'))
+
+        headers.append(("Content-Length", str(len(body))))
+        start_response("200 OK", headers)
+        return [body]
+
+
+def init_profiling(app):
+    """Wrap the WSGI app with :class:`ProfilingMiddleware`; never enabled in production."""
+    app.wsgi_app = ProfilingMiddleware(app.wsgi_app, app.config["PROFILING_SAMPLE_INTERVAL"])
@@ -0,0 +1,171 @@
+import logging
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+ENVIRON_KEY = "soccer_mvp.queries"
+
+# Controle de transação (ex.: savepoints do group commit) não conta no orçamento
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+_recorders = []
+_recorders_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request issues more SQL statements than its budget allows."""
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of SQL statements a view may issue per request."""
+    def decorator(f):
+        f.query_budget = max_queries
+        return f
+
+    return decorator
+
+
+class QueryRecorder:
+    """
+    Context manager that records every SQL statement executed while it is active.
+
+        with QueryRecorder() as recorder:
+            client.get("/teams/1")
+        assert recorder.count <= 2
+
+    With ``requests_only``, statements issued outside a request context (the
+    job, event and snapshot background threads) are left out.
+    """
+
+    def __init__(self, requests_only=False):
+        self.requests_only = requests_only
+        self.statements = []
+
+    def __enter__(self):
+        _install_listener()
+        with _recorders_lock:
+            _recorders.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with _recorders_lock:
+            _recorders.remove(self)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def n_plus_one(self, threshold=3):
+        return find_n_plus_one(self.statements, threshold)
+
+
+def find_n_plus_one(statements, threshold=3):
+    """
+    Return the statements executed at least ``threshold`` times with different
+    parameters, the usual signature of a lazy load inside a loop.
+    """
+    parameters_by_statement = defaultdict(set)
+    counts = defaultdict(int)
+    for statement, parameters in statements:
+        counts[statement] += 1
+        parameters_by_statement[statement].add(repr(parameters))
+
+    return [
+        statement
+        for statement, count in counts.items()
+        if count >= threshold and len(parameters_by_statement[statement]) > 1
+    ]
+
+
+def check_budget(endpoint, budget, statements, threshold):
+    """Return the list of problems found for the statements issued by ``endpoint``."""
+    problems = []
+    if budget is not None and len(statements) > budget:
+        problems.append(f"{endpoint} issued {len(statements)} SQL statements (budget: {budget})")
+
+    for statement in find_n_plus_one(statements, threshold):
+        problems.append(f"{endpoint} looks like an N+1 query: {statement}")
+    return problems
+
+
+def assert_route_within_budget(client, method, url, threshold=3, **kwargs):
+    """
+    Test helper: send a request with the Flask test client and fail if the
+    matched view exceeds its declared ``query_budget`` or shows an N+1 pattern.
+    Returns the response.
+    """
+    app = client.application
+    adapter = app.url_map.bind("localhost")
+    endpoint, _ = adapter.match(urlsplit(url).path, method=method)
+    budget = getattr(app.view_functions[endpoint], "query_budget", None)
+
+    with QueryRecorder(requests_only=True) as recorder:
+        response = client.open(url, method=method, **kwargs)
+
+    problems = check_budget(endpoint, budget, recorder.statements, threshold)
+    if problems:
+        raise QueryBudgetExceeded("\n".join(problems))
+    return response
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if statement.startswith(TRANSACTION_CONTROL):
+        return
+    entry = (statement, parameters)
+    in_request = has_request_context()
+
+    if _recorders:
+        with _recorders_lock:
+            for recorder in _recorders:
+                if in_request or not recorder.requests_only:
+                    recorder.statements.append(entry)
+
+    if in_request:
+        statements = request.environ.get(ENVIRON_KEY)
+        if statements is not None:
+            statements.append(entry)
+
+
+def _install_listener():
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def init_query_budget(app):
+    """
+    Development middleware: count the SQL statements of every request and
+    log (``QUERY_BUDGET_MODE = "log"``) or fail (``"raise"``) when a view
+    exceeds its ``query_budget`` or repeats a statement N+1 style.
+    """
+    _install_listener()
+
+    @app.before_request
+    def start_query_budget():
+        request.environ[ENVIRON_KEY] = []
+
+    @app.after_request
+    def check_query_budget(response):
+        statements = request.environ.pop(ENVIRON_KEY, None)
+        if statements is None or request.endpoint is None:
+            return response
+
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, "query_budget", None)
+        response.headers["X-Query-Count"] = str(len(statements))
+
+        problems = check_budget(
+            request.endpoint, budget, statements, current_app.config["QUERY_BUDGET_N_PLUS_ONE_THRESHOLD"]
+        )
+        if not problems:
+            return response
+
+        if current_app.config["QUERY_BUDGET_MODE"] == "raise":
+            raise QueryBudgetExceeded("\n".join(problems))
+        for problem in problems:
+            logger.warning(problem)
+        return response
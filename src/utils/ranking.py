@@ -0,0 +1,188 @@
+import time
+from itertools import chain
+import numpy as np
+from sqlalchemy import bindparam, func, select, union_all, update
+from src.models.matches import Match
+from src.models.team_changes import TeamChange, record_team_changes
+from src.models.teams import Team
+from src.utils.ranking_history import append_points
+
+BASE_RATING = 1000
+K_FACTOR = 32
+
+
+def _levels(home, away, n_teams):
+    """
+    Level of each match: one more than the last level of either team.
+    Matches of the same level share no team, so each level can be applied as
+    one vectorized step while every team still sees its matches in order.
+    """
+    last = [0] * n_teams
+    levels = []
+    append = levels.append
+    for h, a in zip(home.tolist(), away.tolist()):
+        level = max(last[h], last[a])
+        last[h] = last[a] = level + 1
+        append(level)
+    return np.array(levels, dtype=np.int64)
+
+
+def elo(ratings, home, away, home_score, away_score, k=K_FACTOR, home_advantage=0, after=None):
+    """
+    Apply chronologically ordered matches to ``ratings`` in place.
+    ``home`` and ``away`` index into ``ratings``; the result is identical to
+    applying the matches one by one. ``after``, an ``(n, 2)`` array, receives
+    the home and away ratings right after each match.
+    """
+    if len(home) == 0:
+        return ratings
+
+    actual = np.where(home_score > away_score, 1.0, np.where(home_score == away_score, 0.5, 0.0))
+    levels = _levels(home, away, len(ratings))
+    order = np.argsort(levels, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(levels))))
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        batch = order[start:end]
+        h, a = home[batch], away[batch]
+        expected = 1.0 / (1.0 + 10.0 ** ((ratings[a] - ratings[h] - home_advantage) / 400.0))
+        delta = k * (actual[batch] - expected)
+        ratings[h] += delta
+        ratings[a] -= delta
+        if after is not None:
+            after[batch, 0] = ratings[h]
+            after[batch, 1] = ratings[a]
+    return ratings
+
+
+def _write_back(session, team_ids, ratings, stored, history):
+    """
+    Store the changed ratings with a single executemany UPDATE and append the
+    ``(team_id, ranking_points, played_at)`` points of ``history`` to the
+    ranking history; return how many teams changed. The unrounded rating is
+    kept for the next incremental update, ``ranking_points`` is its rounded
+    value.
+    """
+    points = np.rint(ratings).astype(np.int64)
+    changed = np.nonzero(ratings != stored)[0]
+    if len(changed) == 0:
+        return 0
+
+    session.execute(
+        update(Team.__table__)
+        .where(Team.__table__.c.id == bindparam("b_id"))
+        .values(
+            ranking_points=bindparam("b_points"),
+            ranking_rating=bindparam("b_rating"),
+            version=Team.__table__.c.version + 1,
+        ),
+        [
+            {"b_id": int(team_ids[i]), "b_points": int(points[i]), "b_rating": float(ratings[i])}
+            for i in changed
+        ],
+    )
+    connection = session.connection()
+    record_team_changes(connection, [(int(team_ids[i]), TeamChange.UPDATED) for i in changed])
+    changed_ids = {int(team_ids[i]) for i in changed}
+    append_points(connection, [point for point in history if point[0] in changed_ids])
+    return len(changed)
+
+
+def _current_ratings(session, team_ids, base_rating):
+    """
+    ``(ratings, stored)``: the rating of ``team_ids`` to start from and the
+    stored one (NaN when never rated). Teams rated before ``ranking_rating``
+    existed start from their ``ranking_points``; 0 counts as ``base_rating``.
+    """
+    rows = {
+        row.id: row for row in session.execute(
+            select(Team.id, Team.ranking_points, Team.ranking_rating).where(Team.id.in_(team_ids.tolist()))
+        )
+    }
+    stored = np.full(len(team_ids), np.nan)
+    ratings = np.full(len(team_ids), float(base_rating))
+    for i, team_id in enumerate(team_ids.tolist()):
+        row = rows.get(team_id)
+        if row is None:
+            continue
+        if row.ranking_rating is not None:
+            stored[i] = ratings[i] = row.ranking_rating
+        elif row.ranking_points:
+            ratings[i] = row.ranking_points
+    return ratings, stored
+
+
+def recompute_rankings(session, base_rating=BASE_RATING, k=K_FACTOR, home_advantage=0):
+    """Recompute every team's rating from the full match history."""
+    started = time.perf_counter()
+    # Core em vez do ORM e np.fromiter em vez de np.array(rows): montar o array
+    # a partir de objetos Row é a parte mais lenta com milhões de partidas
+    rows = session.connection().execute(
+        select(Match.home_team_id, Match.away_team_id, Match.home_score, Match.away_score)
+        .order_by(Match.played_at, Match.id)
+    ).all()
+    matches = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=4 * len(rows)).reshape(-1, 4)
+
+    team_ids, indexes = np.unique(matches[:, :2], return_inverse=True)
+    indexes = indexes.reshape(-1, 2)
+    ratings = np.full(len(team_ids), float(base_rating))
+    elo(ratings, indexes[:, 0], indexes[:, 1], matches[:, 2], matches[:, 3], k, home_advantage)
+
+    # Um ponto por equipe, na data da última partida dela
+    sides = union_all(
+        select(Match.home_team_id.label("team_id"), Match.played_at),
+        select(Match.away_team_id, Match.played_at),
+    ).subquery()
+    last_played = dict(session.connection().execute(
+        select(sides.c.team_id, func.max(sides.c.played_at)).group_by(sides.c.team_id)
+    ).all())
+    points = np.rint(ratings).astype(np.int64)
+    history = [
+        (team_id, int(points[i]), last_played[team_id]) for i, team_id in enumerate(team_ids.tolist())
+    ]
+
+    _, stored = _current_ratings(session, team_ids, base_rating)
+    updated = _write_back(session, team_ids, ratings, stored, history)
+    return {"matches": len(matches), "teams_updated": updated, "elapsed": time.perf_counter() - started}
+
+
+def apply_new_matches(session, matches, base_rating=BASE_RATING, k=K_FACTOR, home_advantage=0):
+    """
+    Incrementally apply ``matches`` (dicts sorted by ``played_at``, all newer
+    than the existing history) on top of the stored ratings.
+    """
+    if not matches:
+        return 0
+    data = np.array(
+        [(m["home_team_id"], m["away_team_id"], m["home_score"], m["away_score"]) for m in matches],
+        dtype=np.int64,
+    )
+    team_ids, indexes = np.unique(data[:, :2], return_inverse=True)
+    indexes = indexes.reshape(-1, 2)
+    ratings, stored = _current_ratings(session, team_ids, base_rating)
+    after = np.empty((len(data), 2))
+    elo(ratings, indexes[:, 0], indexes[:, 1], data[:, 2], data[:, 3], k, home_advantage, after)
+
+    # Um ponto por equipe e partida, na data em que ela foi jogada
+    points = np.rint(after).astype(np.int64).tolist()
+    history = [
+        (int(data[i, side]), points[i][side], match["played_at"])
+        for i, match in enumerate(matches)
+        for side in (0, 1)
+    ]
+    return _write_back(session, team_ids, ratings, stored, history)
+
+
+def ingest_matches(session, matches, base_rating=BASE_RATING, k=K_FACTOR, home_advantage=0):
+    """
+    Insert ``matches`` and update the rankings: incrementally when they are
+    all newer than the stored history, with a full recompute for backfills.
+    Returns ``(mode, teams_updated)``.
+    """
+    latest = session.scalar(select(func.max(Match.played_at)))
+    matches = sorted(matches, key=lambda m: m["played_at"])
+    session.execute(Match.__table__.insert(), matches)
+
+    if latest is not None and matches[0]["played_at"] < latest:
+        return "recompute", recompute_rankings(session, base_rating, k, home_advantage)["teams_updated"]
+    return "incremental", apply_new_matches(session, matches, base_rating, k, home_advantage)
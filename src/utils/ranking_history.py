@@ -0,0 +1,166 @@
+import calendar
+from collections import defaultdict
+from datetime import datetime
+import numpy as np
+from sqlalchemy import bindparam, insert, select, update
+from src.models.ranking_history import RankingHistoryBlock
+
+# Pontos por bloco: parte do formato de armazenamento, não uma configuração
+BLOCK_SIZE = 256
+MAX_POINTS = 500
+
+_blocks = RankingHistoryBlock.__table__
+
+
+def to_epoch(value):
+    """Naive UTC datetime to epoch seconds."""
+    return calendar.timegm(value.utctimetuple())
+
+
+def from_epoch(value):
+    return datetime.utcfromtimestamp(int(value))
+
+
+def encode(times, points):
+    """
+    Delta-encode a block: time deltas from ``times[0]`` as uint32 seconds and
+    point deltas (the first one absolute) as int32, 8 bytes per point.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    points = np.asarray(points, dtype=np.int64)
+    time_deltas = np.diff(times, prepend=times[0]).astype("<u4")
+    point_deltas = np.diff(points, prepend=0).astype("<i4")
+    return time_deltas.tobytes(), point_deltas.tobytes()
+
+
+def decode(start_time, time_deltas, point_deltas):
+    times = start_time + np.cumsum(np.frombuffer(time_deltas, dtype="<u4"), dtype=np.int64)
+    points = np.cumsum(np.frombuffer(point_deltas, dtype="<i4"), dtype=np.int64)
+    return times, points
+
+
+def _block_values(times, points):
+    time_deltas, point_deltas = encode(times, points)
+    return {
+        "start_time": int(times[0]),
+        "end_time": int(times[-1]),
+        "count": len(points),
+        "min_points": int(np.min(points)),
+        "max_points": int(np.max(points)),
+        "last_points": int(points[-1]),
+        "time_deltas": time_deltas,
+        "point_deltas": point_deltas,
+    }
+
+
+def append_points(connection, points, block_size=BLOCK_SIZE):
+    """
+    Append ``(team_id, ranking_points, timestamp)`` points, in order, in the
+    same transaction as ``connection``; ``timestamp`` is the naive UTC time
+    the value was reached (the match's ``played_at``). The open (not yet
+    full) block of every team is read with one query and the writes are two
+    executemany statements, whatever the number of teams and points.
+    """
+    if not points:
+        return
+    by_team = defaultdict(list)
+    for team_id, value, timestamp in points:
+        by_team[team_id].append((to_epoch(timestamp), value))
+
+    open_blocks = {
+        row.team_id: row
+        for row in connection.execute(
+            select(_blocks).where(_blocks.c.team_id.in_(list(by_team)), _blocks.c.count < block_size)
+        )
+    }
+
+    updates, inserts = [], []
+    for team_id, team_points in by_team.items():
+        times = np.array([time for time, _ in team_points], dtype=np.int64)
+        values = np.array([value for _, value in team_points], dtype=np.int64)
+        block = open_blocks.get(team_id)
+        if block is not None:
+            block_times, block_values = decode(block.start_time, block.time_deltas, block.point_deltas)
+            times = np.concatenate((block_times, times))
+            values = np.concatenate((block_values, values))
+        # Partida anterior ao último ponto (recálculo) não pode gerar delta negativo
+        times = np.maximum.accumulate(times)
+        for start in range(0, len(times), block_size):
+            values_block = _block_values(times[start:start + block_size], values[start:start + block_size])
+            if start == 0 and block is not None:
+                updates.append({"b_id": block.id, **values_block})
+            else:
+                inserts.append({"team_id": team_id, **values_block})
+
+    if updates:
+        connection.execute(
+            update(_blocks).where(_blocks.c.id == bindparam("b_id")).values(
+                {column: bindparam(column) for column in updates[0] if column != "b_id"}
+            ),
+            updates,
+        )
+    if inserts:
+        connection.execute(insert(_blocks), inserts)
+
+
+def query_history(connection, team_id, start, end, resolution=None, max_points=MAX_POINTS):
+    """
+    Ranking history of ``team_id`` between epoch seconds ``start`` and ``end``,
+    downsampled to buckets of ``resolution`` seconds (widened so there are at
+    most ``max_points`` buckets). Each bucket reports the last, min and max
+    value seen in it. Blocks that fall inside a single bucket are summarised
+    from their columns without decoding their arrays.
+    """
+    span = max(end - start, 1)
+    # start e end inclusivos: span // resolution + 1 intervalos
+    minimum = span // max_points + 1
+    resolution = max(resolution or minimum, minimum, 1)
+
+    rows = connection.execute(
+        select(_blocks).where(
+            _blocks.c.team_id == team_id,
+            _blocks.c.start_time <= end,
+            _blocks.c.end_time >= start,
+        ).order_by(_blocks.c.start_time)
+    ).all()
+
+    times, lasts, mins, maxs = [], [], [], []
+    for row in rows:
+        whole = row.start_time >= start and row.end_time <= end
+        if whole and (row.start_time - start) // resolution == (row.end_time - start) // resolution:
+            times.append(np.array([row.end_time]))
+            lasts.append(np.array([row.last_points]))
+            mins.append(np.array([row.min_points]))
+            maxs.append(np.array([row.max_points]))
+            continue
+        block_times, block_points = decode(row.start_time, row.time_deltas, row.point_deltas)
+        mask = (block_times >= start) & (block_times <= end)
+        times.append(block_times[mask])
+        lasts.append(block_points[mask])
+        mins.append(block_points[mask])
+        maxs.append(block_points[mask])
+
+    if not times or not sum(len(t) for t in times):
+        return resolution, []
+
+    times = np.concatenate(times)
+    lasts, mins, maxs = np.concatenate(lasts), np.concatenate(mins), np.concatenate(maxs)
+    buckets = (times - start) // resolution
+    # Índices onde começa cada intervalo (os pontos já estão em ordem)
+    starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+
+    return resolution, [
+        {
+            "timestamp": from_epoch(start + bucket * resolution).isoformat(),
+            "ranking_points": int(last),
+            "min": int(low),
+            "max": int(high),
+        }
+        for bucket, last, low, high in zip(
+            buckets[starts].tolist(),
+            lasts[ends].tolist(),
+            np.minimum.reduceat(mins, starts).tolist(),
+            np.maximum.reduceat(maxs, starts).tolist(),
+        )
+    ]
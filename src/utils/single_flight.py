@@ -0,0 +1,143 @@
+import hashlib
+import threading
+from functools import wraps
+from flask import Response, current_app, request
+from src.utils.metrics import metrics
+
+COALESCE_METHODS = {"GET", "HEAD"}
+
+single_flight_requests = metrics.counter(
+    "single_flight_requests_total",
+    "Coalescable requests by role: leader (ran the view), follower (shared a "
+    "leader's result) or timeout (gave up waiting and ran the view itself).",
+    ("endpoint", "role"),
+)
+single_flight_in_flight = metrics.gauge(
+    "single_flight_in_flight", "Distinct coalesced computations currently running."
+)
+
+
+def coalesce(f):
+    """
+    Decorator that lets identical concurrent GETs of a view share one
+    execution, see :func:`init_single_flight`.
+    """
+    f.coalesce = True
+    return f
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Per-key registry of running computations: the first caller of a key (the
+    leader) runs it, callers that arrive while it runs (followers) wait for
+    the leader's result or exception instead of running it again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """Return ``(call, is_leader)``; the leader must call :meth:`finish`."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+        single_flight_in_flight.inc()
+        return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        single_flight_in_flight.dec()
+        call.result = result
+        call.error = error
+        call.done.set()
+
+
+def _auth_scope():
+    """Digest of the credentials: requests only share results within one identity."""
+    credentials = (request.cookies.get("token") or "") + "\0" + (request.headers.get("Authorization") or "")
+    if credentials == "\0":
+        return None
+    return hashlib.sha256(credentials.encode()).hexdigest()
+
+
+def _snapshot(response):
+    """
+    Status, headers and body chunks of a response, or ``None`` if it must
+    not be shared. The chunks are immutable (``bytes`` or read-only views of
+    a team snapshot), so followers reuse them without a copy.
+    """
+    if response.is_streamed or "Set-Cookie" in response.headers:
+        return None
+    return response.status_code, list(response.headers.items()), list(response.iter_encoded())
+
+
+def init_single_flight(app):
+    """
+    Wrap the views marked with :func:`coalesce`.
+
+    Concurrent GET/HEAD requests with the same method, path, query string and
+    credentials share one execution of the view: followers get a copy of the
+    leader's response (or its exception) without touching the database.
+    Nothing is cached: once the leader finishes, the next request runs the
+    view again, so a follower sees data at most one execution old. A follower
+    that waits longer than ``SINGLE_FLIGHT_TIMEOUT`` runs the view itself.
+    Must run before the response is post-processed (compression, CORS), which
+    still happens per request.
+    """
+    flights = SingleFlight()
+    timeout = app.config["SINGLE_FLIGHT_TIMEOUT"]
+
+    for endpoint, view in list(app.view_functions.items()):
+        if getattr(view, "coalesce", False):
+            app.view_functions[endpoint] = _wrap_view(endpoint, view, flights, timeout)
+
+    app.extensions["single_flight"] = flights
+
+
+def _wrap_view(endpoint, view, flights, timeout):
+    @wraps(view)
+    def coalesced_view(*args, **kwargs):
+        if request.method not in COALESCE_METHODS:
+            return current_app.ensure_sync(view)(*args, **kwargs)
+
+        key = (request.method, request.path, request.query_string, _auth_scope())
+        call, is_leader = flights.join(key)
+
+        if not is_leader:
+            if not call.done.wait(timeout):
+                single_flight_requests.inc(endpoint=endpoint, role="timeout")
+                return current_app.ensure_sync(view)(*args, **kwargs)
+            if call.error is not None:
+                single_flight_requests.inc(endpoint=endpoint, role="follower")
+                raise call.error
+            if call.result is not None:
+                single_flight_requests.inc(endpoint=endpoint, role="follower")
+                status, headers, body = call.result
+                return Response(body, status=status, headers=headers)
+            # A resposta do líder não pode ser compartilhada (stream ou cookie)
+            single_flight_requests.inc(endpoint=endpoint, role="leader")
+            return current_app.ensure_sync(view)(*args, **kwargs)
+
+        single_flight_requests.inc(endpoint=endpoint, role="leader")
+        try:
+            response = current_app.make_response(current_app.ensure_sync(view)(*args, **kwargs))
+        except BaseException as e:
+            flights.finish(key, call, error=e)
+            raise
+        flights.finish(key, call, result=_snapshot(response))
+        return response
+
+    return coalesced_view
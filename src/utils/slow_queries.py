@@ -0,0 +1,254 @@
+import logging
+import queue
+import re
+import threading
+import time
+from heapq import heappop, heappush
+from flask import has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.utils.background import BackgroundThread
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Marcadores dos paramstyles do DB-API: qmark, format, pyformat e named
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_IN_LIST = re.compile(rf"\bIN\s*\((?:\s*{_PLACEHOLDER}\s*,)*\s*{_PLACEHOLDER}\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement):
+    """Collapse literals, ``IN`` lists and whitespace so equivalent statements aggregate together."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("IN (?...)", statement)
+
+
+def parameter_shape(parameters, executemany=False):
+    """Describe bound parameters by type only, e.g. ``(int, str)`` or ``500 x (int, str)``."""
+    if executemany:
+        parameters = list(parameters)
+        if not parameters:
+            return "0 x ()"
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+class _StatementStats:
+    __slots__ = ("calls", "total", "max", "slow_calls", "endpoints", "shapes", "plan")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow_calls = 0
+        self.endpoints = {}
+        self.shapes = {}
+        self.plan = None
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.slow_calls += other.slow_calls
+        for endpoint, calls in other.endpoints.items():
+            self.endpoints[endpoint] = self.endpoints.get(endpoint, 0) + calls
+        for shape, calls in other.shapes.items():
+            self.shapes[shape] = self.shapes.get(shape, 0) + calls
+
+    def as_dict(self, statement):
+        return {
+            "statement": statement,
+            "calls": self.calls,
+            "slow_calls": self.slow_calls,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.calls * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "endpoints": dict(sorted(self.endpoints.items(), key=lambda item: -item[1])),
+            "parameter_shapes": sorted(self.shapes, key=lambda shape: -self.shapes[shape]),
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """
+    Times every SQL statement and logs the ones slower than ``threshold``
+    seconds. Only slow statements pay for normalizing the SQL and describing
+    the parameters: the others are aggregated by the SQL text the driver got
+    (already parameterized for ORM and Core statements) and grouped by
+    normalized SQL when the report is built. Past ``max_statements``
+    distinct texts, the one with the lowest total time is dropped. The query
+    plan of a slow statement is captured once per normalized statement on a
+    background thread, outside the request. Aggregates are per process.
+    """
+
+    def __init__(self, threshold=0.1, max_statements=1000, explain=True, explain_queue_size=100):
+        self.threshold = threshold
+        self.max_statements = max_statements
+        self.explain = explain
+        self._stats = {}
+        # (total na última verificação, texto): o total só cresce, então uma
+        # entrada desatualizada é recolocada com o valor atual ao sair do heap
+        self._totals = []
+        self._plans = {}
+        self._lock = threading.Lock()
+        self._explain_queue = queue.Queue(maxsize=explain_queue_size)
+        self._explaining = set()
+        self._explainer = BackgroundThread("slow-query-explain", self.capture_plans, 0.5)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._totals.clear()
+            self._plans.clear()
+            self._explaining.clear()
+
+    def _evict(self):
+        """Drop the statement with the lowest total time; called with the lock held."""
+        while self._totals:
+            total, statement = heappop(self._totals)
+            stats = self._stats.get(statement)
+            if stats is None:
+                continue
+            if stats.total > total:
+                heappush(self._totals, (stats.total, statement))
+                continue
+            del self._stats[statement]
+            return
+
+    def record(self, engine, statement, parameters, executemany, elapsed, endpoint):
+        slow = elapsed >= self.threshold
+        shape = parameter_shape(parameters, executemany) if slow else None
+
+        with self._lock:
+            stats = self._stats.get(statement)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    self._evict()
+                stats = self._stats[statement] = _StatementStats()
+                heappush(self._totals, (elapsed, statement))
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.endpoints[endpoint] = stats.endpoints.get(endpoint, 0) + 1
+            if slow:
+                stats.slow_calls += 1
+                stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+
+        if not slow:
+            return
+
+        normalized = normalize_sql(statement)
+        logger.warning(
+            "Slow query (%.1f ms) from %s: %s params=%s",
+            elapsed * 1000, endpoint, normalized, shape,
+        )
+        if not self.explain:
+            return
+        with self._lock:
+            needs_plan = normalized not in self._plans and normalized not in self._explaining
+            if needs_plan:
+                self._explaining.add(normalized)
+        if needs_plan:
+            sample = list(parameters)[0] if executemany else parameters
+            try:
+                self._explain_queue.put_nowait((engine, normalized, statement, sample))
+            except queue.Full:
+                with self._lock:
+                    self._explaining.discard(normalized)
+                return
+            self._explainer.ensure_started()
+
+    def capture_plans(self):
+        while True:
+            try:
+                engine, normalized, statement, parameters = self._explain_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+            try:
+                with engine.connect() as conn:
+                    rows = conn.exec_driver_sql(f"{prefix} {statement}", parameters or ()).fetchall()
+                plan = [" ".join(str(value) for value in row) for row in rows]
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {e}"]
+
+            with self._lock:
+                self._explaining.discard(normalized)
+                if len(self._plans) >= self.max_statements:
+                    # O plano mais antigo sai primeiro
+                    del self._plans[next(iter(self._plans))]
+                self._plans[normalized] = plan
+            logger.warning("Query plan for %s:\n  %s", normalized, "\n  ".join(plan))
+
+    def top(self, n=20):
+        """
+        Return the ``n`` normalized statements with the highest total time;
+        ``parameter_shapes`` describes their slow calls.
+        """
+        with self._lock:
+            merged = {}
+            for statement, stats in self._stats.items():
+                normalized = normalize_sql(statement)
+                total = merged.get(normalized)
+                if total is None:
+                    total = merged[normalized] = _StatementStats()
+                    total.plan = self._plans.get(normalized)
+                total.merge(stats)
+        ranked = sorted(merged.items(), key=lambda item: item[1].total, reverse=True)[:n]
+        return [stats.as_dict(statement) for statement, stats in ranked]
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("slow_query_start")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    # Ignora os próprios EXPLAIN capturados em segundo plano
+    if statement.startswith("EXPLAIN"):
+        return
+    endpoint = (request.endpoint or "unmatched") if has_request_context() else "-"
+    slow_query_log.record(conn.engine, statement, parameters, executemany, elapsed, endpoint)
+
+
+def init_slow_query_log(app):
+    """
+    Time every SQL statement and log those over ``SLOW_QUERY_THRESHOLD_MS``
+    with their query plan. With ``SLOW_QUERY_REPORT_ENABLED``, the top
+    statements by total time are served at ``/debug/slow-queries?limit=N``;
+    the report shows SQL text and plans without authentication, so it is
+    off in production.
+    """
+    slow_query_log.threshold = app.config["SLOW_QUERY_THRESHOLD_MS"] / 1000
+    slow_query_log.max_statements = app.config["SLOW_QUERY_MAX_STATEMENTS"]
+    slow_query_log.explain = app.config["SLOW_QUERY_EXPLAIN"]
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    if not app.config["SLOW_QUERY_REPORT_ENABLED"]:
+        return
+
+    def slow_queries_view():
+        limit = request.args.get("limit", app.config["SLOW_QUERY_TOP_N"], type=int)
+        return jsonify({
+            "threshold_ms": app.config["SLOW_QUERY_THRESHOLD_MS"],
+            "data": slow_query_log.top(limit),
+        })
+
+    app.add_url_rule("/debug/slow-queries", "slow_queries", slow_queries_view, methods=["GET"])
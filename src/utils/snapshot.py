@@ -0,0 +1,386 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from flask import request
+from sqlalchemy import select
+from src.database.db import db
+from src.models.team_changes import TeamChange, changes_cursor_supported
+from src.utils.background import BackgroundThread
+from src.utils.metrics import metrics
+
+EPOCH = datetime(1970, 1, 1)
+MAGIC = b"TEAMSNP3"
+# magic, id e data (µs) da última alteração incluída, nº de equipes, início e
+# tamanho do documento da lista, tamanho do trecho antes e depois dos itens
+# da lista, início do índice
+HEADER = struct.Struct("<8sqqqqqqqq")
+# "version" é a de cada equipe (ETag de GET /teams/<id>); "summary_*" aponta
+# o item da equipe dentro do documento da lista, para trocá-lo pelo atual
+INDEX_DTYPE = np.dtype([
+    ("team_id", "<i8"), ("offset", "<i8"), ("length", "<i8"), ("version", "<i8"),
+    ("summary_offset", "<i8"), ("summary_length", "<i8"),
+])
+# Marca onde entram os itens ao separar o envelope do documento da lista
+_ITEMS_PLACEHOLDER = "\0team-snapshot-items\0"
+# Posto no environ pelo middleware dos workers (src/server.py), que envia
+# memoryviews direto ao socket; os demais servidores WSGI só aceitam bytes
+BUFFER_PASSTHROUGH_KEY = "soccer_mvp.buffer_passthrough"
+
+snapshot_rebuilds = metrics.counter("team_snapshot_rebuilds_total", "Team snapshot files written.")
+snapshot_rebuild_seconds = metrics.histogram(
+    "team_snapshot_rebuild_seconds", "Time to build and write a team snapshot.", (),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+snapshot_reads = metrics.counter(
+    "team_snapshot_reads_total",
+    "Team reads by source: snapshot, delta (stale snapshot plus the changed teams) or database.",
+    ("source",),
+)
+
+
+class TeamSnapshot:
+    """
+    Read-only, memory-mapped snapshot file. Every worker maps the same file,
+    so the pages are shared by the OS page cache; documents are stored as the
+    final JSON bodies and returned as memoryviews over the mapping, without
+    copying or deserializing them. Pass them through :func:`response_chunk`
+    before putting them in a response.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, change_id, change_stamp, count, list_offset, list_length,
+         prefix_length, suffix_length, index_offset) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a team snapshot")
+        self.version = (change_id, change_stamp)
+        self.team_count = count
+        self._view = memoryview(self._mmap)
+        self._list = (list_offset, list_length)
+        self._prefix = self._view[list_offset:list_offset + prefix_length]
+        self._suffix = self._view[list_offset + list_length - suffix_length:list_offset + list_length]
+        # Visão direta sobre o mmap, sem cópia
+        self._index = np.frombuffer(self._mmap, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+
+    def teams_body(self, changed=None):
+        """
+        The ``GET /teams/`` body. ``changed`` maps the ids of teams changed
+        since the snapshot was built to their current summary body, or to
+        ``None`` when the team no longer exists; the other items are reused
+        from the file.
+        """
+        offset, length = self._list
+        if not changed:
+            return self._view[offset:offset + length]
+
+        index = self._index[~np.isin(self._index["team_id"], list(changed))]
+        items = [
+            (int(team_id), self._view[int(item_offset):int(item_offset) + int(item_length)])
+            for team_id, item_offset, item_length
+            in zip(index["team_id"], index["summary_offset"], index["summary_length"])
+        ]
+        items.extend((team_id, body) for team_id, body in changed.items() if body is not None)
+        items.sort(key=lambda item: item[0])
+        return b"".join((self._prefix, b",".join(body for _, body in items), self._suffix))
+
+    def team_entry(self, team_id):
+        """``(body, version)`` of a team, or ``None``."""
+        position = int(np.searchsorted(self._index["team_id"], team_id))
+        if position == len(self._index) or self._index["team_id"][position] != team_id:
+            return None
+        entry = self._index[position]
+        offset = int(entry["offset"])
+        return self._view[offset:offset + int(entry["length"])], int(entry["version"])
+
+
+def response_chunk(body):
+    """
+    ``body`` as a response chunk: the memoryview itself when the server sends
+    buffers as they are (``BUFFER_PASSTHROUGH_KEY`` in the environ), a copy
+    as ``bytes`` otherwise, since WSGI servers only write ``bytes``.
+    """
+    if isinstance(body, memoryview) and not request.environ.get(BUFFER_PASSTHROUGH_KEY):
+        return body.tobytes()
+    return body
+
+
+def split_envelope(dumps, envelope):
+    """``(prefix, suffix)`` around the items of the list document ``envelope``."""
+    placeholder = dumps(_ITEMS_PLACEHOLDER)
+    prefix, suffix = dumps({**envelope, "data": _ITEMS_PLACEHOLDER}).split(placeholder)
+    return f"{prefix}[".encode(), f"]{suffix}\n".encode()
+
+
+def write_snapshot(path, version, envelope, summaries, team_bodies):
+    """
+    Write a snapshot next to ``path`` and atomically replace it with
+    ``os.replace``. ``envelope`` is ``(prefix, suffix)`` of the list document
+    (see :func:`split_envelope`), ``summaries`` maps team ids to their item
+    of the list and ``team_bodies`` to ``(body, team_version)``.
+    """
+    prefix, suffix = envelope
+    team_ids = sorted(team_bodies)
+    index = np.zeros(len(team_ids), dtype=INDEX_DTYPE)
+    list_offset = HEADER.size
+    offset = list_offset + len(prefix)
+    for position, team_id in enumerate(team_ids):
+        if position:
+            offset += 1
+        index[position]["team_id"] = team_id
+        index[position]["summary_offset"] = offset
+        index[position]["summary_length"] = len(summaries[team_id])
+        offset += len(summaries[team_id])
+    list_length = offset + len(suffix) - list_offset
+    offset = list_offset + list_length
+    for position, team_id in enumerate(team_ids):
+        body, team_version = team_bodies[team_id]
+        index[position]["offset"] = offset
+        index[position]["length"] = len(body)
+        index[position]["version"] = team_version
+        offset += len(body)
+    # Índice alinhado a 8 bytes
+    padding = -offset % 8
+    index_offset = offset + padding
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, version[0], version[1], len(team_ids), list_offset, list_length,
+            len(prefix), len(suffix), index_offset,
+        ))
+        f.write(prefix)
+        f.write(b",".join(summaries[team_id] for team_id in team_ids))
+        f.write(suffix)
+        for team_id in team_ids:
+            f.write(team_bodies[team_id][0])
+        f.write(b"\0" * padding)
+        f.write(index.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class TeamSnapshotStore:
+    """
+    Keeps the snapshot of this process in sync with the database.
+
+    The version of a snapshot is the last ``team_changes`` row it includes:
+    every write to teams or rosters appends to that log. :meth:`current`
+    checks ``PRAGMA data_version`` on a dedicated connection (it only changes
+    when another connection commits) and reads the log head only then.
+
+    A stale snapshot is still used, together with the ids of the teams
+    changed since it was built (the delta, read from the log once per log
+    head): the caller reads only those teams from the database. Rebuilds run
+    on a background thread ``TEAM_SNAPSHOT_REBUILD_DELAY`` seconds after the
+    first stale read, so a burst of writes costs one rebuild. One worker
+    rebuilds at a time (``flock``); the others pick the new file up on their
+    next check. Without a snapshot, or with a delta larger than
+    ``TEAM_SNAPSHOT_MAX_DELTA`` teams or ``TEAM_SNAPSHOT_MAX_DELTA_SHARE`` of
+    the snapshot (patching most of the list costs more than reading it), the
+    caller reads the database and the rebuild starts at once.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.builder = None
+        self.path = None
+        self._snapshot = None
+        self._loaded_file_id = None
+        self._latest = None
+        self._delta = None
+        self._data_version = None
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._rebuild_requested = threading.Event()
+        self._rebuild_urgent = threading.Event()
+        self._rebuilder = BackgroundThread("team-snapshot-rebuild", self._rebuild_when_requested, 0)
+
+    def configure(self, app, builder, path):
+        self.app = app
+        self.builder = builder
+        self.path = path
+        self.rebuild_delay = app.config["TEAM_SNAPSHOT_REBUILD_DELAY"]
+        self.max_delta = app.config["TEAM_SNAPSHOT_MAX_DELTA"]
+        self.max_delta_share = app.config["TEAM_SNAPSHOT_MAX_DELTA_SHARE"]
+
+    def _latest_version(self):
+        """Last changelog row as ``(id, create_date in µs)``; the date tells apart recreated databases."""
+        if self._pid != os.getpid():
+            with self.app.app_context():
+                self._connection = db.engine.connect()
+            self._pid = os.getpid()
+            self._data_version = None
+
+        conn = self._connection
+        if conn.dialect.name == "sqlite":
+            data_version = conn.exec_driver_sql("PRAGMA data_version").scalar()
+            if data_version == self._data_version:
+                return self._latest
+            self._data_version = data_version
+        row = conn.execute(
+            select(TeamChange.id, TeamChange.create_date).order_by(TeamChange.id.desc()).limit(1)
+        ).first()
+        conn.rollback()
+        self._latest = (row.id, (row.create_date - EPOCH) // timedelta(microseconds=1)) if row else (0, 0)
+        return self._latest
+
+    def _load(self):
+        try:
+            return TeamSnapshot(self.path)
+        except (OSError, ValueError):
+            return None
+
+    def _file_id(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _changed_since(self, snapshot, latest):
+        """
+        Ids of the teams changed after ``snapshot``, or ``None`` when the log
+        does not continue the snapshot (recreated database) or the delta is
+        larger than ``max_delta`` or ``max_delta_share`` of the snapshot.
+        Cached until the log head moves.
+        """
+        key = (snapshot.version, latest)
+        if self._delta is not None and self._delta[0] == key:
+            return self._delta[1]
+
+        change_id, change_stamp = snapshot.version
+        max_delta = min(self.max_delta, int(snapshot.team_count * self.max_delta_share))
+        conn = self._connection
+        changed = None
+        if change_id <= latest[0]:
+            stamp = conn.scalar(select(TeamChange.create_date).where(TeamChange.id == change_id))
+            stamp = (stamp - EPOCH) // timedelta(microseconds=1) if stamp else 0
+            if stamp == change_stamp:
+                changed = frozenset(conn.scalars(
+                    select(TeamChange.team_id).where(TeamChange.id > change_id).distinct().limit(max_delta + 1)
+                ))
+                if len(changed) > max_delta:
+                    changed = None
+        conn.rollback()
+        self._delta = (key, changed)
+        return changed
+
+    def current(self):
+        """
+        ``(snapshot, changed)``: the latest snapshot and the ids of the teams
+        changed since it was built (empty when it is up to date), or ``None``
+        when the database must be read instead.
+        """
+        if self.app is None:
+            return None
+        with self._lock:
+            latest = self._latest_version()
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != latest:
+                # Outro worker pode já ter gravado a versão nova (os.replace troca o inode)
+                file_id = self._file_id()
+                if file_id is not None and file_id != self._loaded_file_id:
+                    loaded = self._load()
+                    if loaded is not None:
+                        snapshot = self._snapshot = loaded
+                        self._loaded_file_id = file_id
+
+            if snapshot is not None and snapshot.version == latest:
+                snapshot_reads.inc(source="snapshot")
+                return snapshot, frozenset()
+            changed = self._changed_since(snapshot, latest) if snapshot is not None else None
+
+        self._rebuilder.ensure_started()
+        self._rebuild_requested.set()
+        if changed is None:
+            # Sem snapshot utilizável as leituras vão ao banco: reconstrói já
+            self._rebuild_urgent.set()
+            snapshot_reads.inc(source="database")
+            return None
+        snapshot_reads.inc(source="delta")
+        return snapshot, changed
+
+    def _rebuild_when_requested(self):
+        if not self._rebuild_requested.wait(1):
+            return
+        # Espera as escritas seguintes: um rebuild cobre todas; até lá as
+        # leituras usam o snapshot anterior com o delta
+        self._rebuild_urgent.wait(self.rebuild_delay)
+        self._rebuild_requested.clear()
+        self._rebuild_urgent.clear()
+        self.rebuild()
+
+    def rebuild(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Lida antes dos dados: no pior caso o arquivo sai com uma versão
+                # antiga e é reconstruído de novo, nunca marcado como mais novo
+                with self._lock:
+                    latest = self._latest_version()
+                existing = self._load()
+                if existing is not None and existing.version == latest:
+                    return
+
+                started = time.perf_counter()
+                with self.app.app_context():
+                    try:
+                        envelope, summaries, team_documents = self.builder()
+                        dumps = self.app.json.dumps
+                        write_snapshot(
+                            self.path,
+                            latest,
+                            split_envelope(dumps, envelope),
+                            {team_id: dumps(summary).encode() for team_id, summary in summaries.items()},
+                            {
+                                team_id: (dumps(document).encode() + b"\n", team_version)
+                                for team_id, (document, team_version) in team_documents.items()
+                            },
+                        )
+                    finally:
+                        db.session.remove()
+                snapshot_rebuilds.inc()
+                snapshot_rebuild_seconds.observe(time.perf_counter() - started)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+team_snapshots = TeamSnapshotStore()
+
+
+def default_snapshot_path(app):
+    """One file per database, in ``TEAM_SNAPSHOT_DIR`` or the system temp dir."""
+    database = hashlib.sha1(app.config["SQLALCHEMY_DATABASE_URI"].encode()).hexdigest()[:12]
+    directory = app.config["TEAM_SNAPSHOT_DIR"] or tempfile.gettempdir()
+    return os.path.join(directory, f"soccer-mvp-teams-{database}.snapshot")
+
+
+def init_team_snapshot(app, builder):
+    """
+    Serve ``GET /teams/`` and ``GET /teams/<id>`` from a shared snapshot file
+    built by ``builder``, a function returning ``(list_envelope, {team_id:
+    summary}, {team_id: (team_document, team_version)})`` inside an app
+    context; the list document is the envelope with the summaries as
+    ``data``. In-memory SQLite is not shared between connections, and the
+    changelog is only a reliable version on SQLite, so the snapshot is
+    skipped on both.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    if uri in ("sqlite://", "sqlite:///:memory:"):
+        return
+    with app.app_context():
+        if not changes_cursor_supported(db.engine):
+            return
+    team_snapshots.configure(app, builder, default_snapshot_path(app))
+    app.extensions["team_snapshot"] = team_snapshots
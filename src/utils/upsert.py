@@ -0,0 +1,90 @@
+from sqlalchemy import and_, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+# INSERT com ON CONFLICT e RETURNING (SQLite >= 3.35); nos demais bancos,
+# SELECT e INSERT em um savepoint
+_DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def supports_on_conflict(session):
+    return session.get_bind().dialect.name in _DIALECT_INSERTS
+
+
+def dialect_insert(session, table):
+    """
+    ``INSERT`` construct for ``table`` in the dialect of ``session``, which
+    adds ``on_conflict_do_nothing`` / ``on_conflict_do_update``. Check
+    :func:`supports_on_conflict` first, or use the helpers below, which fall
+    back to SELECT-then-INSERT on other dialects.
+    """
+    dialect = session.get_bind().dialect.name
+    try:
+        return _DIALECT_INSERTS[dialect](table)
+    except KeyError:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported on {dialect}") from None
+
+
+def _select_then_insert(session, table, values, conflict_columns, returning):
+    """
+    The portable path: look for the conflicting row, then insert inside a
+    savepoint, so a concurrent insert that wins the race is reported as a
+    conflict (``None``) instead of failing the caller's transaction.
+    """
+    conflict = and_(*(table.c[column] == values[column] for column in conflict_columns))
+    if session.execute(select(table.c[conflict_columns[0]]).where(conflict).limit(1)).first():
+        return None
+
+    try:
+        with session.begin_nested():
+            if session.get_bind().dialect.insert_returning:
+                return session.execute(insert(table).values(**values).returning(*returning)).first()
+            session.execute(insert(table).values(**values))
+    except IntegrityError:
+        return None
+    return session.execute(select(*returning).where(conflict)).first()
+
+
+def insert_or_ignore(session, table, values, conflict_columns, returning):
+    """
+    ``INSERT ... ON CONFLICT (conflict_columns) DO NOTHING RETURNING ...`` in
+    a single statement: the unique constraint decides, there is no SELECT
+    before the write to race with. Returns the ``returning`` columns of the
+    new row, or ``None`` if it conflicted with an existing one. Dialects
+    without ``ON CONFLICT`` use SELECT-then-INSERT.
+    """
+    if not supports_on_conflict(session):
+        return _select_then_insert(session, table, values, conflict_columns, returning)
+
+    statement = (
+        dialect_insert(session, table)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=conflict_columns)
+        .returning(*returning)
+    )
+    return session.execute(statement).first()
+
+
+def insert_from_select_or_ignore(session, table, columns, query, conflict_columns, returning):
+    """
+    ``INSERT INTO table (columns) SELECT ... ON CONFLICT DO NOTHING RETURNING``:
+    no row when ``query`` selects nothing (e.g. a missing parent) or the row
+    conflicts with an existing one. Other dialects run ``query`` first and
+    insert its row with SELECT-then-INSERT.
+    """
+    if not supports_on_conflict(session):
+        row = session.execute(query).first()
+        if row is None:
+            return None
+        return _select_then_insert(session, table, dict(zip(columns, row)), conflict_columns, returning)
+
+    statement = (
+        dialect_insert(session, table)
+        .from_select(columns, query)
+        .on_conflict_do_nothing(index_elements=conflict_columns)
+        .returning(*returning)
+    )
+    return session.execute(statement).first()
@@ -0,0 +1,109 @@
+from functools import wraps
+from flask import current_app, jsonify, request
+from jsonschema import Draft202012Validator
+from werkzeug.exceptions import RequestEntityTooLarge
+from src.utils.metrics import metrics
+
+# Palavra-chave própria com a mensagem de erro (texto ou {palavra-chave: texto})
+MESSAGE_KEYWORD = "x-message"
+
+validation_failures = metrics.counter(
+    "request_validation_failures_total",
+    "Requests rejected before the view: invalid payload or body too large.",
+    ("endpoint", "reason"),
+)
+
+
+def compile_schema(schema):
+    """
+    Check ``schema`` and build its validator once, at import time: a broken
+    schema fails on startup, not on the first request.
+    """
+    Draft202012Validator.check_schema(schema)
+    return Draft202012Validator(schema)
+
+
+def validate_json(validator, max_content_length=None):
+    """
+    Decorator that validates the JSON body of a view against ``validator``
+    (see :func:`compile_schema`) before the view runs, see
+    :func:`init_request_validation`. ``max_content_length`` overrides
+    ``REQUEST_MAX_CONTENT_LENGTH`` for this view.
+    """
+    def decorator(f):
+        f.request_validator = validator
+        f.request_max_content_length = max_content_length
+        return f
+
+    return decorator
+
+
+def error_message(error):
+    """``x-message`` of the schema that failed, falling back to the jsonschema message."""
+    message = error.schema.get(MESSAGE_KEYWORD) if isinstance(error.schema, dict) else None
+    if isinstance(message, dict):
+        message = message.get(error.validator)
+    return message or error.message
+
+
+def validation_error(validator, payload):
+    """
+    First error of ``payload`` in schema order, or ``None``. ``iter_errors``
+    is lazy, so an invalid payload stops at the first failing keyword.
+    """
+    return next(validator.iter_errors(payload), None)
+
+
+def _too_large(limit):
+    response = jsonify({
+        "error": "Payload too large",
+        "message": f"O corpo da requisição não pode exceder {limit} bytes"
+    })
+    response.status_code = 413
+    return response
+
+
+def init_request_validation(app):
+    """
+    Wrap the views marked with :func:`validate_json`.
+
+    The body size is checked against ``Content-Length`` before anything is
+    read (chunked bodies are cut off at the same limit while reading), then
+    the JSON is parsed and validated. Invalid requests get 413/400 before the
+    other wrappers (idempotency, offload, group commit) and the view run, so
+    they never touch the database. Must run after every other ``init_*``
+    that wraps views, to be the outermost layer.
+    """
+    default_limit = app.config["REQUEST_MAX_CONTENT_LENGTH"]
+
+    for endpoint, view in list(app.view_functions.items()):
+        validator = getattr(view, "request_validator", None)
+        if validator is not None:
+            limit = getattr(view, "request_max_content_length", None) or default_limit
+            app.view_functions[endpoint] = _wrap_view(endpoint, view, validator, limit)
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_entity_too_large(e):
+        return _too_large(request.max_content_length)
+
+
+def _wrap_view(endpoint, view, validator, limit):
+    @wraps(view)
+    def validated_view(*args, **kwargs):
+        if request.content_length is not None and request.content_length > limit:
+            validation_failures.inc(endpoint=endpoint, reason="too_large")
+            return _too_large(limit)
+        request.max_content_length = limit
+
+        # Corpo ausente ou JSON inválido chega ao schema como None (falha em "type")
+        payload = request.get_json(silent=True)
+        error = validation_error(validator, payload)
+        if error is not None:
+            validation_failures.inc(endpoint=endpoint, reason="invalid")
+            return jsonify({
+                "error": "Validation error" if payload and isinstance(payload, dict) else "Invalid request",
+                "message": error_message(error)
+            }), 400
+        return current_app.ensure_sync(view)(*args, **kwargs)
+
+    return validated_view
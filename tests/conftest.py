@@ -0,0 +1,66 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import pytest
+
+# A configuração de teste é lida na importação de config.py
+TMP_DIR = tempfile.mkdtemp(prefix="soccer-tests-")
+DATABASE_PATH = os.path.join(TMP_DIR, "test.db")
+TEMPLATE_PATH = os.path.join(TMP_DIR, "template.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-enough-bytes")
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ["MEDIA_ROOT"] = os.path.join(TMP_DIR, "media")
+os.environ["TEAM_SNAPSHOT_DIR"] = os.path.join(TMP_DIR, "snapshots")
+os.environ["JOBS_WORKER_ENABLED"] = "false"
+
+SCALE = {"users": 200, "teams": 20, "memberships": 200}
+
+
+def _copy_database(source, target):
+    # API de backup do SQLite: as conexões abertas no destino veem uma escrita
+    # comum (data_version muda), sem arquivo trocado por baixo delas
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+@pytest.fixture(scope="session")
+def seeded_app():
+    from src import create_app
+    from src.database.db import db
+    from src.database.seed import seed_database
+
+    app = create_app("testing")
+    # O cookie de login é Secure: o test client só o reenvia em https
+    app.config["PREFERRED_URL_SCHEME"] = "https"
+    with app.app_context():
+        seed_database(db.engine, SCALE["users"], SCALE["teams"], SCALE["memberships"])
+        db.engine.dispose()
+    _copy_database(DATABASE_PATH, TEMPLATE_PATH)
+    yield app
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def app(seeded_app):
+    """The app, with the database restored to the seeded state before each test."""
+    from src.database.db import db
+
+    with seeded_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    _copy_database(TEMPLATE_PATH, DATABASE_PATH)
+    return seeded_app
+
+
+@pytest.fixture
+def client(app):
+    from src.database.seed import SEED_PASSWORD
+
+    client = app.test_client()
+    response = client.post("/auth/login", json={"user": "user1@seed.local", "password": SEED_PASSWORD})
+    assert response.status_code == 200
+    return client
@@ -0,0 +1,59 @@
+"""
+Compressed responses of the snapshot-backed team list: the list carries the
+snapshot version as ETag, so its compressed body is cached.
+"""
+import gzip
+
+import pytest
+
+from src.utils import compression
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def compressions(monkeypatch):
+    """Bodies actually compressed (cache misses)."""
+    compressed = []
+    compress = compression._compress
+
+    def counting_compress(body, encoding, config):
+        compressed.append(len(body))
+        return compress(body, encoding, config)
+
+    monkeypatch.setattr(compression, "_compress", counting_compress)
+    return compressed
+
+
+def _fresh_snapshot(app):
+    snapshots = app.extensions["team_snapshot"]
+    snapshots.rebuild()
+    assert snapshots.current()[1] == frozenset()
+
+
+def test_team_list_is_compressed_once_per_snapshot_version(app, client, compressions):
+    _fresh_snapshot(app)
+    identity = client.get("/teams/")
+    etag = identity.headers["ETag"]
+    assert etag.startswith('"s')
+
+    first = client.get("/teams/", headers=GZIP)
+    second = client.get("/teams/", headers=GZIP)
+    assert len(compressions) == 1
+    assert first.headers["ETag"] == second.headers["ETag"] == f"W/{etag}"
+    assert first.data == second.data
+    assert gzip.decompress(second.data) == identity.data
+
+    # Nova versão do snapshot: nova ETag, comprimida de novo
+    assert client.put("/teams/1", json={"description": "Nova versão"}).status_code == 200
+    _fresh_snapshot(app)
+    third = client.get("/teams/", headers=GZIP)
+    assert third.headers["ETag"] != first.headers["ETag"]
+    assert len(compressions) == 2
+    assert b"Nova vers" in gzip.decompress(third.data)
+
+
+def test_team_list_read_from_the_database_has_no_etag(client):
+    response = client.get("/teams/?include=captain")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
@@ -0,0 +1,64 @@
+"""
+The group-commit writer: one transaction per batch, one savepoint per
+request, and only short writes opted in with ``@batched_write``.
+"""
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+
+from src.utils.group_commit import GroupCommitWriter
+
+metadata = MetaData()
+rows = Table("rows", metadata, Column("id", Integer, primary_key=True), Column("name", String, unique=True))
+
+BATCHED_WRITES = {"teams.create_team", "teams.edit_team", "teams.delete_team", "teams.add_team_player"}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'group-commit.db'}")
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _insert(name, connections, fail=False):
+    def write(session):
+        connections.append(session.connection().connection.dbapi_connection)
+        session.execute(insert(rows).values(name=name))
+        if fail:
+            raise ValueError(f"{name} failed")
+        session.commit()
+        return name
+
+    return write
+
+
+def test_failing_write_rolls_back_only_its_savepoint(engine):
+    # Atraso longo: as três escritas entram no mesmo lote
+    writer = GroupCommitWriter(engine, max_batch_size=8, max_delay=0.5)
+    connections = []
+    futures = [
+        writer.submit(_insert("first", connections)),
+        writer.submit(_insert("broken", connections, fail=True)),
+        writer.submit(_insert("third", connections)),
+    ]
+
+    assert futures[0].result(timeout=5) == "first"
+    with pytest.raises(ValueError, match="broken failed"):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == "third"
+
+    assert len(set(map(id, connections))) == 1
+    with engine.connect() as conn:
+        assert conn.scalars(select(rows.c.name).order_by(rows.c.id)).all() == ["first", "third"]
+
+
+def test_only_short_writes_are_batched(app):
+    batched = {
+        endpoint for endpoint, view in app.view_functions.items()
+        if getattr(view, "batched_write", False)
+    }
+    assert batched == BATCHED_WRITES
+    # Escritas pesadas ficam no pool de offload
+    for endpoint in ("matches.create_matches", "teams.upload_team_image"):
+        assert not getattr(app.view_functions[endpoint], "batched_write", False)
@@ -0,0 +1,113 @@
+"""
+``Idempotency-Key`` on POST views: replays, reuse with another body,
+per-caller scope and duplicates that arrive while the first is running.
+"""
+import threading
+
+from src.database.seed import SEED_PASSWORD
+from src.utils import idempotency
+
+URL = "/teams/"
+HEADERS = {"Idempotency-Key": "create-team-1"}
+
+
+def _login(app, email):
+    client = app.test_client()
+    response = client.post("/auth/login", json={"user": email, "password": SEED_PASSWORD})
+    assert response.status_code == 200
+    return client
+
+
+def _team_count(app, name):
+    from src.database.db import db
+    from src.models.teams import Team
+
+    with app.app_context():
+        count = db.session.scalar(db.select(db.func.count()).select_from(Team).where(Team.name == name))
+        db.session.remove()
+    return count
+
+
+def test_retry_replays_the_stored_response(app, client):
+    first = client.post(URL, json={"name": "Replayed"}, headers=HEADERS)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = client.post(URL, json={"name": "Replayed"}, headers=HEADERS)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+    assert _team_count(app, "Replayed") == 1
+
+
+def test_same_key_with_another_body_is_rejected(app, client):
+    assert client.post(URL, json={"name": "Original"}, headers=HEADERS).status_code == 201
+    response = client.post(URL, json={"name": "Different"}, headers=HEADERS)
+    assert response.status_code == 422
+    assert _team_count(app, "Different") == 0
+
+
+def test_keys_are_scoped_to_the_caller(app, client):
+    other = _login(app, "user2@seed.local")
+    anonymous = app.test_client()
+
+    first = client.post(URL, json={"name": "First caller"}, headers=HEADERS)
+    # A mesma chave de outro usuário (ou sem login) é outra requisição
+    second = other.post(URL, json={"name": "Second caller"}, headers=HEADERS)
+    third = anonymous.post(URL, json={"name": "Anonymous caller"}, headers=HEADERS)
+    for response in (first, second, third):
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response.headers
+
+    # Um novo login do mesmo usuário (outro token) continua na mesma chave
+    again = _login(app, "user1@seed.local").post(URL, json={"name": "First caller"}, headers=HEADERS)
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.get_json() == first.get_json()
+
+
+def test_concurrent_duplicate_waits_for_the_first(app, monkeypatch):
+    store = app.extensions["idempotency"]
+    joined = threading.Event()
+    claims = []
+
+    class InFlight(dict):
+        def get(self, key, default=None):
+            value = super().get(key, default)
+            if value is not None:
+                joined.set()
+            return value
+
+    claim, complete = store.claim, store.complete
+
+    def counting_claim(*args):
+        claims.append(args)
+        return claim(*args)
+
+    def complete_after_the_duplicate_joined(*args):
+        # A original só termina depois que a duplicata encontrou o evento local
+        assert joined.wait(5)
+        return complete(*args)
+
+    monkeypatch.setattr(idempotency, "_in_flight", InFlight())
+    monkeypatch.setattr(store, "claim", counting_claim)
+    monkeypatch.setattr(store, "complete", complete_after_the_duplicate_joined)
+
+    # Um client (login) por thread, do mesmo usuário
+    clients = [_login(app, "user1@seed.local") for _ in range(2)]
+    responses = [None, None]
+
+    def post(index):
+        responses[index] = clients[index].post(URL, json={"name": "Concurrent"}, headers=HEADERS)
+
+    threads = [threading.Thread(target=post, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert [response.status_code for response in responses] == [201, 201]
+    assert sorted(response.headers.get("Idempotent-Replayed", "") for response in responses) == ["", "true"]
+    assert responses[0].get_json() == responses[1].get_json()
+    # Só a original consultou o banco para reservar a chave
+    assert len(claims) == 1
+    assert _team_count(app, "Concurrent") == 1
@@ -0,0 +1,59 @@
+"""
+Conditional team updates: ``PUT /teams/<id>`` with ``If-Match``.
+"""
+import pytest
+
+URL = "/teams/1"
+
+
+def _put(client, headers=None, description="Atualizada", url=URL):
+    return client.put(url, json={"description": description}, headers=headers or {})
+
+
+def _version(etag):
+    return int(etag.strip('W/"v'))
+
+
+def test_matching_if_match_updates_and_returns_the_new_etag(client):
+    current = client.get(URL).headers["ETag"]
+    response = _put(client, {"If-Match": current})
+    assert response.status_code == 200
+    assert _version(response.headers["ETag"]) == _version(current) + 1
+    assert client.get(URL).headers["ETag"] == response.headers["ETag"]
+
+
+def test_stale_if_match_is_rejected_with_the_current_etag(client):
+    stale = client.get(URL).headers["ETag"]
+    current = _put(client).headers["ETag"]
+
+    response = _put(client, {"If-Match": stale}, description="Perdida")
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+    assert client.get(URL).get_json()["data"]["description"] == "Atualizada"
+
+
+@pytest.mark.parametrize("headers", [{}, {"If-Match": "*"}], ids=["without", "star"])
+def test_unconditional_updates(client, headers):
+    current = client.get(URL).headers["ETag"]
+    response = _put(client, headers)
+    assert response.status_code == 200
+    assert _version(response.headers["ETag"]) == _version(current) + 1
+
+
+def test_weak_etag_from_a_compressed_response_is_accepted(app, client, monkeypatch):
+    # Corpo pequeno: sem isso GET /teams/1 não seria comprimido
+    monkeypatch.setitem(app.config, "COMPRESS_MIN_SIZE", 0)
+    compressed = client.get(URL, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    weak = compressed.headers["ETag"]
+    assert weak.startswith('W/"v')
+
+    response = _put(client, {"If-Match": weak})
+    assert response.status_code == 200
+    # A mesma ETag fraca, agora desatualizada
+    assert _put(client, {"If-Match": weak}).status_code == 412
+
+
+@pytest.mark.parametrize("headers", [{}, {"If-Match": '"v1"'}], ids=["without", "with"])
+def test_missing_team_is_not_found(client, headers):
+    assert _put(client, headers, url="/teams/999999").status_code == 404
@@ -0,0 +1,187 @@
+"""
+The SQLite-backed job queue: claiming, retries with backoff, expired locks
+and the team delete cascade.
+"""
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils import job_queue as job_queue_module
+from src.utils.job_queue import enqueue, job, job_queue
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Register ``tests.flaky``, which fails its first ``failures`` runs; return its calls."""
+    monkeypatch.setattr(job_queue_module, "_registry", dict(job_queue_module._registry))
+    calls = []
+
+    @job("tests.flaky", max_attempts=3)
+    def flaky(failures=0):
+        calls.append(failures)
+        if len(calls) <= failures:
+            raise RuntimeError(f"failure {len(calls)}")
+
+    return calls
+
+
+def _enqueue(app, name, payload=None, **kwargs):
+    from src.database.db import db
+
+    with app.app_context():
+        new_job = enqueue(name, payload, **kwargs)
+        db.session.commit()
+        job_id = new_job.id
+        db.session.remove()
+    return job_id
+
+
+def _claim(app):
+    with app.app_context():
+        return job_queue.claim()
+
+
+def _run(app, claimed):
+    with app.app_context():
+        job_queue.run(claimed)
+
+
+def _job(app, job_id):
+    from src.database.db import db
+    from src.models.jobs import Job
+
+    with app.app_context():
+        row = db.session.execute(db.select(Job.__table__).where(Job.id == job_id)).first()
+        db.session.remove()
+    return row
+
+
+def _set(app, job_id, **values):
+    from src.database.db import db
+    from src.models.jobs import Job
+
+    with app.app_context(), db.engine.begin() as conn:
+        conn.execute(db.update(Job).where(Job.id == job_id).values(**values))
+
+
+def test_claim_takes_the_next_due_job_once(app, calls):
+    later = _enqueue(app, "tests.flaky", run_at=datetime.utcnow() + timedelta(hours=1))
+    due = _enqueue(app, "tests.flaky")
+
+    claimed = _claim(app)
+    assert claimed.id == due
+    assert (claimed.status, claimed.attempts) == ("running", 1)
+    assert claimed.locked_by and claimed.locked_at
+    # O job em execução não é entregue de novo, o agendado ainda não venceu
+    assert _claim(app) is None
+
+    _run(app, claimed)
+    assert calls == [0]
+    finished = _job(app, due)
+    assert (finished.status, finished.locked_at, finished.last_error) == ("done", None, None)
+    assert _job(app, later).status == "queued"
+
+
+def test_unknown_job_names_are_rejected(app):
+    with app.app_context(), pytest.raises(LookupError):
+        enqueue("tests.missing")
+
+
+def test_failures_are_retried_with_backoff_until_max_attempts(app, calls):
+    job_id = _enqueue(app, "tests.flaky", {"failures": 3})
+    base = app.config["JOBS_BACKOFF_BASE"]
+
+    for attempt in (1, 2):
+        before = datetime.utcnow()
+        _run(app, _claim(app))
+        retried = _job(app, job_id)
+        assert (retried.status, retried.attempts, retried.locked_by) == ("queued", attempt, None)
+        assert f"RuntimeError: failure {attempt}" in retried.last_error
+        # Atraso base * 2^(tentativa - 1), com jitter entre metade e o total
+        delay = base * 2 ** (attempt - 1)
+        assert before + timedelta(seconds=delay * 0.5) <= retried.run_at
+        assert retried.run_at <= datetime.utcnow() + timedelta(seconds=delay)
+        assert _claim(app) is None
+        _set(app, job_id, run_at=datetime.utcnow())
+
+    _run(app, _claim(app))
+    failed = _job(app, job_id)
+    assert (failed.status, failed.attempts) == ("failed", 3)
+    assert "failure 3" in failed.last_error
+    assert len(calls) == 3
+    assert _claim(app) is None
+
+
+def test_expired_lock_is_requeued_and_the_old_run_discarded(app, calls, monkeypatch, caplog):
+    job_id = _enqueue(app, "tests.flaky")
+    stale = _claim(app)
+
+    # O worker sumiu: a manutenção devolve o job à fila depois de JOBS_LOCK_TIMEOUT
+    expired = datetime.utcnow() - timedelta(seconds=app.config["JOBS_LOCK_TIMEOUT"] + 1)
+    _set(app, job_id, locked_at=expired)
+    job_queue.maintain()
+    assert _job(app, job_id).status == "queued"
+
+    monkeypatch.setattr(job_queue, "_worker_id", lambda: "other-worker")
+    current = _claim(app)
+    assert (current.id, current.attempts, current.locked_by) == (job_id, 2, "other-worker")
+
+    # O worker antigo termina depois: o resultado dele é descartado
+    with caplog.at_level(logging.WARNING, logger=job_queue_module.__name__):
+        _run(app, stale)
+    assert "lost its lock" in caplog.text
+    assert (_job(app, job_id).status, _job(app, job_id).locked_by) == ("running", "other-worker")
+
+    _run(app, current)
+    assert _job(app, job_id).status == "done"
+    assert len(calls) == 2
+
+
+def test_maintenance_purges_old_finished_jobs(app, calls):
+    old = _enqueue(app, "tests.flaky")
+    recent = _enqueue(app, "tests.flaky")
+    _run(app, _claim(app))
+    _run(app, _claim(app))
+    _set(app, old, update_date=datetime.utcnow() - timedelta(seconds=app.config["JOBS_RETENTION"] + 1))
+
+    job_queue.maintain()
+    assert _job(app, old) is None
+    assert _job(app, recent).status == "done"
+
+
+def test_deleting_a_team_removes_its_history_in_the_background(app, client):
+    from src.database.db import db
+    from src.models.jobs import Job
+    from src.models.ranking_history import RankingHistoryBlock
+    from src.models.team_players import TeamPlayer
+
+    response = client.post("/matches/", json={"matches": [
+        {"home_team_id": 3, "away_team_id": 4, "home_score": 2, "away_score": 1,
+         "played_at": "2025-03-01T18:00:00"},
+    ]})
+    assert response.status_code == 201
+
+    assert client.delete("/teams/3").status_code == 200
+
+    def history(team_id):
+        with app.app_context():
+            count = db.session.scalar(
+                db.select(db.func.count()).select_from(RankingHistoryBlock).where(RankingHistoryBlock.team_id == team_id)
+            )
+            db.session.remove()
+        return count
+
+    with app.app_context():
+        queued = db.session.execute(db.select(Job.name, Job.payload, Job.status)).all()
+        assert db.session.scalar(db.select(db.func.count()).select_from(TeamPlayer).where(TeamPlayer.team_id == 3)) == 0
+        db.session.remove()
+    assert [(name, status) for name, _, status in queued] == [("teams.delete_cascade", "queued")]
+    assert '"team_id": 3' in queued[0].payload
+    assert history(3) == 1
+
+    claimed = _claim(app)
+    _run(app, claimed)
+    assert _job(app, claimed.id).status == "done"
+    assert history(3) == 0
+    assert history(4) == 1
@@ -0,0 +1,158 @@
+"""
+Team image uploads, the variant job and ``/media/images``.
+"""
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from src.utils import media
+
+URL = "/teams/1/images/profile"
+
+
+@pytest.fixture
+def media_root(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "MEDIA_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def _png(size=(64, 64), color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _upload(client, body, url=URL, headers=None):
+    return client.post(
+        url, data={"image": (io.BytesIO(body), "team.png")},
+        content_type="multipart/form-data", headers=headers or {},
+    )
+
+
+def _run_jobs(app):
+    from src.utils.job_queue import job_queue
+
+    names = []
+    with app.app_context():
+        while (claimed := job_queue.claim()) is not None:
+            job_queue.run(claimed)
+            names.append(claimed.name)
+    return names
+
+
+def test_upload_stores_the_original_and_updates_the_team(app, client, media_root):
+    body = _png()
+    response = _upload(client, body)
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()["data"]
+
+    digest, ext = media.parse_image_url(data["url"])
+    assert ext == "png"
+    with open(os.path.join(media.image_dir(str(media_root), digest), "original.png"), "rb") as f:
+        assert f.read() == body
+    assert set(data["variants"]) == set(app.config["MEDIA_VARIANTS"]["profile"])
+
+    team = client.get("/teams/1")
+    assert team.get_json()["data"]["team_profile_image"] == data["url"]
+    assert team.headers["ETag"] == response.headers["ETag"]
+
+
+def test_variants_are_served_once_the_job_has_run(app, client, media_root):
+    response = _upload(client, _png())
+    variant_url = response.get_json()["data"]["variants"]["thumb"]
+
+    # Antes do job: o original, sem cache
+    pending = client.get(variant_url)
+    assert pending.status_code == 200
+    assert pending.mimetype == "image/png"
+    assert pending.cache_control.no_cache
+
+    assert _run_jobs(app) == ["media.resize_image"]
+
+    variant = client.get(variant_url)
+    assert variant.status_code == 200
+    assert variant.mimetype == "image/webp"
+    assert variant.cache_control.public and variant.cache_control.immutable
+    with Image.open(io.BytesIO(variant.data)) as image:
+        assert image.size == tuple(app.config["MEDIA_VARIANTS"]["profile"]["thumb"])
+
+    assert client.get(variant_url, headers={"If-None-Match": variant.headers["ETag"]}).status_code == 304
+    partial = client.get(variant_url, headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.data == variant.data[:10]
+
+
+def test_same_image_twice_is_stored_once_and_resized_once(app, client, media_root):
+    body = _png(color=(10, 120, 240))
+    first = _upload(client, body).get_json()["data"]["url"]
+    assert _run_jobs(app) == ["media.resize_image"]
+
+    second = _upload(client, body, url="/teams/2/images/profile").get_json()["data"]["url"]
+    assert second == first
+    # Variantes já prontas: nenhum job novo
+    assert _run_jobs(app) == []
+
+
+@pytest.mark.parametrize("data, message", [
+    ({}, "campo 'image'"),
+    ({"image": (io.BytesIO(b"not an image"), "team.png")}, "não é uma imagem válida"),
+])
+def test_invalid_uploads_are_rejected(client, media_root, data, message):
+    response = client.post(URL, data=data, content_type="multipart/form-data")
+    assert response.status_code == 400
+    assert message in response.get_json()["message"]
+    assert not os.path.exists(os.path.join(media_root, "images"))
+
+
+def test_upload_over_the_pixel_limit_is_rejected(app, client, media_root, monkeypatch):
+    monkeypatch.setitem(app.config, "MEDIA_MAX_PIXELS", 32 * 32)
+    response = _upload(client, _png())
+    assert response.status_code == 400
+    assert "pixels" in response.get_json()["message"]
+
+
+def test_upload_limit_replaces_max_content_length(app, client, media_root, monkeypatch):
+    body = _png(size=(512, 512))
+    # Maior que o limite geral, dentro do limite do upload
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", len(body) // 2)
+    assert _upload(client, body).status_code == 200
+
+    monkeypatch.setitem(app.config, "MEDIA_MAX_UPLOAD_SIZE", len(body) // 2)
+    assert _upload(client, body).status_code == 413
+
+
+def test_upload_to_a_missing_team(client, media_root):
+    assert _upload(client, _png(), url="/teams/999999/images/profile").status_code == 404
+
+
+def test_upload_with_a_stale_if_match(client, media_root):
+    current = client.get("/teams/1").headers["ETag"]
+    response = _upload(client, _png(), headers={"If-Match": '"v0"'})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+
+    assert _upload(client, _png(), headers={"If-Match": current}).status_code == 200
+
+
+def test_storage_errors_are_logged(client, media_root, monkeypatch, caplog):
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(media, "store_original", fail)
+    response = _upload(client, _png())
+    assert response.status_code == 500
+    assert response.get_json()["error"] == "Storage error"
+    assert "Failed to store the image of team 1" in caplog.text
+    assert "disk full" in caplog.text
+
+
+@pytest.mark.parametrize("path", [
+    "/media/images/not-a-digest/original.png",
+    f"/media/images/{'0' * 64}/original.png",
+    f"/media/images/{'0' * 64}/profile-thumb-96x96.webp",
+    f"/media/images/{'0' * 64}/../secret.txt",
+])
+def test_unknown_images_are_not_found(client, media_root, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,89 @@
+"""
+Offloaded views: a request waiting for a slot of its route class gets it
+as soon as it is released, or a 503 after ``OFFLOAD_QUEUE_TIMEOUT``.
+"""
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from src.utils.offload import init_offload, offload
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def make_app():
+    """App with one ``slow`` slot; each request blocks until ``release`` is set."""
+    executors = []
+
+    def make_app(queue_timeout=TIMEOUT):
+        app = Flask(__name__)
+        app.config.update(
+            OFFLOAD_MAX_WORKERS=2, OFFLOAD_CONCURRENCY={"slow": 1}, OFFLOAD_QUEUE_TIMEOUT=queue_timeout,
+        )
+        started = threading.Semaphore(0)
+        release = threading.Event()
+
+        @app.get("/slow")
+        @offload("slow")
+        def slow():
+            started.release()
+            assert release.wait(TIMEOUT)
+            return {"thread": threading.current_thread().name, "finished": time.monotonic()}
+
+        init_offload(app)
+        executors.append(app.extensions["offload"])
+        return app, started, release
+
+    yield make_app
+    for executor in executors:
+        executor.shutdown(wait=False)
+
+
+def _get_in_background(app, responses):
+    thread = threading.Thread(target=lambda: responses.append(app.test_client().get("/slow")))
+    thread.start()
+    return thread
+
+
+def test_views_run_on_the_offload_pool(make_app):
+    app, _, release = make_app()
+    release.set()
+    response = app.test_client().get("/slow")
+    assert response.status_code == 200
+    assert response.get_json()["thread"].startswith("offload")
+
+
+def test_waiting_request_takes_the_released_slot_promptly(make_app):
+    app, started, release = make_app()
+    responses = []
+    first = _get_in_background(app, responses)
+    assert started.acquire(timeout=TIMEOUT)
+    second = _get_in_background(app, responses)
+    # O segundo espera pela vaga: a view dele ainda não começou
+    assert not started.acquire(timeout=0.2)
+
+    release.set()
+    for thread in (first, second):
+        thread.join(TIMEOUT)
+    assert [response.status_code for response in responses] == [200, 200]
+    finished = sorted(response.get_json()["finished"] for response in responses)
+    # A vaga passa adiante na liberação, sem esperar pela próxima sondagem
+    assert finished[1] - finished[0] < 0.02
+
+
+def test_request_without_a_slot_gets_a_503(make_app):
+    app, started, release = make_app(queue_timeout=0.1)
+    responses = []
+    first = _get_in_background(app, responses)
+    assert started.acquire(timeout=TIMEOUT)
+    try:
+        response = app.test_client().get("/slow")
+    finally:
+        release.set()
+        first.join(TIMEOUT)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert responses[0].status_code == 200
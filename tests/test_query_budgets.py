@@ -0,0 +1,131 @@
+"""
+Every view marked with ``@query_budget`` is requested through
+``assert_route_within_budget``, which fails when the view issues more SQL
+statements than its budget or repeats one N+1 style.
+"""
+import io
+
+import pytest
+from flask import Flask
+from PIL import Image
+from sqlalchemy import create_engine, text
+
+from src.utils.query_budget import QueryBudgetExceeded, assert_route_within_budget, query_budget
+
+
+def _create_team(client, name):
+    response = client.post("/teams/", json={"name": name})
+    assert response.status_code == 201
+    return response.get_json()["data"]["team_id"]
+
+
+def _image_upload():
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 30, 30)).save(buffer, "PNG")
+    buffer.seek(0)
+    return {"image": (buffer, "team.png")}
+
+
+def _uploaded_image(client):
+    response = client.post("/teams/1/images/profile", data=_image_upload(), content_type="multipart/form-data")
+    assert response.status_code == 200
+    return response.get_json()["data"]["url"]
+
+
+# endpoint -> função que prepara os dados e devolve (método, url, kwargs, status esperado)
+ROUTES = {
+    "auth.protected_route": lambda client: ("GET", "/auth/protected", {}, 200),
+    "auth.login": lambda client: ("POST", "/auth/login", {
+        "json": {"user": "user2@seed.local", "password": "password123"},
+    }, 200),
+    "users.get_users": lambda client: ("GET", "/users/", {}, 200),
+    "users.get_user": lambda client: ("GET", "/users/3", {}, 200),
+    "users.create_user": lambda client: ("POST", "/users/", {"json": {
+        "name": "Budget User", "email": "budget@seed.local", "password": "password123", "birth": "1990-01-01",
+    }}, 201),
+    "users.edit_user": lambda client: ("PUT", "/users/4", {"json": {"name": "Edited"}}, 200),
+    "teams.get_teams": lambda client: ("GET", "/teams/", {}, 200),
+    "teams.get_team": lambda client: ("GET", "/teams/2", {}, 200),
+    "teams.get_team_changes": lambda client: ("GET", "/teams/changes?since=0", {}, 200),
+    "teams.get_team_ranking_history": lambda client: ("GET", "/teams/1/ranking-history", {}, 200),
+    "teams.stream_teams_events": lambda client: ("GET", "/teams/events", {"buffered": False}, 200),
+    "teams.stream_team_events": lambda client: ("GET", "/teams/2/events", {"buffered": False}, 200),
+    "teams.create_team": lambda client: ("POST", "/teams/", {"json": {"name": "Budget Team"}}, 201),
+    "teams.edit_team": lambda client: ("PUT", "/teams/3", {"json": {"notes": "Edited"}}, 200),
+    "teams.add_team_player": lambda client: ("POST", "/teams/3/players", {"json": {"user_id": 150}}, 201),
+    "teams.delete_team": lambda client: ("DELETE", f"/teams/{_create_team(client, 'Doomed Team')}", {}, 200),
+    "teams.upload_team_image": lambda client: ("POST", "/teams/4/images/banner", {
+        "data": _image_upload(), "content_type": "multipart/form-data",
+    }, 200),
+    "media.get_image": lambda client: ("GET", _uploaded_image(client), {}, 200),
+    "matches.create_matches": lambda client: ("POST", "/matches/", {"json": {"matches": [
+        {"home_team_id": home, "away_team_id": home + 1, "home_score": 2, "away_score": 1,
+         "played_at": f"2025-03-{home:02d}T18:00:00Z"}
+        for home in range(5, 15)
+    ]}}, 201),
+}
+
+# Variações com caminhos de código próprios na mesma rota
+VARIANTS = [
+    ("GET", "/teams/?include=captain,players", 200),
+    ("GET", "/teams/2?include=captain", 200),
+    ("GET", "/teams/?include=players", 200),
+]
+
+
+def test_every_budgeted_route_is_covered(app):
+    budgeted = {
+        endpoint for endpoint, view in app.view_functions.items()
+        if getattr(view, "query_budget", None) is not None
+    }
+    assert budgeted == set(ROUTES)
+
+
+@pytest.mark.parametrize("endpoint", list(ROUTES))
+def test_route_within_budget(client, endpoint):
+    method, url, kwargs, status = ROUTES[endpoint](client)
+    response = assert_route_within_budget(client, method, url, **kwargs)
+    try:
+        assert response.status_code == status, response.get_data(as_text=True)
+    finally:
+        response.close()
+
+
+@pytest.mark.parametrize("method, url, status", VARIANTS)
+def test_route_variant_within_budget(client, method, url, status):
+    response = assert_route_within_budget(client, method, url)
+    assert response.status_code == status
+
+
+@pytest.fixture
+def toy_client():
+    engine = create_engine("sqlite://")
+    app = Flask(__name__)
+
+    @app.route("/over-budget")
+    @query_budget(1)
+    def over_budget():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return "ok"
+
+    @app.route("/n-plus-one")
+    @query_budget(10)
+    def n_plus_one():
+        with engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text("SELECT :value"), {"value": value})
+        return "ok"
+
+    return app.test_client()
+
+
+def test_over_budget_fails(toy_client):
+    with pytest.raises(QueryBudgetExceeded, match="issued 2 SQL statements"):
+        assert_route_within_budget(toy_client, "GET", "/over-budget")
+
+
+def test_n_plus_one_fails(toy_client):
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        assert_route_within_budget(toy_client, "GET", "/n-plus-one")
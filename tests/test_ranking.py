@@ -0,0 +1,156 @@
+"""
+The vectorized Elo of ``src.utils.ranking`` against a match-by-match
+reference, through ``POST /matches/`` and the ranking history.
+"""
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.utils.ranking import BASE_RATING, K_FACTOR, _levels, elo
+
+START = datetime(2025, 1, 1)
+
+
+def _reference(matches, k=K_FACTOR, home_advantage=0, ratings=None):
+    """Apply ``(home, away, home_score, away_score)`` one at a time; return ratings and the values after each match."""
+    ratings = defaultdict(lambda: float(BASE_RATING), ratings or {})
+    after = []
+    for home, away, home_score, away_score in matches:
+        actual = 1.0 if home_score > away_score else 0.5 if home_score == away_score else 0.0
+        expected = 1.0 / (1.0 + 10.0 ** ((ratings[away] - ratings[home] - home_advantage) / 400.0))
+        delta = k * (actual - expected)
+        ratings[home] += delta
+        ratings[away] -= delta
+        after.append((ratings[home], ratings[away]))
+    return ratings, after
+
+
+def _random_matches(count, teams, seed=7):
+    rng = random.Random(seed)
+    matches = []
+    for _ in range(count):
+        home, away = rng.sample(range(teams), 2)
+        matches.append((home, away, rng.randint(0, 4), rng.randint(0, 4)))
+    return matches
+
+
+def _elo(matches, teams, **kwargs):
+    data = np.array(matches, dtype=np.int64)
+    ratings = np.full(teams, float(BASE_RATING))
+    after = np.empty((len(data), 2))
+    elo(ratings, data[:, 0], data[:, 1], data[:, 2], data[:, 3], after=after, **kwargs)
+    return ratings, after
+
+
+@pytest.mark.parametrize("home_advantage", [0, 60])
+def test_elo_matches_the_sequential_reference(home_advantage):
+    matches = _random_matches(2000, 12)
+    ratings, after = _elo(matches, 12, home_advantage=home_advantage)
+    expected, expected_after = _reference(matches, home_advantage=home_advantage)
+
+    np.testing.assert_allclose(ratings, [expected[team] for team in range(12)], rtol=1e-12)
+    np.testing.assert_allclose(after, expected_after, rtol=1e-12)
+
+
+def test_matches_without_shared_teams_form_one_level():
+    matches = [(0, 1, 2, 0), (2, 3, 1, 1), (4, 5, 0, 3), (1, 2, 1, 0), (0, 5, 2, 2), (3, 4, 0, 1)]
+    data = np.array(matches)
+    # Três partidas independentes, depois três que dependem delas
+    assert _levels(data[:, 0], data[:, 1], 6).tolist() == [0, 0, 0, 1, 1, 1]
+
+    ratings, after = _elo(matches, 6)
+    expected, expected_after = _reference(matches)
+    np.testing.assert_allclose(ratings, [expected[team] for team in range(6)], rtol=1e-12)
+    np.testing.assert_allclose(after, expected_after, rtol=1e-12)
+
+
+def test_home_advantage_expects_the_home_team_to_win():
+    draw = [(0, 1, 1, 1)]
+    ratings, _ = _elo(draw, 2, home_advantage=100)
+    # Empate entre iguais: o mandante, favorito, perde pontos
+    assert ratings[0] < BASE_RATING < ratings[1]
+    assert ratings[0] + ratings[1] == pytest.approx(2 * BASE_RATING)
+    assert _elo(draw, 2)[0].tolist() == [BASE_RATING, BASE_RATING]
+
+
+def _payload(matches, first_day=0):
+    return {"matches": [
+        {"home_team_id": home, "away_team_id": away, "home_score": home_score, "away_score": away_score,
+         "played_at": (START + timedelta(hours=first_day * 24 + i)).isoformat()}
+        for i, (home, away, home_score, away_score) in enumerate(matches)
+    ]}
+
+
+def _post(client, matches, first_day=0):
+    response = client.post("/matches/", json=_payload(matches, first_day))
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["data"]["ranking_mode"]
+
+
+def _stored_ratings(app, team_ids):
+    from src.database.db import db
+    from src.models.teams import Team
+
+    with app.app_context():
+        rows = db.session.execute(
+            db.select(Team.id, Team.ranking_rating, Team.ranking_points).where(Team.id.in_(team_ids))
+        ).all()
+        db.session.remove()
+    return {row.id: (row.ranking_rating, row.ranking_points) for row in rows}
+
+
+def _assert_stored(app, expected):
+    stored = _stored_ratings(app, list(expected))
+    for team_id, rating in expected.items():
+        assert stored[team_id][0] == pytest.approx(rating, rel=1e-12)
+        assert stored[team_id][1] == int(np.rint(rating))
+
+
+def test_incremental_and_backfilled_ingestion_agree(app, client):
+    # Equipes 1 a 8 do seed, ainda sem pontuação
+    matches = [(home + 1, away + 1, hs, aws) for home, away, hs, aws in _random_matches(300, 8)]
+    older, newer = matches[:150], matches[150:]
+
+    # Em ordem: dois lotes incrementais
+    assert _post(client, older, first_day=0) == "incremental"
+    assert _post(client, newer, first_day=30) == "incremental"
+    expected, _ = _reference(older + newer)
+    _assert_stored(app, expected)
+
+    # Um lote anterior ao histórico: recálculo completo, igual à referência em ordem
+    backfill = [(home + 1, away + 1, hs, aws) for home, away, hs, aws in _random_matches(50, 8, seed=11)]
+    assert _post(client, backfill, first_day=-30) == "recompute"
+    expected, _ = _reference(backfill + older + newer)
+    _assert_stored(app, expected)
+
+
+def test_history_is_downsampled_to_the_configured_points(app, client, monkeypatch):
+    matches = [(1, 2, hs, aws) for _, _, hs, aws in _random_matches(400, 2, seed=3)]
+    _post(client, matches)
+    _, after = _reference(matches)
+    values = [int(np.rint(home)) for home, _ in after]
+    url = f"/teams/1/ranking-history?from={START.isoformat()}&to={(START + timedelta(hours=399)).isoformat()}"
+
+    # Uma hora por ponto (dentro do limite padrão): todos os valores, em ordem
+    full = client.get(url + "&resolution=1h").get_json()["data"]
+    assert full["resolution"] == 3600
+    assert [point["ranking_points"] for point in full["points"]] == values
+
+    monkeypatch.setitem(app.config, "RANKING_HISTORY_MAX_POINTS", 50)
+    data = client.get(url + "&resolution=1h").get_json()["data"]
+    resolution = data["resolution"]
+    assert resolution == 399 * 3600 // 50 + 1
+
+    # Cada intervalo resume os valores das partidas que caem nele
+    buckets = defaultdict(list)
+    for hour, value in enumerate(values):
+        buckets[hour * 3600 // resolution].append(value)
+    assert len(data["points"]) == len(buckets) <= 50
+    for point, (bucket, bucket_values) in zip(data["points"], sorted(buckets.items())):
+        assert datetime.fromisoformat(point["timestamp"]) == START + timedelta(seconds=bucket * resolution)
+        assert (point["ranking_points"], point["min"], point["max"]) == (
+            bucket_values[-1], min(bucket_values), max(bucket_values),
+        )
@@ -0,0 +1,35 @@
+"""
+``seed_database(truncate=True)`` on a database that was already used.
+"""
+from sqlalchemy import func, select
+
+from src.database.seed import seed_database
+
+DEPENDENT_TABLES = ("matches", "ranking_history_blocks", "jobs", "idempotency_keys")
+
+
+def test_truncate_clears_dependent_tables_and_keeps_team_ids(app, client):
+    from src.database.db import db
+    from src.models.team_changes import TeamChange
+    from src.models.teams import Team
+
+    created = client.post("/matches/", json={"matches": [
+        {"home_team_id": 1, "away_team_id": 2, "home_score": 3, "away_score": 0,
+         "played_at": "2025-03-01T18:00:00Z"},
+    ]})
+    assert created.status_code == 201
+    team_id = client.post("/teams/", json={"name": "Latest"}).get_json()["data"]["team_id"]
+    assert client.delete(f"/teams/{team_id}").status_code == 200
+
+    with app.app_context():
+        highest = db.session.scalar(select(func.max(TeamChange.team_id)))
+        assert highest == team_id
+        seed_database(db.engine, users=10, teams=3, memberships=6, truncate=True)
+
+        for table in DEPENDENT_TABLES:
+            count = db.session.scalar(select(func.count()).select_from(db.metadata.tables[table]))
+            assert count == 0, table
+        # Nenhum id reaproveitado, nem o da equipe excluída
+        ids = db.session.scalars(select(Team.id).order_by(Team.id)).all()
+        assert ids == [team_id + 1, team_id + 2, team_id + 3]
+        db.session.remove()
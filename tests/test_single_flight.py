@@ -0,0 +1,92 @@
+"""
+Concurrent GETs of a ``@coalesce`` view: identical requests share one
+execution, requests from different callers never do.
+"""
+import threading
+
+import pytest
+from flask import Flask, request
+
+from src.utils.single_flight import coalesce, init_single_flight
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def coalesced():
+    """A view that blocks until released, and the requests that ran it."""
+    app = Flask(__name__)
+    app.config["SINGLE_FLIGHT_TIMEOUT"] = TIMEOUT
+    executions = []
+    release = threading.Event()
+
+    @app.get("/items")
+    @coalesce
+    def items():
+        executions.append(request.headers.get("Authorization"))
+        assert release.wait(TIMEOUT)
+        return {"executions": len(executions), "auth": request.headers.get("Authorization")}
+
+    init_single_flight(app)
+
+    # Cada join (líder ou seguidor) é contado para soltar a view só depois
+    # que todas as requisições chegaram
+    flights = app.extensions["single_flight"]
+    joined = threading.Semaphore(0)
+    join = flights.join
+
+    def counting_join(key):
+        result = join(key)
+        joined.release()
+        return result
+
+    flights.join = counting_join
+    return app, executions, release, joined
+
+
+def _get_concurrently(coalesced, requests):
+    """GET /items once per ``{"headers": ..., "token": ...}`` in ``requests``, all at once."""
+    app, _, release, joined = coalesced
+    responses = [None] * len(requests)
+
+    def get(index, options):
+        client = app.test_client()
+        if "token" in options:
+            client.set_cookie("token", options["token"])
+        responses[index] = client.get("/items", headers=options.get("headers"))
+
+    threads = [threading.Thread(target=get, args=item) for item in enumerate(requests)]
+    for thread in threads:
+        thread.start()
+    for _ in requests:
+        assert joined.acquire(timeout=TIMEOUT)
+    release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+    return responses
+
+
+def test_identical_requests_share_one_execution(coalesced):
+    responses = _get_concurrently(coalesced, [{}] * 4)
+    assert len(coalesced[1]) == 1
+    assert [response.get_json() for response in responses] == [{"executions": 1, "auth": None}] * 4
+
+
+def test_requests_of_different_callers_are_not_coalesced(coalesced):
+    callers = ["Bearer first", "Bearer second", None]
+    requests = [
+        {"headers": {"Authorization": auth}} if auth else {}
+        for auth in callers for _ in range(2)
+    ]
+    responses = _get_concurrently(coalesced, requests)
+
+    # Uma execução por credencial; cada resposta é a da própria credencial
+    assert sorted(coalesced[1], key=str) == sorted(callers, key=str)
+    assert [response.get_json()["auth"] for response in responses] == [
+        auth for auth in callers for _ in range(2)
+    ]
+
+
+def test_token_cookies_are_part_of_the_key(coalesced):
+    _get_concurrently(coalesced, [{"token": "first"}, {"token": "first"}, {"token": "second"}])
+    assert len(coalesced[1]) == 2
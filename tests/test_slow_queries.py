@@ -0,0 +1,90 @@
+"""
+The slow-query log: normalization, what fast statements cost, eviction and
+the aggregated report.
+"""
+import pytest
+
+from src.utils import slow_queries
+from src.utils.slow_queries import SlowQueryLog, normalize_sql
+
+FAST, SLOW = 0.001, 0.5
+
+
+@pytest.fixture
+def log():
+    return SlowQueryLog(threshold=0.1, max_statements=3, explain=False)
+
+
+def _record(log, statement, elapsed, parameters=(1,), endpoint="teams.get_team"):
+    log.record(None, statement, parameters, False, elapsed, endpoint)
+
+
+@pytest.mark.parametrize("placeholders", ["?, ?, ?", "%s, %s", "%(id_1_1)s, %(id_1_2)s", ":a, :b", "?", "1, 2, 'x'"])
+def test_in_lists_are_folded_in_every_paramstyle(placeholders):
+    assert normalize_sql(f"SELECT id FROM teams WHERE id IN ({placeholders})") == "SELECT id FROM teams WHERE id IN (?...)"
+
+
+def test_only_slow_statements_are_normalized(log, monkeypatch, caplog):
+    normalized = []
+
+    def counting_normalize(statement):
+        normalized.append(statement)
+        return normalize_sql(statement)
+
+    monkeypatch.setattr(slow_queries, "normalize_sql", counting_normalize)
+    for _ in range(5):
+        _record(log, "SELECT * FROM teams WHERE id = ?", FAST)
+    assert normalized == []
+    assert "Slow query" not in caplog.text
+
+    _record(log, "SELECT * FROM teams WHERE id = ?", SLOW)
+    assert len(normalized) == 1
+    assert "Slow query (500.0 ms) from teams.get_team: SELECT * FROM teams WHERE id = ? params=(int)" in caplog.text
+
+
+def test_report_groups_statements_by_normalized_sql(log):
+    _record(log, "SELECT * FROM teams WHERE id IN (?, ?)", FAST, (1, 2))
+    _record(log, "SELECT * FROM teams WHERE id IN (?, ?, ?)", SLOW, (1, 2, 3), endpoint="teams.get_teams")
+    _record(log, "SELECT * FROM users", FAST)
+
+    top = log.top()
+    assert [entry["statement"] for entry in top] == ["SELECT * FROM teams WHERE id IN (?...)", "SELECT * FROM users"]
+    teams = top[0]
+    assert (teams["calls"], teams["slow_calls"]) == (2, 1)
+    assert teams["total_ms"] == pytest.approx((FAST + SLOW) * 1000)
+    assert teams["max_ms"] == SLOW * 1000
+    assert teams["endpoints"] == {"teams.get_team": 1, "teams.get_teams": 1}
+    # Formatos só das chamadas lentas
+    assert teams["parameter_shapes"] == ["(int, int, int)"]
+
+
+def test_statement_with_the_lowest_total_is_evicted(log):
+    _record(log, "SELECT 'a'", 0.010)
+    _record(log, "SELECT 'b'", 0.020)
+    _record(log, "SELECT 'c'", 0.030)
+    # "a" começou barata, mas agora é a de maior total
+    for _ in range(5):
+        _record(log, "SELECT 'a'", 0.010)
+
+    _record(log, "SELECT 'd'", 0.040)
+    assert set(log._stats) == {"SELECT 'a'", "SELECT 'c'", "SELECT 'd'"}
+    _record(log, "SELECT 'e'", 0.050)
+    assert set(log._stats) == {"SELECT 'a'", "SELECT 'd'", "SELECT 'e'"}
+
+
+def test_plan_is_captured_once_per_normalized_statement(monkeypatch):
+    from sqlalchemy import create_engine
+
+    engine = create_engine("sqlite://")
+    log = SlowQueryLog(threshold=0.1, explain=True)
+    # A captura roda aqui, não na thread de fundo
+    monkeypatch.setattr(log._explainer, "ensure_started", lambda: None)
+
+    log.record(engine, "SELECT 1 WHERE 1 IN (?, ?)", (1, 2), False, SLOW, "-")
+    log.record(engine, "SELECT 1 WHERE 1 IN (?, ?, ?)", (1, 2, 3), False, SLOW, "-")
+    assert log._explain_queue.qsize() == 1
+    log.capture_plans()
+
+    [entry] = log.top()
+    assert entry["slow_calls"] == 2
+    assert entry["plan"] and not entry["plan"][0].startswith("EXPLAIN failed")
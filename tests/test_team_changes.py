@@ -0,0 +1,118 @@
+"""
+The team change feed: ``GET /teams/changes`` cursors and the SSE streams
+replayed with ``Last-Event-ID``.
+"""
+import json
+
+import pytest
+
+from src.models import team_changes
+
+
+def _changes(client, since, limit=None):
+    params = {"since": since}
+    if limit is not None:
+        params["limit"] = limit
+    response = client.get("/teams/changes", query_string=params)
+    assert response.status_code == 200
+    return response.get_json()["data"]
+
+
+def _write_teams(client):
+    """Create, edit and delete teams; return ``(changed ids, deleted ids)``."""
+    created = client.post("/teams/", json={"name": "Feed created"}).get_json()["data"]["team_id"]
+    short_lived = client.post("/teams/", json={"name": "Feed deleted"}).get_json()["data"]["team_id"]
+    assert client.put("/teams/1", json={"description": "Feed edited"}).status_code == 200
+    assert client.put(f"/teams/{created}", json={"description": "Edited twice"}).status_code == 200
+    assert client.delete("/teams/2").status_code == 200
+    assert client.delete(f"/teams/{short_lived}").status_code == 200
+    return {created, 1}, {2, short_lived}
+
+
+def _events(body):
+    """Parse an SSE body into ``[(id, event, data), ...]``."""
+    events = []
+    for block in body.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if "id" in fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def _logged_ids(app, since):
+    from src.database.db import db
+    from src.models.team_changes import TeamChange
+
+    with app.app_context():
+        ids = db.session.scalars(db.select(TeamChange.id).where(TeamChange.id > since).order_by(TeamChange.id)).all()
+        db.session.remove()
+    return ids
+
+
+def test_full_sync_then_pages_without_gaps_or_duplicates(app, client):
+    full = _changes(client, 0)
+    assert len(full["changed"]) == 20 and full["deleted"] == [] and not full["has_more"]
+    start = full["cursor"]
+
+    changed, deleted = _write_teams(client)
+    logged = _logged_ids(app, start)
+
+    # Páginas de duas alterações: cada cursor é a última alteração lida, sem
+    # pular nem repetir nenhuma; a página vazia encerra a sincronização
+    cursor, cursors, seen_changed, seen_deleted = start, [], {}, set()
+    while True:
+        page = _changes(client, cursor, limit=2)
+        seen_changed.update((team["team_id"], team) for team in page["changed"])
+        seen_deleted.update(page["deleted"])
+        if page["cursor"] == cursor:
+            assert page == {"changed": [], "deleted": [], "cursor": cursor, "has_more": False}
+            break
+        cursor = page["cursor"]
+        cursors.append(cursor)
+
+    assert cursors == logged[1::2]
+    assert set(seen_changed) == changed
+    assert seen_deleted == deleted
+    assert seen_changed[1]["description"] == "Feed edited"
+
+
+def test_feed_reports_the_latest_state_of_each_team(client):
+    start = _changes(client, 0)["cursor"]
+    changed, deleted = _write_teams(client)
+    data = _changes(client, start)
+    assert {team["team_id"] for team in data["changed"]} == changed
+    assert sorted(data["deleted"]) == sorted(deleted)
+
+
+@pytest.mark.parametrize("url", ["/teams/changes", "/teams/events", "/teams/1/events"])
+def test_feed_is_not_available_without_sqlite(client, monkeypatch, url):
+    monkeypatch.setattr(team_changes, "CURSOR_DIALECTS", ())
+    response = client.get(url)
+    assert response.status_code == 501
+    assert response.get_json()["error"] == "Não suportado"
+
+
+@pytest.mark.parametrize("url, team_id", [("/teams/events", None), ("/teams/1/events", 1)])
+def test_stream_replays_changes_after_last_event_id(app, client, monkeypatch, url, team_id):
+    # O stream termina logo depois do replay
+    monkeypatch.setitem(app.config, "EVENTS_MAX_STREAM_SECONDS", 0.2)
+    start = _changes(client, 0)["cursor"]
+    _write_teams(client)
+
+    response = client.get(url, headers={"Last-Event-ID": str(start)})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.data.startswith(f"retry: {app.config['EVENTS_RETRY_MS']}\n\n".encode())
+
+    events = _events(response.data)
+    ids = [event_id for event_id, _, _ in events]
+    assert ids == sorted(set(ids)) and all(event_id > start for event_id in ids)
+    if team_id is None:
+        assert ids[-1] == _changes(client, start)["cursor"]
+        assert [event for _, event, _ in events].count("deleted") == 2
+    else:
+        assert [(event, data["team_id"]) for _, event, data in events] == [("updated", 1)]
+
+    # Reconexão com o último id recebido: nenhum evento repetido
+    again = client.get(url, headers={"Last-Event-ID": str(ids[-1])})
+    assert _events(again.data) == []
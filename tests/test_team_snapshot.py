@@ -0,0 +1,76 @@
+"""
+Snapshot responses served through real WSGI servers: the plain werkzeug
+server (``app.run``, any standard server) gets ``bytes``, the workers'
+middleware gets the memoryviews and sends them itself.
+"""
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from src.server import _BufferPassthrough, _KeepAliveRequestHandler
+from src.utils.snapshot import BUFFER_PASSTHROUGH_KEY
+
+REQUESTS = 3
+
+
+@pytest.fixture
+def fresh_snapshot(app):
+    snapshots = app.extensions["team_snapshot"]
+    snapshots.rebuild()
+    snapshot, changed = snapshots.current()
+    assert changed == frozenset()
+    return snapshot
+
+
+def _serve(wsgi_app, **kwargs):
+    server = make_server("127.0.0.1", 0, wsgi_app, threaded=True, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture(params=["werkzeug", "buffer_passthrough"])
+def server(request, app):
+    if request.param == "werkzeug":
+        server = _serve(app)
+    else:
+        server = _serve(_BufferPassthrough(app), request_handler=_KeepAliveRequestHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(connection, url, headers=None):
+    connection.request("GET", url, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    if response.getheader("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return response.status, json.loads(body)
+
+
+@pytest.mark.parametrize("url", ["/teams/", "/teams/2"])
+@pytest.mark.parametrize("headers", [{}, {"Accept-Encoding": "gzip"}], ids=["identity", "gzip"])
+def test_snapshot_responses_over_a_kept_alive_connection(app, fresh_snapshot, server, url, headers):
+    expected = app.test_client().get(url).get_json()
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    try:
+        # Várias requisições na mesma conexão: um corpo mal escrito deixa a
+        # conexão inutilizável a partir da segunda
+        for _ in range(REQUESTS):
+            assert _get(connection, url, headers) == (200, expected)
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("url", ["/teams/", "/teams/2"])
+@pytest.mark.parametrize("passthrough, chunk_type", [(False, bytes), (True, memoryview)])
+def test_snapshot_chunks_are_views_only_behind_the_middleware(app, fresh_snapshot, url, passthrough, chunk_type):
+    environ = {BUFFER_PASSTHROUGH_KEY: True} if passthrough else {}
+    with app.test_request_context(url, environ_base=environ):
+        response = app.full_dispatch_request()
+    assert [type(chunk) for chunk in response.response] == [chunk_type]
@@ -0,0 +1,103 @@
+"""
+Statements issued by the write paths built on ``src.utils.upsert``, and the
+SELECT-then-INSERT fallback used on dialects without ``ON CONFLICT``.
+"""
+import pytest
+
+from src.utils import upsert
+from src.utils.query_budget import QueryRecorder, assert_route_within_budget
+
+# Instruções SQL esperadas por requisição (sem Idempotency-Key): a primeira
+# cria a linha, a repetição esbarra na constraint
+EXPECTED_STATEMENTS = {
+    "/users/": {"created": 1, "conflict": 1},
+    "/teams/": {"created": 2, "conflict": 1},
+    "/teams/1/players": {"created": 3, "conflict": 2},
+}
+
+
+@pytest.fixture
+def without_on_conflict(monkeypatch):
+    monkeypatch.setattr(upsert, "_DIALECT_INSERTS", {})
+
+
+def _post_twice(client, url, body):
+    """Send ``body`` twice; return ``[(response, statements), ...]``."""
+    results = []
+    for _ in range(2):
+        with QueryRecorder(requests_only=True) as recorder:
+            response = assert_route_within_budget(client, "POST", url, json=body)
+        results.append((response, recorder.count))
+    return results
+
+
+def _created_user_id(client, email):
+    response = client.post("/users/", json={"name": "Upsert", "email": email, "password": "secret", "birth": None})
+    assert response.status_code == 201
+    return response.get_json()["user"]["id"]
+
+
+def test_create_user_statements(client):
+    (created, created_count), (conflict, conflict_count) = _post_twice(client, "/users/", {
+        "name": "Upsert", "email": "upsert-user@example.com", "password": "secret", "birth": None,
+    })
+    assert (created.status_code, conflict.status_code) == (201, 400)
+    assert (created_count, conflict_count) == tuple(EXPECTED_STATEMENTS["/users/"].values())
+
+
+def test_create_team_statements(client):
+    (created, created_count), (conflict, conflict_count) = _post_twice(client, "/teams/", {"name": "Upsert Team"})
+    assert (created.status_code, conflict.status_code) == (201, 409)
+    assert (created_count, conflict_count) == tuple(EXPECTED_STATEMENTS["/teams/"].values())
+
+
+def test_add_team_player_statements(client):
+    user_id = _created_user_id(client, "upsert-player@example.com")
+    (created, created_count), (conflict, conflict_count) = _post_twice(
+        client, "/teams/1/players", {"user_id": user_id}
+    )
+    assert (created.status_code, conflict.status_code) == (201, 409)
+    assert (created_count, conflict_count) == tuple(EXPECTED_STATEMENTS["/teams/1/players"].values())
+
+
+def test_fallback_create_user(client, without_on_conflict):
+    (created, _), (conflict, _) = _post_twice(client, "/users/", {
+        "name": "Fallback", "email": "fallback-user@example.com", "password": "secret", "birth": None,
+    })
+    assert (created.status_code, conflict.status_code) == (201, 400)
+    assert created.get_json()["user"]["name"] == "Fallback"
+
+
+def test_fallback_create_team(client, without_on_conflict):
+    (created, _), (conflict, _) = _post_twice(client, "/teams/", {"name": "Fallback Team"})
+    assert (created.status_code, conflict.status_code) == (201, 409)
+    assert created.get_json()["data"]["name"] == "Fallback Team"
+
+
+def test_fallback_add_team_player(client, without_on_conflict):
+    user_id = _created_user_id(client, "fallback-player@example.com")
+    (created, _), (conflict, _) = _post_twice(client, "/teams/2/players", {"user_id": user_id})
+    assert (created.status_code, conflict.status_code) == (201, 409)
+    assert created.get_json()["data"]["user_id"] == user_id
+
+    missing = client.post("/teams/999999/players", json={"user_id": user_id})
+    assert missing.status_code == 404
+
+
+def test_fallback_insert_race_is_a_conflict(app, without_on_conflict):
+    from src.database.db import db
+    from src.models.user import User
+
+    table = User.__table__
+    with app.app_context():
+        # O SELECT por nome não encontra a linha; o INSERT esbarra no email único,
+        # como quando outra transação insere entre as duas instruções
+        row = upsert.insert_or_ignore(
+            db.session, table,
+            {"name": "Nobody Else", "email": "user1@seed.local", "password": "x"},
+            ["name"], returning=(table.c.id,),
+        )
+        assert row is None
+        # O savepoint desfez só o INSERT: a transação continua utilizável
+        assert db.session.scalar(db.select(db.func.count()).select_from(table)) > 0
+        db.session.rollback()